@@ -0,0 +1,75 @@
+"""
+Package exposing the database contracts.
+
+Contracts are imported lazily, like ``webprotocols``: a module such as
+``pool`` is only loaded the first time one of its names is accessed on this
+package.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from nestpy_protocols.sqlprotocols.pool import ConnectionPoolProtocol, AsyncConnectionPoolProtocol
+    from nestpy_protocols.sqlprotocols.connection import SQLConnectionProtocol
+    from nestpy_protocols.sqlprotocols.async_connection import AsyncSQLConnectionProtocol
+    from nestpy_protocols.sqlprotocols.routing import ReplicaRouter, AsyncReplicaRouter
+    from nestpy_protocols.sqlprotocols.session import IdentityMap, BatchLoader, AsyncBatchLoader
+    from nestpy_protocols.sqlprotocols.query_cache import QueryCache, CachingConnection
+
+
+_LAZY_EXPORTS = {
+    "ConnectionPoolProtocol": "nestpy_protocols.sqlprotocols.pool",
+    "AsyncConnectionPoolProtocol": "nestpy_protocols.sqlprotocols.pool",
+    "SQLConnectionProtocol": "nestpy_protocols.sqlprotocols.connection",
+    "AsyncSQLConnectionProtocol": "nestpy_protocols.sqlprotocols.async_connection",
+    "ReplicaRouter": "nestpy_protocols.sqlprotocols.routing",
+    "AsyncReplicaRouter": "nestpy_protocols.sqlprotocols.routing",
+    "IdentityMap": "nestpy_protocols.sqlprotocols.session",
+    "BatchLoader": "nestpy_protocols.sqlprotocols.session",
+    "AsyncBatchLoader": "nestpy_protocols.sqlprotocols.session",
+    "QueryCache": "nestpy_protocols.sqlprotocols.query_cache",
+    "CachingConnection": "nestpy_protocols.sqlprotocols.query_cache",
+}
+
+
+__all__ = [
+    "ConnectionPoolProtocol",
+    "AsyncConnectionPoolProtocol",
+    "SQLConnectionProtocol",
+    "AsyncSQLConnectionProtocol",
+    "ReplicaRouter",
+    "AsyncReplicaRouter",
+    "IdentityMap",
+    "BatchLoader",
+    "AsyncBatchLoader",
+    "QueryCache",
+    "CachingConnection",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Import a contract on first access and cache it on the package.
+
+    Args:
+        name: The attribute requested from the package.
+
+    Returns:
+        The requested protocol class.
+
+    Raises:
+        AttributeError: If the name is not one of the exported contracts.
+    """
+    module_name = _LAZY_EXPORTS.get(name)
+
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,544 @@
+"""
+Module providing the AsyncSQLConnectionProtocol contract and thread-offloaded connections.
+
+This module declares the AsyncSQLConnectionProtocol abstract base class,
+which describes statement execution for asyncio code, SQLExecutor, a
+bounded pool of worker threads, and ThreadedSQLConnection /
+AsyncSQLiteConnection, which run a synchronous SQLConnectionProtocol on
+that pool so blocking driver calls never run on the event loop.
+
+Each connection is bound to one worker thread for its whole life (thread
+affinity): it is opened, used and closed on that thread, so drivers that
+forbid sharing a connection across threads (such as ``sqlite3`` with
+``check_same_thread``) work unchanged, and the calls of one connection run
+in submission order. Connections are spread over the workers by number of
+bound connections.
+
+The number of calls queued on the executor is bounded by ``max_pending``:
+further calls wait on the event loop instead of growing the queues. Time
+spent queued and time spent executing are recorded in SQLExecutorMetrics.
+
+Worker threads do not survive ``os.fork``: in a forked child every executor
+is reset and starts new workers on first use. Connections opened before the
+fork must not be used in the child.
+"""
+
+import os
+import time
+import queue
+import asyncio
+import weakref
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+from nestpy_protocols.sqlprotocols.connection import Parameters, SQLConnectionProtocol, SQLiteConnection
+
+
+# Every live SQLExecutor, reset in forked children.
+_executors: "weakref.WeakSet[SQLExecutor]" = weakref.WeakSet()
+
+
+class SQLExecutorClosedError(RuntimeError):
+    """
+    Raised when a call is submitted to a closed SQLExecutor.
+    """
+
+
+@dataclass
+class SQLExecutorMetrics:
+    """
+    Queue and execution counters of a SQLExecutor.
+
+    Attributes:
+        calls: Calls executed.
+        errors: Calls that raised.
+        queue_wait_time: Total seconds calls spent queued for their worker.
+        max_queue_wait_time: The longest single queue wait, in seconds.
+        execution_time: Total seconds spent running calls.
+        max_execution_time: The longest single call, in seconds.
+    """
+
+    calls: int = 0
+    errors: int = 0
+    queue_wait_time: float = 0.0
+    max_queue_wait_time: float = 0.0
+    execution_time: float = 0.0
+    max_execution_time: float = 0.0
+
+    @property
+    def mean_queue_wait_time(self) -> float:
+        """
+        Return the mean queue wait of a call.
+
+        Returns:
+            Seconds, or 0 if no call ran.
+        """
+        return self.queue_wait_time / self.calls if self.calls else 0.0
+
+    @property
+    def mean_execution_time(self) -> float:
+        """
+        Return the mean execution time of a call.
+
+        Returns:
+            Seconds, or 0 if no call ran.
+        """
+        return self.execution_time / self.calls if self.calls else 0.0
+
+    def record(self, queue_wait: float, execution: float, failed: bool) -> None:
+        """
+        Record one executed call.
+
+        Args:
+            queue_wait: The seconds the call spent queued.
+            execution: The seconds the call ran.
+            failed: Whether the call raised.
+
+        Returns:
+            None
+        """
+        self.calls += 1
+        self.errors += failed
+        self.queue_wait_time += queue_wait
+        self.max_queue_wait_time = max(self.max_queue_wait_time, queue_wait)
+        self.execution_time += execution
+        self.max_execution_time = max(self.max_execution_time, execution)
+
+
+def _resolve(future: "asyncio.Future[Any]", result: Any, error: Optional[BaseException]) -> None:
+    # The awaiting task may have been cancelled: its result is dropped.
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class SQLExecutor:
+    """
+    Fixed pool of worker threads running blocking database calls for asyncio code.
+
+    Every worker has its own FIFO queue; a call names the worker it runs on
+    (see ``bind``), which gives connections thread affinity.
+
+    Args:
+        max_workers: The number of worker threads.
+        max_pending: The maximum number of queued or running calls; further
+                     calls wait on the event loop. The limit is enforced per
+                     event loop.
+        thread_name_prefix: The prefix of the worker thread names.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 256, thread_name_prefix: str = "nestpy-sql") -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.thread_name_prefix = thread_name_prefix
+        self.metrics = SQLExecutorMetrics()
+        self._lock = threading.Lock()
+        self._queues: List["queue.SimpleQueue[Any]"] = [queue.SimpleQueue() for _ in range(max_workers)]
+        self._bound = [0] * max_workers
+        self._threads: List[threading.Thread] = []
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._closed = False
+        _executors.add(self)
+
+    def _reset_after_fork(self) -> None:
+        # Only the forking thread exists in the child: the workers are gone and
+        # the lock may have been held by one of them.
+        self._lock = threading.Lock()
+        self._queues = [queue.SimpleQueue() for _ in range(self.max_workers)]
+        self._bound = [0] * self.max_workers
+        self._threads = []
+        self._slots = weakref.WeakKeyDictionary()
+        self.metrics = SQLExecutorMetrics()
+
+    def _start(self) -> None:
+        # Workers are started on first use so creating an executor is free.
+        with self._lock:
+            if self._threads or self._closed:
+                return
+            for index, work in enumerate(self._queues):
+                thread = threading.Thread(
+                    target=self._work, args=(work,), name=f"{self.thread_name_prefix}-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self, work: "queue.SimpleQueue[Any]") -> None:
+        while True:
+            item = work.get()
+            if item is None:
+                return
+            loop, future, function, args, queued_at = item
+            started = time.perf_counter()
+            result: Any = None
+            error: Optional[BaseException] = None
+            try:
+                result = function(*args)
+            except BaseException as exc:
+                error = exc
+            finished = time.perf_counter()
+
+            with self._lock:
+                self.metrics.record(started - queued_at, finished - started, error is not None)
+            try:
+                loop.call_soon_threadsafe(_resolve, future, result, error)
+            except RuntimeError:
+                # The event loop was closed while the call ran.
+                pass
+
+    def bind(self) -> int:
+        """
+        Pick the worker of a new connection: the one with the fewest bound connections.
+
+        Returns:
+            The worker index, to pass to ``run`` and ``unbind``.
+        """
+        with self._lock:
+            worker = min(range(self.max_workers), key=self._bound.__getitem__)
+            self._bound[worker] += 1
+        return worker
+
+    def unbind(self, worker: int) -> None:
+        """
+        Release a worker picked by ``bind`` once its connection is closed.
+
+        Args:
+            worker: The worker index.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._bound[worker] -= 1
+
+    async def run(self, worker: int, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking call on one worker thread and wait for its result.
+
+        If the awaiting task is cancelled, the call still runs (a thread
+        cannot be interrupted) but its result is dropped.
+
+        Args:
+            worker: The worker index (see ``bind``).
+            function: The blocking callable.
+            *args: Its positional arguments.
+
+        Returns:
+            The result of the call.
+
+        Raises:
+            SQLExecutorClosedError: If the executor is closed.
+        """
+        if self._closed:
+            raise SQLExecutorClosedError("the SQL executor is closed")
+        if not self._threads:
+            self._start()
+
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots.setdefault(loop, asyncio.Semaphore(self.max_pending))
+
+        async with slots:
+            future = loop.create_future()
+            self._queues[worker].put((loop, future, function, args, time.perf_counter()))
+            return await future
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return a snapshot of the executor state and metrics.
+
+        Returns:
+            A mapping of worker, connection and queue gauges plus the
+            SQLExecutorMetrics counters.
+        """
+        metrics = self.metrics
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "bound_connections": list(self._bound),
+                "queued": [work.qsize() for work in self._queues],
+                "calls": metrics.calls,
+                "errors": metrics.errors,
+                "mean_queue_wait_time": metrics.mean_queue_wait_time,
+                "max_queue_wait_time": metrics.max_queue_wait_time,
+                "mean_execution_time": metrics.mean_execution_time,
+                "max_execution_time": metrics.max_execution_time,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the workers once the calls already queued have run.
+
+        Args:
+            wait: Whether to block until the worker threads exit.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for work in self._queues:
+            work.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+_default_executor: Optional[SQLExecutor] = None
+
+_default_executor_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    global _default_executor_lock
+    _default_executor_lock = threading.Lock()
+    for executor in list(_executors):
+        executor._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_sql_executor() -> SQLExecutor:
+    """
+    Return the process-wide SQLExecutor used when none is given.
+
+    Returns:
+        The shared executor.
+    """
+    global _default_executor
+    if _default_executor is None:
+        with _default_executor_lock:
+            if _default_executor is None:
+                _default_executor = SQLExecutor()
+    return _default_executor
+
+
+class AsyncSQLConnectionProtocol(ABC):
+    """
+    Abstract base class that defines statement execution on one connection for asyncio code.
+
+    Results are returned whole (rows, row counts) rather than as cursors, so
+    no blocking call is left for the caller to make. A connection is used by
+    one task at a time.
+    """
+
+    @abstractmethod
+    async def execute(self, sql: str, parameters: Parameters = ()) -> int:
+        """
+        Execute one write statement.
+
+        Args:
+            sql: The statement text with placeholders.
+            parameters: The bound parameters.
+
+        Returns:
+            The number of affected rows.
+        """
+
+    @abstractmethod
+    async def executemany(self, sql: str, seq_of_parameters: Iterable[Parameters]) -> int:
+        """
+        Execute one statement for every parameter set.
+
+        Args:
+            sql: The statement text with placeholders.
+            seq_of_parameters: The parameter sets.
+
+        Returns:
+            The number of affected rows.
+        """
+
+    @abstractmethod
+    async def fetchone(self, sql: str, parameters: Parameters = ()) -> Optional[Any]:
+        """
+        Execute a query and return its first row.
+
+        Args:
+            sql: The query text.
+            parameters: The bound parameters.
+
+        Returns:
+            The first row, or None.
+        """
+
+    @abstractmethod
+    async def fetchall(self, sql: str, parameters: Parameters = ()) -> List[Any]:
+        """
+        Execute a query and return every row.
+
+        Args:
+            sql: The query text.
+            parameters: The bound parameters.
+
+        Returns:
+            The list of rows.
+        """
+
+    @abstractmethod
+    async def commit(self) -> None:
+        """
+        Commit the current transaction.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        """
+        Roll back the current transaction.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    async def close(self) -> None:
+        """
+        Close the connection.
+
+        Returns:
+            None
+        """
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["AsyncSQLConnectionProtocol"]:
+        """
+        Commit the enclosed statements, or roll them back on error.
+
+        Yields:
+            This connection.
+        """
+        try:
+            yield self
+        except BaseException:
+            await self.rollback()
+            raise
+        else:
+            await self.commit()
+
+
+class ThreadedSQLConnection(AsyncSQLConnectionProtocol):
+    """
+    AsyncSQLConnectionProtocol running a synchronous connection on one SQLExecutor worker.
+
+    Use ``open`` so the connection is also created on its worker thread.
+
+    Args:
+        connection: The synchronous connection, created on ``worker``.
+        executor: The executor owning the worker.
+        worker: The worker index returned by ``SQLExecutor.bind``.
+    """
+
+    def __init__(self, connection: SQLConnectionProtocol, executor: SQLExecutor, worker: int) -> None:
+        self.connection = connection
+        self.executor = executor
+        self.worker = worker
+        self._closed = False
+
+    @classmethod
+    async def open(
+            cls,
+            connect: Callable[[], SQLConnectionProtocol],
+            executor: Optional[SQLExecutor] = None
+    ) -> Any:
+        """
+        Create a connection on a worker thread and bind it to that worker.
+
+        Args:
+            connect: Opens the synchronous connection.
+            executor: The executor to use; the shared one by default.
+
+        Returns:
+            The connection.
+        """
+        executor = executor if executor is not None else get_sql_executor()
+        worker = executor.bind()
+        try:
+            connection = await executor.run(worker, connect)
+        except BaseException:
+            executor.unbind(worker)
+            raise
+        return cls(connection, executor, worker)
+
+    def _run(self, function: Callable[..., Any], *args: Any) -> Any:
+        return self.executor.run(self.worker, function, *args)
+
+    async def execute(self, sql: str, parameters: Parameters = ()) -> int:
+        return await self._run(_rowcount, self.connection.execute, sql, parameters)
+
+    async def executemany(self, sql: str, seq_of_parameters: Iterable[Parameters]) -> int:
+        return await self._run(_rowcount, self.connection.executemany, sql, list(seq_of_parameters))
+
+    async def fetchone(self, sql: str, parameters: Parameters = ()) -> Optional[Any]:
+        return await self._run(self.connection.fetchone, sql, parameters)
+
+    async def fetchall(self, sql: str, parameters: Parameters = ()) -> List[Any]:
+        return await self._run(self.connection.fetchall, sql, parameters)
+
+    async def commit(self) -> None:
+        await self._run(self.connection.commit)
+
+    async def rollback(self) -> None:
+        await self._run(self.connection.rollback)
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self._run(self.connection.close)
+        finally:
+            self.executor.unbind(self.worker)
+
+
+def _rowcount(execute: Callable[..., Any], sql: str, parameters: Any) -> int:
+    return execute(sql, parameters).rowcount
+
+
+class AsyncSQLiteConnection(ThreadedSQLConnection):
+    """
+    ThreadedSQLConnection over a SQLiteConnection.
+    """
+
+    @classmethod
+    async def connect(
+            cls,
+            database: str,
+            executor: Optional[SQLExecutor] = None,
+            statement_cache_size: int = 256,
+            **connect_options: Any
+    ) -> "AsyncSQLiteConnection":
+        """
+        Open a ``sqlite3`` database on a worker thread.
+
+        The driver's same-thread check stays enabled: thread affinity
+        guarantees every call runs on the thread that opened the connection.
+
+        Args:
+            database: The database path or URI.
+            executor: The executor to use; the shared one by default.
+            statement_cache_size: The number of prepared statements kept.
+            **connect_options: Additional ``sqlite3.connect`` arguments.
+
+        Returns:
+            The connection.
+        """
+        return await cls.open(lambda: SQLiteConnection(database, statement_cache_size, **connect_options), executor)
@@ -0,0 +1,271 @@
+"""
+Module providing columnar, array-backed query results.
+
+This module declares the ColumnarResult returned by
+``SQLConnectionProtocol.fetch_columnar`` and its RowView. Instead of one
+tuple per row, each column is kept in a single buffer: ``array.array('q')``
+for integer columns, ``array.array('d')`` for real columns and a plain list
+for text, blobs and columns containing NULL. Numeric buffers hold raw
+machine values (8 bytes per cell instead of a 28-32 byte Python object plus
+a tuple slot), and can be exposed as NumPy arrays without copying when
+NumPy is installed.
+
+Column types are inferred from the values: a column starts as the buffer
+matching its first batch and is widened ('q' to 'd', or to a list) when a
+later value does not fit.
+
+Columns are stored by position, so results with duplicate names (such as
+``SELECT a.id, b.id``) keep every column; lookups by name return the first
+column with that name.
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+Column = Union[array, List[Any]]
+
+_MISSING = object()
+
+_numpy: Any = _MISSING
+
+
+def _load_numpy() -> Any:
+    # NumPy is optional and slow to import: it is only loaded when asked for.
+    global _numpy
+    if _numpy is _MISSING:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - optional dependency
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+# Integers beyond 2**53 lose precision as doubles: they keep a list column.
+_EXACT_DOUBLE = 2 ** 53
+
+
+def _is_real(values: Sequence[Any]) -> bool:
+    types = set(map(type, values))
+    if types == {float}:
+        return True
+    if not types <= {int, float}:
+        return False
+    integers = [value for value in values if type(value) is int]
+    return -_EXACT_DOUBLE <= min(integers) and max(integers) <= _EXACT_DOUBLE
+
+
+def _new_column(values: Sequence[Any]) -> Column:
+    if set(map(type, values)) == {int}:
+        try:
+            return array("q", values)
+        except OverflowError:
+            return list(values)
+    if _is_real(values):
+        return array("d", values)
+    return list(values)
+
+
+def _extend_column(column: Column, values: Sequence[Any]) -> Column:
+    if isinstance(column, list):
+        column.extend(values)
+        return column
+
+    if column.typecode == "q" or _is_real(values):
+        length = len(column)
+        try:
+            column.extend(values)
+            return column
+        except (TypeError, OverflowError):
+            # Drop the values appended before the one that did not fit.
+            del column[length:]
+
+    if column.typecode == "q" and max(map(abs, column), default=0) <= _EXACT_DOUBLE and _is_real(values):
+        widened: Column = array("d", column.tolist())
+        widened.extend(array("d", values))
+        return widened
+
+    widened = column.tolist()
+    widened.extend(values)
+    return widened
+
+
+class RowView:
+    """
+    Lightweight view of one row of a ColumnarResult.
+
+    Values are read from the column buffers on access; columns are available
+    as attributes (``row.price``), by position (``row[2]``) or by name
+    (``row["price"]``).
+    """
+
+    __slots__ = ("_result", "_index")
+
+    def __init__(self, result: "ColumnarResult", index: int) -> None:
+        self._result = result
+        self._index = index
+
+    def __getattr__(self, name: str) -> Any:
+        result = self._result
+        try:
+            return result.data[result.positions[name]][self._index]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, key: Union[int, str]) -> Any:
+        result = self._result
+        position = key if isinstance(key, int) else result.positions[key]
+        return result.data[position][self._index]
+
+    def __len__(self) -> int:
+        return len(self._result.columns)
+
+    def __iter__(self) -> Iterator[Any]:
+        index = self._index
+        return (column[index] for column in self._result.data)
+
+    def __repr__(self) -> str:
+        return f"RowView({self.as_dict()!r})"
+
+    def as_tuple(self) -> Tuple[Any, ...]:
+        """
+        Return the row as a tuple.
+
+        Returns:
+            The values in column order.
+        """
+        return tuple(self)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return the row as a dict.
+
+        Returns:
+            A mapping of column names to values; of duplicate names, the
+            first column is kept.
+        """
+        return {name: self[name] for name in self._result.positions}
+
+
+class ColumnarResult:
+    """
+    Query result stored column by column.
+
+    Attributes:
+        columns: The column names, in select order.
+        data: The column buffers, in select order.
+        positions: A mapping of column names to their position; the first
+                   column wins when names repeat.
+    """
+
+    __slots__ = ("columns", "data", "positions", "_length")
+
+    def __init__(self, columns: Sequence[str], data: Optional[Sequence[Column]] = None) -> None:
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.data: List[Column] = list(data) if data is not None else [[] for _ in self.columns]
+        if len(self.data) != len(self.columns):
+            raise ValueError("data must have one buffer per column")
+        self.positions: Dict[str, int] = {}
+        for position, name in enumerate(self.columns):
+            self.positions.setdefault(name, position)
+        self._length = len(self.data[0]) if self.data else 0
+
+    @classmethod
+    def from_batches(cls, columns: Sequence[str], batches: Iterable[Sequence[Sequence[Any]]]) -> "ColumnarResult":
+        """
+        Build a result from batches of rows (e.g. ``fetchmany`` results).
+
+        Args:
+            columns: The column names.
+            batches: Lists of row tuples.
+
+        Returns:
+            The ColumnarResult.
+        """
+        result = cls(columns)
+        buffers: List[Optional[Column]] = [None] * len(result.columns)
+        length = 0
+
+        for rows in batches:
+            if not rows:
+                continue
+            length += len(rows)
+            for position, values in enumerate(zip(*rows)):
+                buffer = buffers[position]
+                buffers[position] = _new_column(values) if buffer is None else _extend_column(buffer, values)
+
+        result.data = [buffer if buffer is not None else [] for buffer in buffers]
+        result._length = length
+        return result
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> RowView:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("row index out of range")
+        return RowView(self, index)
+
+    def __iter__(self) -> Iterator[RowView]:
+        return (RowView(self, index) for index in range(self._length))
+
+    def column(self, name: Union[int, str]) -> Column:
+        """
+        Return the buffer of a column.
+
+        Args:
+            name: The column name, or its position.
+
+        Returns:
+            An ``array.array`` for numeric columns, else a list.
+        """
+        return self.data[name if isinstance(name, int) else self.positions[name]]
+
+    def to_numpy(self, name: Union[int, str]) -> Any:
+        """
+        Return a column as a NumPy array.
+
+        Numeric columns are wrapped without copying (the array shares the
+        ``array.array`` buffer); other columns become object arrays.
+
+        Args:
+            name: The column name, or its position.
+
+        Returns:
+            A ``numpy.ndarray``.
+
+        Raises:
+            RuntimeError: If NumPy is not installed.
+        """
+        numpy = _load_numpy()
+        if numpy is None:
+            raise RuntimeError("NumPy is not installed")
+
+        column = self.column(name)
+        if isinstance(column, array):
+            if not column:
+                return numpy.empty(0, dtype="int64" if column.typecode == "q" else "float64")
+            return numpy.frombuffer(column, dtype="int64" if column.typecode == "q" else "float64")
+        return numpy.array(column, dtype=object)
+
+    def rows(self) -> List[Tuple[Any, ...]]:
+        """
+        Materialize the result as a list of tuples.
+
+        Returns:
+            The rows.
+        """
+        return list(zip(*self.data))
+
+    def nbytes(self) -> int:
+        """
+        Return the size of the numeric buffers.
+
+        Returns:
+            The bytes held by the ``array.array`` columns (list columns are
+            not included).
+        """
+        return sum(column.itemsize * len(column) for column in self.data if isinstance(column, array))
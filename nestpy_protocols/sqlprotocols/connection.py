@@ -0,0 +1,339 @@
+"""
+Module providing the SQLConnectionProtocol execution contract and a sqlite3 connection.
+
+This module declares the SQLConnectionProtocol abstract base class, which
+describes statement execution and transactions on one database
+connection, and SQLiteConnection, its reference implementation over the
+stdlib ``sqlite3`` module.
+
+Every statement goes through the connection's StatementCache. For
+``sqlite3`` the prepared statement lives in the driver's own per-connection
+cache, which is keyed by exact text and sized by ``cached_statements``
+(128 by default on Python 3.10). SQLiteConnection hands the driver the
+normalized text and sizes the driver cache to match its own, so queries
+that differ only in layout share one compiled statement, and the hit rate
+of the driver cache can be observed.
+"""
+
+import re
+import sqlite3
+from itertools import chain, islice
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Union
+from nestpy_protocols.sqlprotocols.statements import StatementCache
+from nestpy_protocols.sqlprotocols.columnar import ColumnarResult
+
+
+Parameters = Union[Sequence[Any], dict]
+
+# A single-row INSERT with positional placeholders only: bulk_write repeats its VALUES tuple.
+_SINGLE_ROW_INSERT = re.compile(
+    r"^(\s*(?:INSERT|REPLACE)\b.*?\bVALUES\s*)(\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\))\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL
+)
+
+
+class SQLConnectionProtocol(ABC):
+    """
+    Abstract base class that defines statement execution on one connection.
+
+    A connection is used by one thread (or task) at a time; pools hand it
+    out exclusively.
+
+    Attributes:
+        max_parameters: The number of bound parameters ``bulk_write`` puts
+                        in one multi-row INSERT (999 is the lowest limit of
+                        common drivers).
+    """
+
+    max_parameters = 999
+
+    @abstractmethod
+    def execute(self, sql: str, parameters: Parameters = ()) -> Any:
+        """
+        Execute one statement.
+
+        Args:
+            sql: The statement text with placeholders.
+            parameters: The bound parameters.
+
+        Returns:
+            A DB-API cursor positioned on the result.
+        """
+
+    @abstractmethod
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Parameters]) -> Any:
+        """
+        Execute one statement for every parameter set.
+
+        Args:
+            sql: The statement text with placeholders.
+            seq_of_parameters: The parameter sets.
+
+        Returns:
+            A DB-API cursor.
+        """
+
+    @abstractmethod
+    def commit(self) -> None:
+        """
+        Commit the current transaction.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def rollback(self) -> None:
+        """
+        Roll back the current transaction.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Close the connection.
+
+        Returns:
+            None
+        """
+
+    @property
+    @abstractmethod
+    def in_transaction(self) -> bool:
+        """
+        Return whether a transaction is open.
+
+        Returns:
+            True if uncommitted changes may exist.
+        """
+
+    def fetchone(self, sql: str, parameters: Parameters = ()) -> Optional[Any]:
+        """
+        Execute a query and return its first row.
+
+        Args:
+            sql: The query text.
+            parameters: The bound parameters.
+
+        Returns:
+            The first row, or None.
+        """
+        return self.execute(sql, parameters).fetchone()
+
+    def fetchall(self, sql: str, parameters: Parameters = ()) -> List[Any]:
+        """
+        Execute a query and return every row.
+
+        Args:
+            sql: The query text.
+            parameters: The bound parameters.
+
+        Returns:
+            The list of rows.
+        """
+        return self.execute(sql, parameters).fetchall()
+
+    def stream_batches(self, sql: str, parameters: Parameters = (), batch_size: int = 1000) -> Iterator[List[Any]]:
+        """
+        Execute a query and yield its rows in batches, without loading the whole result.
+
+        Rows are pulled with ``fetchmany(batch_size)``, so memory is bounded by
+        one batch whatever the size of the result. The cursor is closed when
+        the generator is exhausted or closed.
+
+        Args:
+            sql: The query text.
+            parameters: The bound parameters.
+            batch_size: The number of rows fetched per round trip.
+
+        Yields:
+            Lists of at most ``batch_size`` rows.
+        """
+        cursor = self.execute(sql, parameters)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close()
+
+    def stream(self, sql: str, parameters: Parameters = (), batch_size: int = 1000) -> Iterator[Any]:
+        """
+        Execute a query and yield its rows one by one, fetched in batches.
+
+        Args:
+            sql: The query text.
+            parameters: The bound parameters.
+            batch_size: The number of rows fetched per round trip.
+
+        Yields:
+            The rows of the result.
+        """
+        for rows in self.stream_batches(sql, parameters, batch_size):
+            yield from rows
+
+    def fetch_columnar(self, sql: str, parameters: Parameters = (), batch_size: int = 10_000) -> ColumnarResult:
+        """
+        Execute a query and return its result column by column.
+
+        Integer and real columns are stored in ``array.array`` buffers, so
+        large numeric results take a fraction of the memory of row tuples.
+
+        Args:
+            sql: The query text.
+            parameters: The bound parameters.
+            batch_size: The number of rows fetched per round trip.
+
+        Returns:
+            The ColumnarResult.
+        """
+        cursor = self.execute(sql, parameters)
+        try:
+            columns = [description[0] for description in cursor.description or ()]
+            return ColumnarResult.from_batches(columns, iter(lambda: cursor.fetchmany(batch_size), []))
+        finally:
+            cursor.close()
+
+    def bulk_write(self, sql: str, rows: Iterable[Parameters], batch_size: int = 1000) -> int:
+        """
+        Execute a write statement for every row, in batches of one transaction.
+
+        ``rows`` may be a generator: only one batch is held in memory. A
+        single-row ``INSERT ... VALUES (?, ...)`` with positional placeholders
+        is sent as multi-row INSERTs of up to ``max_parameters`` parameters;
+        other statements use ``executemany``. The write runs in
+        ``transaction()``: any error rolls the whole write back, and inside
+        an enclosing transaction the rows are committed or rolled back with it.
+
+        Args:
+            sql: The INSERT/UPDATE/DELETE statement with placeholders.
+            rows: The parameter sets.
+            batch_size: The number of rows held in memory at a time.
+
+        Returns:
+            The number of rows written.
+        """
+        iterator = iter(rows)
+        written = 0
+
+        insert = _SINGLE_ROW_INSERT.match(sql)
+        width = per_statement = 0
+        if insert is not None:
+            width = insert.group(2).count("?") + insert.group(2).count("%s")
+            per_statement = min(batch_size, self.max_parameters // width)
+        if per_statement > 1:
+            multi_row = insert.group(1) + ", ".join([insert.group(2)] * per_statement)
+
+        with self.transaction():
+            while True:
+                batch = list(islice(iterator, batch_size))
+                if not batch:
+                    break
+                full = 0
+                # Rows are flattened into one parameter list: only when every row has the expected width.
+                if per_statement > 1 and not isinstance(batch[0], dict) and set(map(len, batch)) == {width}:
+                    full = len(batch) - len(batch) % per_statement
+                for start in range(0, full, per_statement):
+                    self.execute(multi_row, list(chain.from_iterable(batch[start:start + per_statement])))
+                if full < len(batch):
+                    self.executemany(sql, batch[full:])
+                written += len(batch)
+
+        return written
+
+    @property
+    def transaction_depth(self) -> int:
+        """
+        Return the number of ``transaction()`` blocks open on this connection.
+
+        Returns:
+            0 outside any block, 1 in an outer block, more in nested ones.
+        """
+        return self.__dict__.get("_transaction_depth", 0)
+
+    @contextmanager
+    def transaction(self) -> Iterator["SQLConnectionProtocol"]:
+        """
+        Run the enclosed statements atomically.
+
+        The outer block issues BEGIN and commits when it exits, or rolls back
+        on error. A block nested in another one, or opened while the driver
+        already has a transaction in progress, runs in a SAVEPOINT: an error
+        only undoes the statements of that block, and the enclosing
+        transaction decides whether they are committed.
+
+        Yields:
+            This connection.
+        """
+        depth = self.transaction_depth
+        savepoint = f"nestpy_savepoint_{depth}" if depth or self.in_transaction else None
+        self.execute("BEGIN" if savepoint is None else f"SAVEPOINT {savepoint}")
+        self.__dict__["_transaction_depth"] = depth + 1
+        try:
+            yield self
+        except BaseException:
+            if savepoint is None:
+                self.rollback()
+            else:
+                self.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                self.execute(f"RELEASE SAVEPOINT {savepoint}")
+            raise
+        else:
+            if savepoint is None:
+                self.commit()
+            else:
+                self.execute(f"RELEASE SAVEPOINT {savepoint}")
+        finally:
+            self.__dict__["_transaction_depth"] = depth
+
+
+class SQLiteConnection(SQLConnectionProtocol):
+    """
+    SQLConnectionProtocol over a ``sqlite3`` connection.
+
+    Args:
+        database: The database path or URI, or an open ``sqlite3.Connection``
+                  to wrap (its driver cache size is then left unchanged).
+        statement_cache_size: The number of prepared statements kept.
+        **connect_options: Additional ``sqlite3.connect`` arguments.
+    """
+
+    def __init__(
+            self,
+            database: Union[str, sqlite3.Connection],
+            statement_cache_size: int = 256,
+            **connect_options: Any
+    ) -> None:
+        if isinstance(database, sqlite3.Connection):
+            self.connection = database
+        else:
+            connect_options.setdefault("cached_statements", statement_cache_size)
+            self.connection = sqlite3.connect(database, **connect_options)
+        self.statements = StatementCache(statement_cache_size)
+
+    def execute(self, sql: str, parameters: Parameters = ()) -> sqlite3.Cursor:
+        return self.connection.execute(self.statements.get(sql), parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Parameters]) -> sqlite3.Cursor:
+        return self.connection.executemany(self.statements.get(sql), seq_of_parameters)
+
+    def commit(self) -> None:
+        self.connection.commit()
+
+    def rollback(self) -> None:
+        self.connection.rollback()
+
+    def close(self) -> None:
+        self.statements.clear()
+        self.connection.close()
+
+    @property
+    def in_transaction(self) -> bool:
+        return self.connection.in_transaction
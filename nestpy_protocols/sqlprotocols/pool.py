@@ -0,0 +1,694 @@
+"""
+Module providing the database connection pool contracts and reference pools.
+
+This module declares the ConnectionPoolProtocol and
+AsyncConnectionPoolProtocol abstract base classes, generic ConnectionPool
+(threads) and AsyncConnectionPool (asyncio) implementations built on a
+connection factory, and SQLiteConnectionPool / AsyncSQLiteConnectionPool
+over the stdlib ``sqlite3`` module.
+
+Pools keep between ``min_size`` and ``max_size`` connections. Idle
+connections are reused most-recently-released first, so the surplus stays
+idle and is closed once it exceeds ``idle_timeout``. A borrowed connection
+can be health-checked first; a failing one is replaced transparently.
+Callers wait in a queue when every connection is in use, and the wait is
+recorded in PoolMetrics.
+"""
+
+import time
+import sqlite3
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class PoolTimeoutError(RuntimeError):
+    """
+    Raised when no connection became available within the acquire timeout.
+    """
+
+
+class PoolClosedError(RuntimeError):
+    """
+    Raised when a connection is requested from a closed pool.
+    """
+
+
+@dataclass
+class PoolMetrics:
+    """
+    Connection and wait-queue counters of a pool.
+
+    Attributes:
+        acquired: Connections handed out.
+        created: Connections opened.
+        closed: Connections closed (idle timeout, failed checks, discards, close).
+        failed_checks: Borrowed connections that failed the health check.
+        waits: Acquisitions that had to wait for a connection.
+        wait_time: Total seconds spent waiting.
+        max_wait_time: The longest single wait, in seconds.
+        timeouts: Acquisitions that gave up after their timeout.
+    """
+
+    acquired: int = 0
+    created: int = 0
+    closed: int = 0
+    failed_checks: int = 0
+    waits: int = 0
+    wait_time: float = 0.0
+    max_wait_time: float = 0.0
+    timeouts: int = 0
+
+    @property
+    def mean_wait_time(self) -> float:
+        """
+        Return the mean wait of the acquisitions that waited.
+
+        Returns:
+            Seconds, or 0 if no acquisition waited.
+        """
+        return self.wait_time / self.waits if self.waits else 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        """
+        Record one acquisition that waited.
+
+        Args:
+            seconds: The time spent waiting.
+
+        Returns:
+            None
+        """
+        self.waits += 1
+        self.wait_time += seconds
+        self.max_wait_time = max(self.max_wait_time, seconds)
+
+
+class ConnectionPoolProtocol(ABC):
+    """
+    Abstract base class that defines the interface of a thread-safe connection pool.
+
+    Every ``acquire`` must be paired with a ``release``; the ``connection``
+    context manager does both.
+    """
+
+    @abstractmethod
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """
+        Borrow a connection, waiting if every connection is in use.
+
+        Args:
+            timeout: Seconds to wait for a connection (None waits forever).
+
+        Returns:
+            A DB-API connection.
+
+        Raises:
+            PoolTimeoutError: If no connection became available in time.
+            PoolClosedError: If the pool is closed.
+        """
+
+    @abstractmethod
+    def release(self, connection: Any, discard: bool = False) -> None:
+        """
+        Return a borrowed connection to the pool.
+
+        Args:
+            connection: The connection returned by ``acquire``.
+            discard: Close the connection instead of reusing it (e.g. after
+                     a connection-level error).
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Close the idle connections and refuse further acquisitions.
+
+        Connections still borrowed are closed when they are released.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the pool gauges and counters.
+
+        Returns:
+            A mapping with size, idle, in_use and waiting gauges and the
+            PoolMetrics counters.
+        """
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Borrow a connection for the duration of a ``with`` block.
+
+        Args:
+            timeout: Seconds to wait for a connection.
+
+        Yields:
+            A DB-API connection, released when the block exits.
+        """
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+
+class AsyncConnectionPoolProtocol(ABC):
+    """
+    Abstract base class that defines the interface of an asyncio connection pool.
+    """
+
+    @abstractmethod
+    async def acquire(self, timeout: Optional[float] = None) -> Any:
+        """
+        Borrow a connection, waiting if every connection is in use.
+
+        Args:
+            timeout: Seconds to wait for a connection (None waits forever).
+
+        Returns:
+            A connection.
+
+        Raises:
+            PoolTimeoutError: If no connection became available in time.
+            PoolClosedError: If the pool is closed.
+        """
+
+    @abstractmethod
+    async def release(self, connection: Any, discard: bool = False) -> None:
+        """
+        Return a borrowed connection to the pool.
+
+        Args:
+            connection: The connection returned by ``acquire``.
+            discard: Close the connection instead of reusing it.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    async def close(self) -> None:
+        """
+        Close the idle connections and refuse further acquisitions.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the pool gauges and counters.
+
+        Returns:
+            A mapping with size, idle, in_use and waiting gauges and the
+            PoolMetrics counters.
+        """
+
+    @asynccontextmanager
+    async def connection(self, timeout: Optional[float] = None) -> AsyncIterator[Any]:
+        """
+        Borrow a connection for the duration of an ``async with`` block.
+
+        Args:
+            timeout: Seconds to wait for a connection.
+
+        Yields:
+            A connection, released when the block exits.
+        """
+        connection = await self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            await self.release(connection)
+
+
+def _stats(size: int, idle: int, waiting: int, metrics: PoolMetrics) -> Dict[str, Any]:
+    return {
+        "size": size,
+        "idle": idle,
+        "in_use": size - idle,
+        "waiting": waiting,
+        "acquired": metrics.acquired,
+        "created": metrics.created,
+        "closed": metrics.closed,
+        "failed_checks": metrics.failed_checks,
+        "waits": metrics.waits,
+        "mean_wait_time": metrics.mean_wait_time,
+        "max_wait_time": metrics.max_wait_time,
+        "timeouts": metrics.timeouts,
+    }
+
+
+class ConnectionPool(ConnectionPoolProtocol):
+    """
+    Thread-safe pool over a connection factory.
+
+    Args:
+        connect: Callable opening a new connection.
+        min_size: Connections opened up front and never closed for idleness.
+        max_size: The maximum number of open connections.
+        idle_timeout: Seconds an idle connection above ``min_size`` is kept.
+        check: Callable returning whether a connection is usable, run on
+               borrow (None disables health checks).
+        check_after: Only check connections idle for at least this many seconds.
+        reset: Callable run on every released connection (e.g. rollback).
+        close_connection: Callable closing a connection (defaults to ``.close()``).
+    """
+
+    def __init__(
+            self,
+            connect: Callable[[], Any],
+            min_size: int = 0,
+            max_size: int = 10,
+            idle_timeout: float = 300.0,
+            check: Optional[Callable[[Any], bool]] = None,
+            check_after: float = 0.0,
+            reset: Optional[Callable[[Any], None]] = None,
+            close_connection: Optional[Callable[[Any], None]] = None
+    ) -> None:
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._check = check
+        self.check_after = check_after
+        self._reset = reset
+        self._close = close_connection or (lambda connection: connection.close())
+        self.metrics = PoolMetrics()
+
+        self._condition = threading.Condition(threading.Lock())
+        # (connection, released_at); the end of the list is the most recent.
+        self._idle: List[Tuple[Any, float]] = []
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+
+        for _ in range(min_size):
+            self._idle.append((self._open(), time.monotonic()))
+            self._size += 1
+
+    def _open(self) -> Any:
+        connection = self._connect()
+        self.metrics.created += 1
+        return connection
+
+    def _discard(self, connection: Any) -> None:
+        try:
+            self._close(connection)
+        finally:
+            self.metrics.closed += 1
+
+    def _expired_locked(self, now: float) -> List[Any]:
+        # Idle connections above min_size released more than idle_timeout ago
+        # (the oldest are at the start of the list).
+        expired = []
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            expired.append(self._idle.pop(0)[0])
+            self._size -= 1
+        return expired
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        started = time.monotonic()
+        waited = False
+
+        while True:
+            expired: List[Any] = []
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise PoolClosedError("The connection pool is closed")
+
+                    now = time.monotonic()
+                    expired = self._expired_locked(now)
+                    if self._idle:
+                        connection, released_at = self._idle.pop()
+                        create = False
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        connection, released_at, create = None, now, True
+                        break
+
+                    remaining = None if timeout is None else timeout - (now - started)
+                    if remaining is not None and remaining <= 0:
+                        self.metrics.timeouts += 1
+                        raise PoolTimeoutError(f"No connection available within {timeout} seconds")
+                    waited = True
+                    self._waiting += 1
+                    try:
+                        self._condition.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+            for stale in expired:
+                self._discard(stale)
+
+            if create:
+                try:
+                    connection = self._open()
+                except BaseException:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+            elif self._check is not None and time.monotonic() - released_at >= self.check_after \
+                    and not self._healthy(connection):
+                self.metrics.failed_checks += 1
+                self._discard(connection)
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                continue
+
+            self.metrics.acquired += 1
+            if waited:
+                self.metrics.record_wait(time.monotonic() - started)
+            return connection
+
+    def _healthy(self, connection: Any) -> bool:
+        try:
+            return bool(self._check(connection))
+        except Exception:
+            return False
+
+    def release(self, connection: Any, discard: bool = False) -> None:
+        if not discard and self._reset is not None:
+            try:
+                self._reset(connection)
+            except Exception:
+                discard = True
+
+        with self._condition:
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((connection, time.monotonic()))
+                connection = None
+            self._condition.notify()
+
+        if connection is not None:
+            self._discard(connection)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+
+        for connection in idle:
+            self._discard(connection)
+
+    def evict_idle(self) -> int:
+        """
+        Close the idle connections above ``min_size`` that exceeded ``idle_timeout``.
+
+        Acquisitions already do this; call it periodically to shrink a pool
+        that is not used at all.
+
+        Returns:
+            The number of connections closed.
+        """
+        with self._condition:
+            expired = self._expired_locked(time.monotonic())
+
+        for connection in expired:
+            self._discard(connection)
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return _stats(self._size, len(self._idle), self._waiting, self.metrics)
+
+
+class AsyncConnectionPool(AsyncConnectionPoolProtocol):
+    """
+    Asyncio pool over an async connection factory, for a single event loop.
+
+    Args:
+        connect: Coroutine function opening a new connection.
+        min_size: Connections kept open regardless of idleness (opened lazily).
+        max_size: The maximum number of open connections.
+        idle_timeout: Seconds an idle connection above ``min_size`` is kept.
+        check: Coroutine function returning whether a connection is usable,
+               awaited on borrow (None disables health checks).
+        check_after: Only check connections idle for at least this many seconds.
+        reset: Coroutine function run on every released connection.
+        close_connection: Coroutine function closing a connection.
+    """
+
+    def __init__(
+            self,
+            connect: Callable[[], Awaitable[Any]],
+            min_size: int = 0,
+            max_size: int = 10,
+            idle_timeout: float = 300.0,
+            check: Optional[Callable[[Any], Awaitable[bool]]] = None,
+            check_after: float = 0.0,
+            reset: Optional[Callable[[Any], Awaitable[None]]] = None,
+            close_connection: Optional[Callable[[Any], Awaitable[None]]] = None
+    ) -> None:
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._check = check
+        self.check_after = check_after
+        self._reset = reset
+        self._close = close_connection
+        self.metrics = PoolMetrics()
+
+        self._idle: List[Tuple[Any, float]] = []
+        self._waiters: "List[asyncio.Future[None]]" = []
+        self._size = 0
+        self._closed = False
+
+    async def _discard(self, connection: Any) -> None:
+        try:
+            if self._close is not None:
+                await self._close(connection)
+            else:
+                connection.close()
+        finally:
+            self.metrics.closed += 1
+
+    def _wake_one(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.pop(0)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def acquire(self, timeout: Optional[float] = None) -> Any:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        waited = False
+
+        while True:
+            if self._closed:
+                raise PoolClosedError("The connection pool is closed")
+
+            now = time.monotonic()
+            while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+                self._size -= 1
+                await self._discard(self._idle.pop(0)[0])
+
+            if self._idle:
+                connection, released_at = self._idle.pop()
+                if self._check is not None and now - released_at >= self.check_after:
+                    try:
+                        healthy = await self._check(connection)
+                    except Exception:
+                        healthy = False
+                    if not healthy:
+                        self.metrics.failed_checks += 1
+                        self._size -= 1
+                        await self._discard(connection)
+                        continue
+                break
+
+            if self._size < self.max_size:
+                self._size += 1
+                try:
+                    connection = await self._connect()
+                except BaseException:
+                    self._size -= 1
+                    self._wake_one()
+                    raise
+                self.metrics.created += 1
+                break
+
+            remaining = None if timeout is None else timeout - (loop.time() - started)
+            if remaining is not None and remaining <= 0:
+                self.metrics.timeouts += 1
+                raise PoolTimeoutError(f"No connection available within {timeout} seconds")
+
+            waited = True
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                continue
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Pass the wake-up on rather than losing it.
+                    self._wake_one()
+                raise
+
+        self.metrics.acquired += 1
+        if waited:
+            self.metrics.record_wait(loop.time() - started)
+        return connection
+
+    async def release(self, connection: Any, discard: bool = False) -> None:
+        if not discard and self._reset is not None:
+            try:
+                await self._reset(connection)
+            except Exception:
+                discard = True
+
+        if discard or self._closed:
+            self._size -= 1
+            await self._discard(connection)
+        else:
+            self._idle.append((connection, time.monotonic()))
+        self._wake_one()
+
+    async def close(self) -> None:
+        self._closed = True
+        idle, self._idle = self._idle, []
+        self._size -= len(idle)
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        for connection, _ in idle:
+            await self._discard(connection)
+
+    def stats(self) -> Dict[str, Any]:
+        return _stats(self._size, len(self._idle), sum(not waiter.done() for waiter in self._waiters), self.metrics)
+
+
+def _sqlite_check(connection: sqlite3.Connection) -> bool:
+    connection.execute("SELECT 1").fetchone()
+    return True
+
+
+def _sqlite_reset(connection: sqlite3.Connection) -> None:
+    if connection.in_transaction:
+        connection.rollback()
+
+
+class SQLiteConnectionPool(ConnectionPool):
+    """
+    ConnectionPool of ``sqlite3`` connections shareable across threads.
+
+    Connections are opened with ``check_same_thread=False`` (one thread uses
+    a connection at a time, which the pool guarantees), checked with
+    ``SELECT 1`` on borrow and rolled back on release if a transaction was
+    left open. Each connection to ':memory:' is a separate database; use a
+    file or a shared-cache URI to share data between pooled connections.
+
+    Args:
+        database: The database path or URI.
+        min_size: Connections opened up front.
+        max_size: The maximum number of open connections.
+        idle_timeout: Seconds an idle connection above ``min_size`` is kept.
+        check_after: Only check connections idle for at least this many seconds.
+        **connect_options: Additional ``sqlite3.connect`` arguments.
+    """
+
+    def __init__(
+            self,
+            database: str,
+            min_size: int = 0,
+            max_size: int = 10,
+            idle_timeout: float = 300.0,
+            check_after: float = 1.0,
+            **connect_options: Any
+    ) -> None:
+        self.database = database
+        connect_options.setdefault("check_same_thread", False)
+        super().__init__(
+            lambda: sqlite3.connect(database, **connect_options),
+            min_size=min_size,
+            max_size=max_size,
+            idle_timeout=idle_timeout,
+            check=_sqlite_check,
+            check_after=check_after,
+            reset=_sqlite_reset
+        )
+
+
+class AsyncSQLiteConnectionPool(AsyncConnectionPool):
+    """
+    AsyncConnectionPool of ``sqlite3`` connections opened in the default executor.
+
+    The pool only manages connections; statements run on them still block,
+    so callers should execute them in a thread (see the async SQL contract).
+
+    Args:
+        database: The database path or URI.
+        min_size: Connections kept open regardless of idleness.
+        max_size: The maximum number of open connections.
+        idle_timeout: Seconds an idle connection above ``min_size`` is kept.
+        check_after: Only check connections idle for at least this many seconds.
+        **connect_options: Additional ``sqlite3.connect`` arguments.
+    """
+
+    def __init__(
+            self,
+            database: str,
+            min_size: int = 0,
+            max_size: int = 10,
+            idle_timeout: float = 300.0,
+            check_after: float = 1.0,
+            **connect_options: Any
+    ) -> None:
+        self.database = database
+        connect_options.setdefault("check_same_thread", False)
+
+        async def connect() -> sqlite3.Connection:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, lambda: sqlite3.connect(database, **connect_options)
+            )
+
+        async def check(connection: sqlite3.Connection) -> bool:
+            return _sqlite_check(connection)
+
+        async def reset(connection: sqlite3.Connection) -> None:
+            _sqlite_reset(connection)
+
+        async def close_connection(connection: sqlite3.Connection) -> None:
+            connection.close()
+
+        super().__init__(
+            connect,
+            min_size=min_size,
+            max_size=max_size,
+            idle_timeout=idle_timeout,
+            check=check,
+            check_after=check_after,
+            reset=reset,
+            close_connection=close_connection
+        )
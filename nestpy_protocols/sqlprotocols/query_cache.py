@@ -0,0 +1,413 @@
+"""
+Module providing the tag-based query result cache and the caching connection.
+
+This module declares QueryCache, a thread-safe store of query results
+bounded by entry count and by bytes (least recently used entries are
+evicted first), and CachingConnection, a SQLConnectionProtocol wrapper
+that serves ``fetchall`` from it.
+
+Every cached result is tagged with the tables its query reads (the names
+after FROM and JOIN, or explicit ``tags``). Writes made through a
+CachingConnection (including a ``fetchall`` of a statement with
+RETURNING) invalidate the entries tagged with the tables they touch,
+both when the statement runs and when its transaction commits, so
+results cached by other connections before the commit are dropped too.
+Statements whose target cannot be determined invalidate the whole cache.
+A result is only stored if none of its tags was invalidated while the
+query ran, so a slow read cannot put back data a concurrent write
+replaced.
+
+Queries over views, or tables changed by triggers, cascades or other
+processes, need explicit ``tags`` (or ``QueryCache.invalidate``, or a
+``ttl``): the cache only sees the statements that go through it.
+"""
+
+import re
+import sys
+import time
+import threading
+from functools import lru_cache
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, List, Optional, Set, Tuple
+from nestpy_protocols.sqlprotocols.connection import Parameters, SQLConnectionProtocol
+from nestpy_protocols.sqlprotocols.routing import is_read_only
+
+
+QueryKey = Tuple[str, Hashable]
+
+ALL_TABLES = "*"
+
+_NAME = r'[\w."`\[\]]+'
+
+# An optional alias after a table name, which must not be the clause keyword that follows it.
+_ALIAS = (
+    r"(?:\s+(?:AS\s+)?(?!(?:WHERE|JOIN|ON|USING|GROUP|ORDER|LIMIT|UNION|INNER|LEFT|RIGHT|FULL|CROSS|NATURAL|"
+    r"WINDOW|HAVING|EXCEPT|INTERSECT)\b)\w+)?"
+)
+
+_READ_TABLES = re.compile(rf"\b(?:FROM|JOIN)\s+({_NAME}{_ALIAS}(?:\s*,\s*{_NAME}{_ALIAS})*)", re.IGNORECASE)
+
+_WRITE_TABLE = re.compile(
+    rf"^\s*(?:(?:INSERT|REPLACE)(?:\s+OR\s+\w+)?\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM|"
+    rf"(?:DROP|ALTER)\s+TABLE(?:\s+IF\s+EXISTS)?)\s+({_NAME})",
+    re.IGNORECASE
+)
+
+# Data-modifying clauses anywhere in a statement, for writes following a WITH clause.
+_WRITE_CLAUSE = re.compile(
+    rf"\b(?:(?:INSERT|REPLACE)(?:\s+OR\s+\w+)?\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+(?!SET\b)({_NAME})",
+    re.IGNORECASE
+)
+
+_TRANSACTION_CONTROL = re.compile(r"^\s*(BEGIN|SAVEPOINT|RELEASE|ROLLBACK|COMMIT|END)\b", re.IGNORECASE)
+
+_LEADING_COMMENTS = re.compile(r"(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*", re.DOTALL)
+
+
+def _table(name: str) -> str:
+    # "main"."Items" and items are the same tag: quotes, schema and case are dropped.
+    return name.rsplit(".", 1)[-1].strip('"`[]').lower()
+
+
+def read_tables(sql: str) -> FrozenSet[str]:
+    """
+    Return the tables a query reads.
+
+    Args:
+        sql: The query text.
+
+    Returns:
+        The lowercase names following FROM and JOIN (comma joins included).
+    """
+    tables: Set[str] = set()
+    for match in _READ_TABLES.finditer(sql):
+        for item in match.group(1).split(","):
+            tables.add(_table(item.split()[0]))
+    return frozenset(tables)
+
+
+def write_tables(sql: str) -> Optional[FrozenSet[str]]:
+    """
+    Return the tables a statement changes.
+
+    Args:
+        sql: The statement text.
+
+    Returns:
+        The lowercase table names; an empty set for reads and transaction
+        control; None when the statement writes but its tables are unknown.
+    """
+    sql = sql[_LEADING_COMMENTS.match(sql).end():]
+    match = _WRITE_TABLE.match(sql)
+    if match is not None:
+        return frozenset((_table(match.group(1)),))
+    if sql[:4].upper() == "WITH":
+        tables = frozenset(_table(match.group(1)) for match in _WRITE_CLAUSE.finditer(sql))
+        if tables:
+            return tables
+    if is_read_only(sql) or _TRANSACTION_CONTROL.match(sql):
+        return frozenset()
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _query_tags(sql: str) -> Optional[FrozenSet[str]]:
+    # Parsed once per statement text: the tags of a cacheable query, or None.
+    statement = sql[_LEADING_COMMENTS.match(sql).end():]
+    return read_tables(statement) if is_read_only(statement) else None
+
+
+@lru_cache(maxsize=1024)
+def _statement_writes(sql: str) -> Optional[FrozenSet[str]]:
+    return write_tables(sql)
+
+
+def _size(rows: Tuple[Any, ...]) -> int:
+    getsizeof = sys.getsizeof
+    return getsizeof(rows) + sum(getsizeof(row) + sum(map(getsizeof, row)) for row in rows)
+
+
+class QueryCache:
+    """
+    Thread-safe store of query results with tag invalidation and LRU eviction by bytes.
+
+    Args:
+        max_bytes: The maximum estimated size of the cached rows; a single
+                   result larger than this is never cached.
+        max_entries: The maximum number of cached results.
+        ttl: Seconds a result stays fresh; None keeps it until it is
+             invalidated or evicted.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_entries: int = 4096, ttl: Optional[float] = None) -> None:
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[QueryKey, Tuple[Tuple[Any, ...], FrozenSet[str], int, float]]" = OrderedDict()
+        self._tags: Dict[str, Set[QueryKey]] = {}
+        self._versions: Dict[str, int] = {}
+        self._generation = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: QueryKey) -> Optional[Tuple[Any, ...]]:
+        """
+        Return fresh cached rows and mark them as recently used.
+
+        Args:
+            key: The query key (text and parameters).
+
+        Returns:
+            The rows, or None on a miss or an expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[3] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def version(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        """
+        Return the invalidation version of tags, to pass to ``put``.
+
+        Read it before running the query whose result will be stored.
+
+        Args:
+            tags: The tags of the query.
+
+        Returns:
+            An opaque version.
+        """
+        with self._lock:
+            return (self._generation,) + tuple(self._versions.get(tag, 0) for tag in sorted(tags))
+
+    def put(self, key: QueryKey, rows: Iterable[Any], tags: Iterable[str], version: Optional[Tuple[int, ...]] = None) -> bool:
+        """
+        Store rows, evicting least recently used entries to stay in bounds.
+
+        Args:
+            key: The query key (text and parameters).
+            rows: The rows.
+            tags: The tables the rows were read from.
+            version: The ``version(tags)`` read before the query ran; the rows
+                     are dropped if one of the tags was invalidated since.
+
+        Returns:
+            True if the rows were stored.
+        """
+        rows = tuple(rows)
+        tags = frozenset(tags)
+        size = _size(rows)
+        if size > self.max_bytes:
+            return False
+        expires = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+
+        with self._lock:
+            if version is not None and version != (self._generation,) + tuple(self._versions.get(tag, 0) for tag in sorted(tags)):
+                return False
+
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (rows, tags, size, expires)
+            self.bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            while self.bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+        return True
+
+    def _remove(self, key: QueryKey) -> None:
+        _, tags, size, _ = self._entries.pop(key)
+        self.bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        """
+        Drop every entry tagged with one of the tags.
+
+        Args:
+            tags: Table names; ``ALL_TABLES`` drops every entry.
+
+        Returns:
+            The number of entries dropped.
+        """
+        with self._lock:
+            tags = set(tags)
+            if ALL_TABLES in tags:
+                self._generation += 1
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._tags.clear()
+                self.bytes = 0
+            else:
+                keys: Set[QueryKey] = set()
+                for tag in tags:
+                    self._versions[tag] = self._versions.get(tag, 0) + 1
+                    keys.update(self._tags.get(tag, ()))
+                for key in keys:
+                    self._remove(key)
+                dropped = len(keys)
+            self.invalidations += dropped
+            return dropped
+
+    def clear(self) -> None:
+        """
+        Drop every entry (counters are kept).
+
+        Returns:
+            None
+        """
+        self.invalidate((ALL_TABLES,))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the counters of the cache.
+
+        Returns:
+            A JSON-serializable mapping of entries, bytes, hits, misses,
+            evictions, invalidations and hit ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class CachingConnection(SQLConnectionProtocol):
+    """
+    SQLConnectionProtocol serving ``fetchall`` from a QueryCache.
+
+    Several connections (e.g. one per pooled connection) can share one
+    cache: a write through any of them invalidates the others' entries.
+    Within a transaction, reads of the tables it wrote bypass the cache so
+    uncommitted rows are neither served to nor stored for other callers.
+
+    Args:
+        connection: The wrapped connection.
+        cache: The shared QueryCache.
+        tables: Only cache queries reading these tables (e.g. reference
+                data); every read-only query when None.
+    """
+
+    def __init__(
+            self,
+            connection: SQLConnectionProtocol,
+            cache: QueryCache,
+            tables: Optional[Iterable[str]] = None
+    ) -> None:
+        self.connection = connection
+        self.cache = cache
+        self.tables = frozenset(map(_table, tables)) if tables is not None else None
+        self._dirty: Set[str] = set()
+
+    def _wrote(self, sql: str) -> None:
+        tables = _statement_writes(sql)
+        if tables is None:
+            tables = frozenset((ALL_TABLES,))
+        elif not tables:
+            # COMMIT, END, ROLLBACK or the release of the outer savepoint ended the transaction.
+            if self._dirty and not self.connection.in_transaction:
+                self._flush()
+            return
+        self.cache.invalidate(tables)
+        # In autocommit mode the write is already committed: nothing is left to hide from the cache.
+        if self.connection.in_transaction:
+            self._dirty.update(tables)
+
+    def _flush(self) -> None:
+        if self._dirty:
+            dirty, self._dirty = self._dirty, set()
+            self.cache.invalidate(dirty)
+
+    def execute(self, sql: str, parameters: Parameters = ()) -> Any:
+        cursor = self.connection.execute(sql, parameters)
+        self._wrote(sql)
+        return cursor
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Parameters]) -> Any:
+        cursor = self.connection.executemany(sql, seq_of_parameters)
+        self._wrote(sql)
+        return cursor
+
+    def commit(self) -> None:
+        self.connection.commit()
+        self._flush()
+
+    def rollback(self) -> None:
+        self.connection.rollback()
+        self._dirty.clear()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    @property
+    def in_transaction(self) -> bool:
+        return self.connection.in_transaction
+
+    def fetchall(self, sql: str, parameters: Parameters = (), tags: Optional[Iterable[str]] = None) -> List[Any]:
+        """
+        Execute a query and return every row, from the cache when possible.
+
+        Args:
+            sql: The query text.
+            parameters: The bound parameters.
+            tags: The tables the query depends on; read from the query text
+                  when omitted.
+
+        Returns:
+            The list of rows.
+        """
+        query_tags = _query_tags(sql)
+        if query_tags is None:
+            # A write (e.g. with RETURNING): it invalidates like ``execute``.
+            rows = self.connection.execute(sql, parameters).fetchall()
+            self._wrote(sql)
+            return rows
+
+        tags = frozenset(map(_table, tags)) if tags is not None else query_tags
+        if (
+                not tags
+                or (self.tables is not None and not tags <= self.tables)
+                or (self._dirty and (ALL_TABLES in self._dirty or not self._dirty.isdisjoint(tags)))
+        ):
+            return self.connection.execute(sql, parameters).fetchall()
+
+        key = (sql, tuple(sorted(parameters.items())) if isinstance(parameters, dict) else tuple(parameters))
+        try:
+            rows = self.cache.get(key)
+        except TypeError:
+            # Unhashable parameters: not cacheable.
+            return self.connection.execute(sql, parameters).fetchall()
+        if rows is not None:
+            return list(rows)
+
+        version = self.cache.version(tags)
+        rows = self.connection.execute(sql, parameters).fetchall()
+        self.cache.put(key, rows, tags, version)
+        return rows
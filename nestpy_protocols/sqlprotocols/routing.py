@@ -0,0 +1,294 @@
+"""
+Module providing read/write splitting across a primary and its replicas.
+
+This module declares ReplicaRouter (connection pools used from threads)
+and AsyncReplicaRouter (asyncio pools). Writes always go to the primary.
+Reads go to the replica with the fewest outstanding reads (ties rotate),
+except during ``sticky_window`` seconds after a write made in the same
+request context: those reads go to the primary so a request always sees
+its own writes despite replication lag.
+
+The request context is a ``contextvars`` variable: asyncio tasks and
+threads each have their own. Adapters that reuse threads or tasks across
+requests should wrap every request in ``request_scope()`` so stickiness
+does not leak from one request to the next.
+"""
+
+import re
+import time
+import asyncio
+import threading
+from contextvars import ContextVar
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+from nestpy_protocols.sqlprotocols.pool import AsyncConnectionPoolProtocol, ConnectionPoolProtocol
+
+
+_last_write: ContextVar[Optional[float]] = ContextVar("nestpy_sql_last_write", default=None)
+
+_READ_ONLY = re.compile(r"^\s*(?:SELECT|EXPLAIN|VALUES)\b", re.IGNORECASE)
+
+_WRITE_KEYWORDS = re.compile(r"\b(?:INSERT|UPDATE|DELETE|REPLACE|UPSERT)\b", re.IGNORECASE)
+
+_ROW_LOCKS = re.compile(
+    r"\bFOR\s+(?:NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b|\bLOCK\s+IN\s+SHARE\s+MODE\b", re.IGNORECASE
+)
+
+
+def is_read_only(sql: str) -> bool:
+    """
+    Return whether a statement can run on a replica.
+
+    SELECT, EXPLAIN and VALUES statements are reads, as are WITH statements
+    without a data-modifying keyword; anything else goes to the primary.
+    Locking reads (``SELECT ... FOR UPDATE``, ``FOR SHARE``, ``LOCK IN SHARE
+    MODE``) go to the primary too: row locks only exist there.
+
+    Args:
+        sql: The statement text.
+
+    Returns:
+        True for read-only statements.
+    """
+    if _ROW_LOCKS.search(sql):
+        return False
+    if _READ_ONLY.match(sql):
+        return True
+    return sql.lstrip()[:4].upper() == "WITH" and not _WRITE_KEYWORDS.search(sql)
+
+
+class _ReplicaSet:
+    def __init__(self, primary: Any, replicas: Sequence[Any], sticky_window: float) -> None:
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.sticky_window = sticky_window
+        self.outstanding: List[int] = [0] * len(self.replicas)
+        self._lock = threading.Lock()
+        self._next = 0
+
+        self.writes = 0
+        self.primary_reads = 0
+        self.replica_reads: List[int] = [0] * len(self.replicas)
+
+    @contextmanager
+    def request_scope(self) -> Iterator[None]:
+        """
+        Start a fresh request context: earlier writes no longer pin reads to the primary.
+
+        Yields:
+            None
+        """
+        token = _last_write.set(None)
+        try:
+            yield
+        finally:
+            _last_write.reset(token)
+
+    def mark_write(self) -> None:
+        """
+        Pin the reads of the current request context to the primary for ``sticky_window``.
+
+        Returns:
+            None
+        """
+        _last_write.set(time.monotonic())
+
+    def _pick(self) -> Optional[int]:
+        last_write = _last_write.get()
+        if not self.replicas or (last_write is not None and time.monotonic() - last_write < self.sticky_window):
+            with self._lock:
+                self.primary_reads += 1
+            return None
+
+        with self._lock:
+            count = len(self.replicas)
+            start = self._next
+            self._next = (start + 1) % count
+            best = min(range(start, start + count), key=lambda position: self.outstanding[position % count]) % count
+            self.outstanding[best] += 1
+            self.replica_reads[best] += 1
+        return best
+
+    def _wrote(self) -> None:
+        with self._lock:
+            self.writes += 1
+        self.mark_write()
+
+    def _done(self, index: int) -> None:
+        with self._lock:
+            self.outstanding[index] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the routing counters.
+
+        Returns:
+            A mapping of writes, primary reads, and per-replica reads and
+            outstanding gauges.
+        """
+        return {
+            "writes": self.writes,
+            "primary_reads": self.primary_reads,
+            "replica_reads": list(self.replica_reads),
+            "outstanding": list(self.outstanding),
+        }
+
+
+class ReplicaRouter(_ReplicaSet):
+    """
+    Route statements between a primary pool and replica pools.
+
+    Args:
+        primary: The pool of the primary node.
+        replicas: The pools of the replica nodes (may be empty).
+        sticky_window: Seconds during which the reads of a request context
+                       stay on the primary after it wrote.
+    """
+
+    def __init__(
+            self,
+            primary: ConnectionPoolProtocol,
+            replicas: Sequence[ConnectionPoolProtocol] = (),
+            sticky_window: float = 5.0
+    ) -> None:
+        super().__init__(primary, replicas, sticky_window)
+
+    @contextmanager
+    def read(self) -> Iterator[Any]:
+        """
+        Borrow a connection for reads.
+
+        Yields:
+            A connection of the least busy replica, or of the primary when the
+            request context wrote recently or there is no replica.
+        """
+        index = self._pick()
+        if index is None:
+            with self.primary.connection() as connection:
+                yield connection
+            return
+
+        try:
+            with self.replicas[index].connection() as connection:
+                yield connection
+        finally:
+            self._done(index)
+
+    @contextmanager
+    def write(self) -> Iterator[Any]:
+        """
+        Borrow a primary connection for a transaction.
+
+        The transaction is committed when the block exits, or rolled back on
+        error, and the request context is pinned to the primary.
+
+        Yields:
+            A connection of the primary.
+        """
+        self._wrote()
+        with self.primary.connection() as connection:
+            try:
+                yield connection
+            except BaseException:
+                connection.rollback()
+                raise
+            connection.commit()
+        self.mark_write()
+
+    def fetchall(self, sql: str, parameters: Any = ()) -> List[Any]:
+        """
+        Run a query and return every row, routed by statement type.
+
+        Args:
+            sql: The statement text.
+            parameters: The bound parameters.
+
+        Returns:
+            The rows.
+        """
+        if not is_read_only(sql):
+            with self.write() as connection:
+                return connection.execute(sql, parameters).fetchall()
+        with self.read() as connection:
+            return connection.execute(sql, parameters).fetchall()
+
+    def execute(self, sql: str, parameters: Any = ()) -> int:
+        """
+        Run a write statement in its own transaction on the primary.
+
+        Args:
+            sql: The statement text.
+            parameters: The bound parameters.
+
+        Returns:
+            The number of affected rows.
+        """
+        with self.write() as connection:
+            return connection.execute(sql, parameters).rowcount
+
+
+class AsyncReplicaRouter(_ReplicaSet):
+    """
+    Route statements between asyncio primary and replica pools.
+
+    Args:
+        primary: The pool of the primary node.
+        replicas: The pools of the replica nodes (may be empty).
+        sticky_window: Seconds during which the reads of a request context
+                       stay on the primary after it wrote.
+    """
+
+    def __init__(
+            self,
+            primary: AsyncConnectionPoolProtocol,
+            replicas: Sequence[AsyncConnectionPoolProtocol] = (),
+            sticky_window: float = 5.0
+    ) -> None:
+        super().__init__(primary, replicas, sticky_window)
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[Any]:
+        """
+        Borrow a connection for reads.
+
+        Yields:
+            A connection of the least busy replica, or of the primary when the
+            request context wrote recently or there is no replica.
+        """
+        index = self._pick()
+        if index is None:
+            async with self.primary.connection() as connection:
+                yield connection
+            return
+
+        try:
+            async with self.replicas[index].connection() as connection:
+                yield connection
+        finally:
+            self._done(index)
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[Any]:
+        """
+        Borrow a primary connection for a transaction.
+
+        The transaction is committed when the block exits, or rolled back on
+        error, and the request context is pinned to the primary. ``commit``
+        and ``rollback`` are awaited when the driver's are coroutines.
+
+        Yields:
+            A connection of the primary.
+        """
+        self._wrote()
+        async with self.primary.connection() as connection:
+            try:
+                yield connection
+            except BaseException:
+                result = connection.rollback()
+                if asyncio.iscoroutine(result):
+                    await result
+                raise
+            result = connection.commit()
+            if asyncio.iscoroutine(result):
+                await result
+        self.mark_write()
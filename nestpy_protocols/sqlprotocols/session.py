@@ -0,0 +1,394 @@
+"""
+Module providing the session-level identity map and batched relationship loaders.
+
+This module declares IdentityMap, which keeps at most one instance per
+entity type and primary key for the lifetime of a session, and the
+DataLoader-style BatchLoader (sync) and AsyncBatchLoader (asyncio), which
+turn N per-row relationship lookups into one ``IN (...)`` query per batch.
+
+The identity map holds weak references: an entity stays mapped while the
+application uses it and is dropped with its last reference, so a
+long-lived session does not pin every row it ever loaded. Entities must
+therefore support weak references (classes with ``__slots__`` need a
+``__weakref__`` slot).
+
+``in_query`` builds the batch function of a loader from a query whose
+``{keys}`` marker is replaced by placeholders. Key lists are padded to the
+next power of two so a loader issues a handful of distinct statements,
+which keeps the statement cache warm.
+"""
+
+import asyncio
+import weakref
+from typing import (
+    Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Type
+)
+from nestpy_protocols.sqlprotocols.connection import SQLConnectionProtocol
+
+
+BatchFunction = Callable[[List[Hashable]], Mapping[Hashable, Any]]
+
+AsyncBatchFunction = Callable[[List[Hashable]], Awaitable[Mapping[Hashable, Any]]]
+
+_MISSING = object()
+
+
+class IdentityMap:
+    """
+    Weak map of loaded entities, keyed by entity type and primary key.
+    """
+
+    def __init__(self) -> None:
+        self._entities: "weakref.WeakValueDictionary[Tuple[type, Hashable], Any]" = weakref.WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def __contains__(self, identity: Tuple[type, Hashable]) -> bool:
+        return identity in self._entities
+
+    def get(self, entity_type: Type[Any], key: Hashable) -> Optional[Any]:
+        """
+        Return the mapped instance of an entity.
+
+        Args:
+            entity_type: The entity class.
+            key: The primary key.
+
+        Returns:
+            The instance, or None if it is not loaded (or no longer used).
+        """
+        return self._entities.get((entity_type, key))
+
+    def add(self, entity_type: Type[Any], key: Hashable, entity: Any) -> Any:
+        """
+        Map an entity, keeping the instance already mapped under the same identity.
+
+        Args:
+            entity_type: The entity class.
+            key: The primary key.
+            entity: The freshly built instance.
+
+        Returns:
+            The mapped instance: ``entity``, or the one loaded earlier.
+        """
+        return self._entities.setdefault((entity_type, key), entity)
+
+    def load(self, entity_type: Type[Any], key: Hashable, row: Any, build: Callable[[Any], Any]) -> Any:
+        """
+        Return the mapped instance for a row, building it only if it is not mapped.
+
+        Args:
+            entity_type: The entity class.
+            key: The primary key of the row.
+            row: The row.
+            build: Builds an entity from the row.
+
+        Returns:
+            The mapped instance.
+        """
+        entity = self._entities.get((entity_type, key))
+        if entity is None:
+            entity = self._entities.setdefault((entity_type, key), build(row))
+        return entity
+
+    def discard(self, entity_type: Type[Any], key: Hashable) -> None:
+        """
+        Unmap an entity (e.g. after deleting its row).
+
+        Args:
+            entity_type: The entity class.
+            key: The primary key.
+
+        Returns:
+            None
+        """
+        self._entities.pop((entity_type, key), None)
+
+    def clear(self) -> None:
+        """
+        Unmap every entity.
+
+        Returns:
+            None
+        """
+        self._entities.clear()
+
+
+class Deferred:
+    """
+    Handle of a value requested from a BatchLoader.
+
+    Reading the result dispatches every key queued on the loader so far in
+    one batch.
+    """
+
+    __slots__ = ("_loader", "_key")
+
+    def __init__(self, loader: "BatchLoader", key: Hashable) -> None:
+        self._loader = loader
+        self._key = key
+
+    def result(self) -> Any:
+        """
+        Return the loaded value, dispatching the pending batch if needed.
+
+        Returns:
+            The value of the key, or the loader default when it is missing.
+        """
+        loader = self._loader
+        value = loader._values.get(self._key, _MISSING)
+        if value is _MISSING:
+            # Queued by ``load``, or loaded then forgotten by ``clear``: queue it (again).
+            loader._queue[self._key] = None
+            loader.dispatch()
+            value = loader._values[self._key]
+        return value
+
+
+class _LoaderBase:
+    def __init__(self, max_batch_size: int, default: Any) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.max_batch_size = max_batch_size
+        self.default = default
+        self.batches = 0
+        self._values: Dict[Hashable, Any] = {}
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """
+        Store a known value so it is never requested.
+
+        Args:
+            key: The key.
+            value: Its value.
+
+        Returns:
+            None
+        """
+        self._values[key] = value
+
+    def clear(self, key: Any = _MISSING) -> None:
+        """
+        Forget one loaded key, or every key (e.g. after a write).
+
+        Args:
+            key: The key to forget; every key when omitted.
+
+        Returns:
+            None
+        """
+        if key is _MISSING:
+            self._values.clear()
+        else:
+            self._values.pop(key, None)
+
+    def _chunks(self, keys: Sequence[Hashable]) -> Iterable[List[Hashable]]:
+        size = self.max_batch_size
+        return (list(keys[start:start + size]) for start in range(0, len(keys), size))
+
+    def _store(self, keys: Sequence[Hashable], found: Mapping[Hashable, Any]) -> None:
+        self.batches += 1
+        default = self.default
+        for key in keys:
+            self._values[key] = found.get(key, default)
+
+
+class BatchLoader(_LoaderBase):
+    """
+    Load values by key in batches, from synchronous code.
+
+    ``load`` queues a key and returns a Deferred; the first ``result()`` call
+    loads every queued key with one call of ``batch_load`` per
+    ``max_batch_size`` keys. ``load_many`` loads a list of keys directly.
+    Values are memoized, so a loader belongs to one session.
+
+    Args:
+        batch_load: Maps a list of keys to ``{key: value}``; missing keys
+                    get ``default``.
+        max_batch_size: The maximum number of keys per call.
+        default: The value of keys missing from the batch result.
+    """
+
+    def __init__(self, batch_load: BatchFunction, max_batch_size: int = 500, default: Any = None) -> None:
+        super().__init__(max_batch_size, default)
+        self.batch_load = batch_load
+        self._queue: Dict[Hashable, None] = {}
+
+    def load(self, key: Hashable) -> Deferred:
+        """
+        Queue a key for the next batch.
+
+        Args:
+            key: The key.
+
+        Returns:
+            The Deferred of its value.
+        """
+        if key not in self._values:
+            self._queue[key] = None
+        return Deferred(self, key)
+
+    def load_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        """
+        Load several keys at once, together with every queued key.
+
+        Args:
+            keys: The keys.
+
+        Returns:
+            Their values, in order.
+        """
+        keys = list(keys)
+        for key in keys:
+            if key not in self._values:
+                self._queue[key] = None
+        self.dispatch()
+        values = self._values
+        return [values[key] for key in keys]
+
+    def dispatch(self) -> None:
+        """
+        Load every queued key.
+
+        Returns:
+            None
+        """
+        keys = list(self._queue)
+        self._queue.clear()
+        for chunk in self._chunks(keys):
+            self._store(chunk, self.batch_load(chunk))
+
+
+class AsyncBatchLoader(_LoaderBase):
+    """
+    Load values by key in batches, from asyncio code.
+
+    Keys requested with ``load`` during one turn of the event loop (e.g. by
+    tasks run with ``asyncio.gather``) are loaded together: the batch is
+    dispatched by a callback scheduled on the next tick.
+
+    Args:
+        batch_load: Coroutine function mapping a list of keys to
+                    ``{key: value}``; missing keys get ``default``.
+        max_batch_size: The maximum number of keys per call.
+        default: The value of keys missing from the batch result.
+    """
+
+    def __init__(self, batch_load: AsyncBatchFunction, max_batch_size: int = 500, default: Any = None) -> None:
+        super().__init__(max_batch_size, default)
+        self.batch_load = batch_load
+        self._queue: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        # The event loop only keeps weak references to tasks.
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._scheduled = False
+
+    async def load(self, key: Hashable) -> Any:
+        """
+        Load one key, batched with the keys requested during the same tick.
+
+        Args:
+            key: The key.
+
+        Returns:
+            Its value.
+        """
+        value = self._values.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        future = self._queue.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._queue[key] = loop.create_future()
+            if not self._scheduled:
+                self._scheduled = True
+                loop.call_soon(self._dispatch)
+        # The future is shared by every caller of the key: a cancelled caller must not cancel it.
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        """
+        Load several keys, batched with the keys requested during the same tick.
+
+        Args:
+            keys: The keys.
+
+        Returns:
+            Their values, in order.
+        """
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        self._scheduled = False
+        queue, self._queue = self._queue, {}
+        keys = list(queue)
+        for chunk in self._chunks(keys):
+            task = asyncio.ensure_future(self._run(chunk, [queue[key] for key in chunk]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, keys: List[Hashable], futures: List["asyncio.Future[Any]"]) -> None:
+        try:
+            found = await self.batch_load(keys)
+        except Exception as exc:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        self._store(keys, found)
+        for key, future in zip(keys, futures):
+            if not future.done():
+                future.set_result(self._values[key])
+
+
+def in_query(
+        connection: SQLConnectionProtocol,
+        sql: str,
+        key: Callable[[Any], Hashable],
+        many: bool = False,
+        build: Optional[Callable[[Any], Any]] = None,
+        placeholder: str = "?"
+) -> BatchFunction:
+    """
+    Build the batch function of a BatchLoader from an ``IN (...)`` query.
+
+    Args:
+        connection: The connection running the query.
+        sql: The query, with ``{keys}`` where the placeholders go
+             (e.g. ``"SELECT * FROM orders WHERE user_id IN ({keys})"``).
+        key: Returns the loader key of a row.
+        many: Whether a key matches several rows (one-to-many relationships
+              then map each key to a list).
+        build: Turns a row into the loaded value (e.g. an entity through
+               ``IdentityMap.load``); rows are kept as they are by default.
+        placeholder: The parameter placeholder of the driver.
+
+    Returns:
+        The batch function.
+    """
+    def batch_load(keys: List[Hashable]) -> Dict[Hashable, Any]:
+        # Pad to a power of two (repeating a key) to bound the number of distinct statements.
+        size = 1 << (len(keys) - 1).bit_length()
+        parameters = keys + [keys[-1]] * (size - len(keys))
+        rows = connection.execute(sql.replace("{keys}", ", ".join([placeholder] * size)), parameters).fetchall()
+
+        found: Dict[Hashable, Any] = {}
+        for row in rows:
+            value = build(row) if build is not None else row
+            if many:
+                found.setdefault(key(row), []).append(value)
+            else:
+                found[key(row)] = value
+
+        if many:
+            for missing in keys:
+                found.setdefault(missing, [])
+        return found
+
+    return batch_load
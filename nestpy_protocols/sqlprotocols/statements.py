@@ -0,0 +1,137 @@
+"""
+Module providing the per-connection prepared statement cache.
+
+This module declares normalize_sql and the StatementCache kept by every
+SQLConnectionProtocol implementation. Statements are keyed by their
+normalized text (whitespace collapsed outside quoted literals,
+identifiers and comments, trailing semicolons removed), so the same query written with
+different layout shares one prepared statement. The raw-text to normalized
+mapping is memoized, so a repeated query costs two dict lookups. The cache
+is a bounded LRU with hit and miss counters.
+"""
+
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+# Literals, quoted identifiers and comments are kept verbatim: a line comment
+# keeps its terminating newline, so the code after it stays code.
+_TOKENS = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*(?:\n|$)|/\*.*?(?:\*/|$))|\s+", re.DOTALL)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Return the canonical text of a statement.
+
+    Whitespace runs outside quoted strings, identifiers and comments are
+    collapsed to a single space, and surrounding whitespace and trailing semicolons are
+    removed. Case is preserved.
+
+    Args:
+        sql: The statement text.
+
+    Returns:
+        The normalized text.
+    """
+    return _TOKENS.sub(lambda match: match.group(1) or " ", sql).strip().rstrip(";").rstrip()
+
+
+class StatementCache:
+    """
+    Bounded LRU of prepared statements keyed by normalized SQL.
+
+    Not thread-safe: like the connection that owns it, it must be used by
+    one thread at a time.
+
+    Args:
+        max_size: The maximum number of prepared statements kept.
+        prepare: Callable turning normalized SQL into a driver statement
+                 (defaults to the normalized text itself, for drivers that
+                 prepare internally by text, such as ``sqlite3``).
+        finalize: Callable releasing an evicted statement, if needed.
+    """
+
+    def __init__(
+            self,
+            max_size: int = 256,
+            prepare: Optional[Callable[[str], Any]] = None,
+            finalize: Optional[Callable[[Any], None]] = None
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.max_size = max_size
+        self._prepare = prepare
+        self._finalize = finalize
+        self._statements: "OrderedDict[str, Any]" = OrderedDict()
+        self._normalized: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def get(self, sql: str) -> Any:
+        """
+        Return the prepared statement of a query, preparing it on a miss.
+
+        Args:
+            sql: The statement text as written by the caller.
+
+        Returns:
+            The prepared statement.
+        """
+        normalized = self._normalized.get(sql)
+        if normalized is None:
+            if len(self._normalized) >= 4 * self.max_size:
+                self._normalized.clear()
+            normalized = self._normalized[sql] = normalize_sql(sql)
+
+        statements = self._statements
+        statement = statements.get(normalized)
+        if statement is not None:
+            statements.move_to_end(normalized)
+            self.hits += 1
+            return statement
+
+        self.misses += 1
+        statement = self._prepare(normalized) if self._prepare is not None else normalized
+        statements[normalized] = statement
+        if len(statements) > self.max_size:
+            _, evicted = statements.popitem(last=False)
+            self.evictions += 1
+            if self._finalize is not None:
+                self._finalize(evicted)
+        return statement
+
+    def clear(self) -> None:
+        """
+        Drop every statement (counters are kept).
+
+        Returns:
+            None
+        """
+        if self._finalize is not None:
+            for statement in self._statements.values():
+                self._finalize(statement)
+        self._statements.clear()
+        self._normalized.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the counters of the cache.
+
+        Returns:
+            A mapping of size, hits, misses, evictions and hit ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._statements),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
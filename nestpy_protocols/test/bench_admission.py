@@ -0,0 +1,94 @@
+"""
+Overload test: latency of admitted requests with and without load shedding.
+
+An ASGI app serving 4 requests at a time in 2 ms each (2000 req/s) receives
+Poisson arrivals at twice its capacity for 2 seconds through
+AdmissionMiddleware. The baseline only limits concurrency and queues
+without bound, as adapters do today; the second run sheds on a 5 ms queue
+delay target. Run with:
+
+    python -m nestpy_protocols.test.bench_admission
+"""
+
+import time
+import random
+import asyncio
+from nestpy_protocols.webprotocols.framework.admission import AdmissionController, AdmissionMiddleware
+
+CAPACITY = 4
+
+SERVICE_TIME = 0.002
+
+OFFERED = 2 * CAPACITY / SERVICE_TIME
+
+DURATION = 2.0
+
+
+async def app(scope, receive, send):
+    await asyncio.sleep(SERVICE_TIME)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def request(middleware, latencies, statuses):
+    started = time.perf_counter()
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await middleware({"type": "http", "client": ("10.0.0.1", 5000)}, None, send)
+    statuses[status[0]] = statuses.get(status[0], 0) + 1
+    if status[0] == 200:
+        latencies.append(time.perf_counter() - started)
+
+
+async def overload(controller):
+    middleware = AdmissionMiddleware(app, controller)
+    rng = random.Random(3)
+    latencies, statuses, tasks = [], {}, []
+
+    deadline = time.perf_counter() + DURATION
+    next_arrival = time.perf_counter()
+    while next_arrival < deadline:
+        next_arrival += rng.expovariate(OFFERED)
+        await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+        tasks.append(asyncio.ensure_future(request(middleware, latencies, statuses)))
+
+    await asyncio.gather(*tasks)
+    latencies.sort()
+    return latencies, statuses
+
+
+def percentile(values, quantile):
+    return values[min(len(values) - 1, int(len(values) * quantile))] * 1000
+
+
+def main():
+    runs = (
+        ("unbounded queue", AdmissionController(max_concurrency=CAPACITY, max_queue=10 ** 9, target_delay=float("inf"))),
+        ("shedding", AdmissionController(max_concurrency=CAPACITY, target_delay=0.005, interval=0.05)),
+    )
+
+    results = {}
+    for name, controller in runs:
+        latencies, statuses = asyncio.run(overload(controller))
+        results[name] = percentile(latencies, 0.99)
+        print(f"{name:15}: p50 {percentile(latencies, 0.5):7.1f} ms  p99 {results[name]:7.1f} ms  "
+              f"statuses {dict(sorted(statuses.items()))}")
+
+    assert results["shedding"] < results["unbounded queue"] / 5
+
+    limited = AdmissionController(rate=5, burst=5)
+
+    async def burst():
+        statuses = {}
+        await asyncio.gather(*(request(AdmissionMiddleware(app, limited), [], statuses) for _ in range(20)))
+        return statuses
+
+    print(f"token bucket (5 req/s, burst 5), 20 requests: {asyncio.run(burst())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: event loop responsiveness with blocking and offloaded SQLite calls.
+
+Runs 32 concurrent tasks, each issuing 10 CPU-heavy queries (a recursive
+CTE over 100k rows) against a file database, first by calling
+SQLiteConnection directly from the coroutines, then through
+AsyncSQLiteConnection on a 4-thread SQLExecutor, one connection per task
+(a connection is used by one task at a time). A ticker task sleeping
+1 ms measures how late the event loop wakes it up. Run with:
+
+    python -m nestpy_protocols.test.bench_async_sql
+"""
+
+import os
+import time
+import asyncio
+import tempfile
+import statistics
+from nestpy_protocols.sqlprotocols.connection import SQLiteConnection
+from nestpy_protocols.sqlprotocols.async_connection import AsyncSQLiteConnection, SQLExecutor
+
+TASKS = 32
+
+QUERIES = 10
+
+HEAVY = (
+    "WITH RECURSIVE numbers(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM numbers LIMIT 100000) "
+    "SELECT SUM(n * ?) FROM numbers"
+)
+
+
+async def measure(workload):
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - started - 0.001)
+
+    tick = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    results = await workload()
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick
+
+    lags.sort()
+    return results, elapsed, lags
+
+
+def report(name, elapsed, lags):
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(f"{name:12}: {elapsed:5.2f} s, {len(lags):5} ticks, loop lag median {statistics.median(lags) * 1000:7.2f} ms, "
+          f"p99 {p99 * 1000:7.2f} ms, max {lags[-1] * 1000:7.2f} ms")
+
+
+async def main_async(path):
+    blocking = SQLiteConnection(path)
+
+    async def run_blocking():
+        async def task(i):
+            return [blocking.fetchone(HEAVY, (i,))[0] for _ in range(QUERIES)]
+
+        return await asyncio.gather(*(task(i) for i in range(TASKS)))
+
+    expected, elapsed, lags = await measure(run_blocking)
+    report("blocking", elapsed, lags)
+    blocking.close()
+
+    executor = SQLExecutor(max_workers=4, max_pending=64)
+    connections = [await AsyncSQLiteConnection.connect(path, executor) for _ in range(TASKS)]
+
+    async def run_offloaded():
+        async def task(i):
+            connection = connections[i]
+            return [(await connection.fetchone(HEAVY, (i,)))[0] for _ in range(QUERIES)]
+
+        return await asyncio.gather(*(task(i) for i in range(TASKS)))
+
+    results, elapsed, lags = await measure(run_offloaded)
+    assert results == expected
+    report("offloaded", elapsed, lags)
+
+    stats = executor.stats()
+    print(f"executor    : {stats['calls']} calls, bound {stats['bound_connections']}, "
+          f"queue wait mean {stats['mean_queue_wait_time'] * 1000:.1f} ms / max {stats['max_queue_wait_time'] * 1000:.1f} ms, "
+          f"execution mean {stats['mean_execution_time'] * 1000:.1f} ms / max {stats['max_execution_time'] * 1000:.1f} ms")
+
+    async with connections[0].transaction() as connection:
+        await connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+        assert await connection.executemany("INSERT INTO items (name) VALUES (?)", [("a",), ("b",)]) == 2
+    assert await connections[1].fetchall("SELECT name FROM items ORDER BY id") == [("a",), ("b",)]
+
+    for connection in connections:
+        await connection.close()
+    assert executor.stats()["bound_connections"] == [0] * 4
+    executor.shutdown()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(main_async(os.path.join(directory, "async.db")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: pooled keep-alive client vs. one connection per request.
+
+A local asyncio server stands in for a downstream service. Also checks the
+retry of a request whose reused connection the server had closed, and the
+rejection of CR/LF in request headers. Run with:
+
+    python -m nestpy_protocols.test.bench_client
+"""
+
+import time
+import asyncio
+from nestpy_protocols.webprotocols.http.client import PooledHttpClient
+
+BODY = b'{"status": "ok"}'
+REQUESTS = 2_000
+CONCURRENCY = 20
+
+
+async def handle(reader, writer):
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            close = b"connection: close" in head.lower()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(BODY)}\r\n".encode()
+                + (b"Connection: close\r\n" if close else b"")
+                + b"\r\n" + BODY
+            )
+            await writer.drain()
+            if close:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def handle_once(reader, writer):
+    # Answers the first request of each connection, then drops the
+    # connection on the next one, like a server closing an idle keep-alive.
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.1 200 OK\r\n" + f"Content-Length: {len(BODY)}\r\n".encode() + b"\r\n" + BODY)
+        await writer.drain()
+        await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def check_stale_connections():
+    server = await asyncio.start_server(handle_once, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/status"
+
+    async with server:
+        async with PooledHttpClient() as client:
+            for _ in range(3):
+                response = await client.get(url)
+                assert response.status == 200 and response.body == BODY
+            assert client.metrics.connections_opened == 3 and client.metrics.connections_discarded == 2
+
+            # Not idempotent: the failure is reported rather than sent twice.
+            try:
+                await client.post(url, body=b"{}")
+            except ConnectionError:
+                pass
+            else:
+                raise AssertionError("a POST on a closed connection was retried")
+
+            for headers in ({"X-Test": "a\r\nX-Injected: 1"}, {"X-Test\n": "a"}, {"X Test": "a"}):
+                try:
+                    await client.get(url, headers=headers)
+                except ValueError:
+                    pass
+                else:
+                    raise AssertionError(f"headers {headers!r} were sent")
+
+    print("stale keep-alive: idempotent requests retried once, POST not retried, CR/LF headers rejected")
+
+
+async def run(client, url):
+    queue = asyncio.Queue()
+    for _ in range(REQUESTS):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            response = await client.get(url)
+            assert response.status == 200 and response.body == BODY
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return time.perf_counter() - started
+
+
+async def main():
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/status"
+
+    async with server:
+        for keep_alive in (False, True):
+            client = PooledHttpClient(max_connections_per_host=CONCURRENCY, keep_alive=keep_alive)
+            elapsed = await run(client, url)
+            await client.close()
+            metrics = client.metrics
+            label = "pooled keep-alive" if keep_alive else "new connection"
+            print(
+                f"{label:<18} {REQUESTS / elapsed:>9.0f} req/s  "
+                f"opened={metrics.connections_opened} reused={metrics.connections_reused} "
+                f"reuse={metrics.reuse_ratio:.1%}"
+            )
+
+    await check_stale_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
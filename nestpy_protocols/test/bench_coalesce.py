@@ -0,0 +1,116 @@
+"""
+Benchmark: thundering herd on one item with and without request coalescing.
+
+Fires 500 identical concurrent calls at an endpoint that takes 20 ms, as an
+async handler on the event loop and as a sync handler in a thread pool,
+and counts how many times the handler actually ran. Run with:
+
+    python -m nestpy_protocols.test.bench_coalesce
+"""
+
+import time
+import asyncio
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from nestpy_protocols.webprotocols.framework.coalesce import CoalescePolicy, coalesced, default_key
+
+CALLS = 500
+
+HANDLER_TIME = 0.02
+
+
+def run_async(coalesce):
+    runs = []
+
+    async def get_item(item_id):
+        runs.append(item_id)
+        await asyncio.sleep(HANDLER_TIME)
+        return {"id": item_id}
+
+    endpoint = coalesced(get_item, CoalescePolicy()) if coalesce else get_item
+
+    async def herd():
+        return await asyncio.gather(*(endpoint(42) for _ in range(CALLS)))
+
+    started = time.perf_counter()
+    results = asyncio.run(herd())
+    assert all(result == {"id": 42} for result in results)
+    return len(runs), time.perf_counter() - started
+
+
+def run_threads(coalesce):
+    runs = []
+
+    def get_item(item_id):
+        runs.append(item_id)
+        time.sleep(HANDLER_TIME)
+        return {"id": item_id}
+
+    endpoint = coalesced(get_item, CoalescePolicy()) if coalesce else get_item
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=40) as pool:
+        results = list(pool.map(endpoint, [42] * CALLS))
+    assert all(result == {"id": 42} for result in results)
+    return len(runs), time.perf_counter() - started
+
+
+def starlette_like(authorization=None):
+    # The shape of a Starlette Request: a parsed url and a headers mapping.
+    headers = {"authorization": authorization} if authorization else {}
+    return SimpleNamespace(method="GET", url=SimpleNamespace(path="/me", query=""), headers=headers)
+
+
+def check_isolation():
+    assert default_key(starlette_like("Bearer a")) == default_key(starlette_like("Bearer a"))
+    assert default_key(starlette_like("Bearer a")) != default_key(starlette_like("Bearer b"))
+    assert default_key(starlette_like()) != default_key(starlette_like("Bearer a"))
+
+    runs = []
+
+    async def get_me(request):
+        runs.append(request.headers.get("authorization"))
+        await asyncio.sleep(HANDLER_TIME)
+        return request.headers.get("authorization")
+
+    endpoint = coalesced(get_me, CoalescePolicy())
+
+    async def users():
+        requests = [starlette_like("Bearer a"), starlette_like("Bearer b")] * 10
+        return await asyncio.gather(*(endpoint(request) for request in requests))
+
+    assert asyncio.run(users()) == ["Bearer a", "Bearer b"] * 10 and sorted(runs) == ["Bearer a", "Bearer b"]
+
+    async def leader_cancelled():
+        leader = asyncio.ensure_future(endpoint(starlette_like("Bearer c")))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(endpoint(starlette_like("Bearer c"))) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(leader_cancelled()) == ["Bearer c"] * 3
+
+    async def caller_after_cancel():
+        only = asyncio.ensure_future(endpoint(starlette_like("Bearer d")))
+        await asyncio.sleep(0)
+        only.cancel()
+        await asyncio.sleep(0)
+        # The shared call is being cancelled: a new caller must not join it.
+        return await endpoint(starlette_like("Bearer d"))
+
+    assert asyncio.run(caller_after_cancel()) == "Bearer d"
+    print("isolation: per-caller keys ok, followers survive a cancelled leader")
+
+
+def main():
+    check_isolation()
+    for name, run in (("async", run_async), ("threads", run_threads)):
+        for coalesce in (False, True):
+            executions, elapsed = run(coalesce)
+            label = "coalesced" if coalesce else "plain"
+            print(f"{name:8} {label:10}: {executions:4d} handler runs for {CALLS} calls in {elapsed * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
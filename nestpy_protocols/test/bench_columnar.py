@@ -0,0 +1,85 @@
+"""
+Benchmark: memory and build time of columnar results against tuples and dicts.
+
+Loads 200k rows of an orders table (five numeric columns and one text
+column) from a local SQLite database as a list of tuples, a list of dicts
+and a ColumnarResult, and reports the retained memory and build time.
+Also checks a result with duplicate column names. Run with:
+
+    python -m nestpy_protocols.test.bench_columnar
+"""
+
+import gc
+import time
+import random
+import tracemalloc
+from nestpy_protocols.sqlprotocols.connection import SQLiteConnection
+from nestpy_protocols.sqlprotocols.columnar import ColumnarResult
+
+ROWS = 200_000
+
+QUERY = "SELECT id, user_id, amount, quantity, created_at, status FROM orders"
+
+
+def measure(build):
+    # Timed without tracing (tracemalloc slows allocations down), then traced.
+    gc.collect()
+    started = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, retained
+
+
+def main():
+    rng = random.Random(5)
+    connection = SQLiteConnection(":memory:")
+    connection.execute(
+        "CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER, amount REAL, "
+        "quantity INTEGER, created_at INTEGER, status TEXT)"
+    )
+    connection.bulk_write(
+        "INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (i, rng.randrange(10_000), round(rng.uniform(1, 500), 2), rng.randrange(1, 10),
+             1_700_000_000 + i * 7, rng.choice(("paid", "shipped", "refunded")))
+            for i in range(ROWS)
+        )
+    )
+
+    columns = ("id", "user_id", "amount", "quantity", "created_at", "status")
+    builders = (
+        ("list of tuples", lambda: connection.fetchall(QUERY)),
+        ("list of dicts", lambda: [dict(zip(columns, row)) for row in connection.execute(QUERY)]),
+        ("columnar", lambda: connection.fetch_columnar(QUERY)),
+    )
+
+    results = {}
+    for name, build in builders:
+        result, elapsed, retained = measure(build)
+        results[name] = result
+        print(f"{name:15}: {retained / 2 ** 20:7.1f} MiB retained, build {elapsed * 1000:6.0f} ms")
+
+    columnar = results["columnar"]
+    assert isinstance(columnar, ColumnarResult) and len(columnar) == ROWS
+    assert columnar.rows() == results["list of tuples"]
+    row = columnar[123]
+    assert row.as_tuple() == results["list of tuples"][123] and row.status == row["status"]
+    print(f"column types   : {[getattr(columnar.column(name), 'typecode', 'list') for name in columns]}")
+
+    # Duplicate names keep every column; lookups by name return the first one.
+    joined = "SELECT a.id, b.id, b.status FROM orders a JOIN orders b ON b.id = a.id + 1 WHERE a.id = 1"
+    duplicated = connection.fetch_columnar(joined)
+    assert duplicated.columns == ("id", "id", "status")
+    assert duplicated.rows() == connection.fetchall(joined) == [(1, 2, duplicated[0].status)]
+    assert duplicated[0][0] == duplicated[0]["id"] == duplicated[0].id == 1 and duplicated[0][1] == 2
+    assert list(duplicated.column(1)) == [2]
+
+
+if __name__ == "__main__":
+    main()
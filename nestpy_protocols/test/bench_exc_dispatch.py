@@ -0,0 +1,82 @@
+"""
+Benchmark: exception handler lookup under an error storm.
+
+Resolves the handler of one million raised exceptions (mostly a deep
+timeout subclass, as during a downstream outage) by walking the MRO on
+every error, as frameworks do, and with the cached ExceptionDispatcher.
+Run with:
+
+    python -m nestpy_protocols.test.bench_exc_dispatch
+"""
+
+import time
+from nestpy_protocols.webprotocols.framework.dispatch import ExceptionDispatcher
+
+ERRORS = 1_000_000
+
+
+class HTTPError(Exception):
+    status_code = 500
+
+
+class UpstreamError(HTTPError):
+    pass
+
+
+class UpstreamTimeout(UpstreamError, TimeoutError):
+    pass
+
+
+class ConnectTimeout(UpstreamTimeout):
+    pass
+
+
+class PoolTimeout(ConnectTimeout):
+    pass
+
+
+def handle(exc):
+    return exc
+
+
+def build_handlers():
+    handlers = {type(f"Unrelated{i}", (Exception,), {}): handle for i in range(30)}
+    handlers.update({HTTPError: handle, TimeoutError: handle, LookupError: handle, ValueError: handle})
+    return handlers
+
+
+def mro_lookup(handlers, exc):
+    for base in type(exc).__mro__:
+        if base in handlers:
+            return handlers[base]
+    return None
+
+
+def main():
+    handlers = build_handlers()
+    dispatcher = ExceptionDispatcher(handlers)
+    errors = [PoolTimeout() if i % 10 else KeyError("id") for i in range(ERRORS)]
+
+    for exc in (PoolTimeout(), KeyError("id"), RuntimeError()):
+        assert dispatcher.resolve(exc) is mro_lookup(handlers, exc)
+
+    walked, cached = [], []
+    resolve = dispatcher.resolve
+    for _ in range(5):
+        started = time.perf_counter()
+        for exc in errors:
+            mro_lookup(handlers, exc)
+        walked.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for exc in errors:
+            resolve(exc)
+        cached.append(time.perf_counter() - started)
+
+    print(f"MRO walk per error : {min(walked) / ERRORS * 1e9:6.0f} ns")
+    print(f"cached dispatcher  : {min(cached) / ERRORS * 1e9:6.0f} ns")
+    print(f"speedup            : {min(walked) / min(cached):.2f}x ({dispatcher.cache_size()} types cached)")
+
+
+if __name__ == "__main__":
+    main()
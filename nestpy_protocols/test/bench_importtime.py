@@ -0,0 +1,86 @@
+"""
+Import-time budget check for the web protocol package.
+
+Each target is imported in a fresh interpreter with ``python -X importtime``
+and the time of every module it loads beyond abc and typing (the only
+dependencies of the contracts) is compared with its budget. Helpers that
+are only needed once a protocol is running (asyncio, the metrics tables,
+the middleware pipeline, ...) must not be loaded at all. Run with:
+
+    python -m nestpy_protocols.test.bench_importtime
+"""
+
+import subprocess
+import sys
+
+# Microseconds allowed for the modules each import loads beyond the baseline.
+BUDGETS_US = {
+    "import nestpy_protocols.webprotocols": 1_500,
+    "from nestpy_protocols.webprotocols.framework.base import FrameworkWebProtocol": 3_000,
+    "from nestpy_protocols.webprotocols.framework.mw import FrameworkMwProtocol": 3_000,
+    "from nestpy_protocols.webprotocols.framework.comp import FrameworkCompProtocol": 3_000,
+    "from nestpy_protocols.webprotocols.framework.lif import FrameworkLifProtocol": 3_000,
+    "from nestpy_protocols.webprotocols.framework.conf import FrameworkConfProtocol": 3_000,
+    "from nestpy_protocols.webprotocols.framework.doc import FrameworkDocProtocol": 3_000,
+    "from nestpy_protocols.webprotocols.framework.exc import FrameworkExcProtocol": 5_000,
+}
+
+BASELINE = "import abc, typing"
+
+# Modules a contract import must not pull in.
+HEAVY_MODULES = (
+    "asyncio",
+    "socket",
+    "nestpy_protocols.webprotocols.framework.admission",
+    "nestpy_protocols.webprotocols.framework.cache",
+    "nestpy_protocols.webprotocols.framework.coalesce",
+    "nestpy_protocols.webprotocols.framework.drain",
+    "nestpy_protocols.webprotocols.framework.metrics",
+    "nestpy_protocols.webprotocols.framework.openapi",
+    "nestpy_protocols.webprotocols.framework.pipeline",
+    "nestpy_protocols.webprotocols.framework.prefork",
+    "nestpy_protocols.webprotocols.framework.profiling",
+    "nestpy_protocols.webprotocols.framework.route",
+)
+
+RUNS = 5
+
+
+def measure(statement):
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        if not own.strip().isdigit():
+            continue
+        modules[name.strip()] = int(own)
+    return modules
+
+
+def main():
+    baseline = set(measure(BASELINE))
+    failed = False
+    for statement, budget in BUDGETS_US.items():
+        runs = [measure(statement) for _ in range(RUNS)]
+        extra = sorted(set(runs[0]) - baseline)
+        best = min(sum(modules.get(name, 0) for name in extra) for modules in runs)
+        heavy = [name for name in HEAVY_MODULES if name in runs[0]]
+        status = "ok" if best <= budget and not heavy else "OVER BUDGET"
+        failed |= best > budget or bool(heavy)
+        print(f"{best:>7} us / {budget:>6} us  {status:<11} {statement}")
+        print(f"{'':>28}modules: {', '.join(extra)}")
+        if heavy:
+            print(f"{'':>28}heavy: {', '.join(heavy)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
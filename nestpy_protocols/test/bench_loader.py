@@ -0,0 +1,125 @@
+"""
+Lab check: N+1 relationship loading against batched loaders and the identity map.
+
+Builds 1000 users with 5 orders each in SQLite and loads the orders of
+every user once per row (the N+1 pattern), then with BatchLoader and
+AsyncBatchLoader. Statements are counted with the driver trace callback.
+Also checks that a cancelled caller does not cancel the load shared with
+other callers of the same key, that a Deferred read after ``clear`` loads
+its key again, that queries may contain literal braces, and that the IdentityMap returns one instance per row and lets go
+of entities that are no longer used. Run with:
+
+    python -m nestpy_protocols.test.bench_loader
+"""
+
+import gc
+import time
+import asyncio
+from dataclasses import dataclass
+from nestpy_protocols.sqlprotocols.connection import SQLiteConnection
+from nestpy_protocols.sqlprotocols.session import AsyncBatchLoader, BatchLoader, IdentityMap, in_query
+
+USERS = 1000
+
+ORDERS_PER_USER = 5
+
+ORDERS = "SELECT id, user_id, amount FROM orders WHERE user_id IN ({keys})"
+
+
+@dataclass
+class User:
+    id: int
+    name: str
+
+
+def counted(connection):
+    statements = []
+    connection.connection.set_trace_callback(statements.append)
+    return statements
+
+
+def main():
+    connection = SQLiteConnection(":memory:")
+    connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+    connection.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER, amount REAL)")
+    connection.execute("CREATE INDEX orders_user ON orders (user_id)")
+    connection.bulk_write("INSERT INTO users VALUES (?, ?)", ((i, f"user-{i}") for i in range(USERS)))
+    connection.bulk_write(
+        "INSERT INTO orders (user_id, amount) VALUES (?, ?)",
+        ((i % USERS, i * 0.5) for i in range(USERS * ORDERS_PER_USER))
+    )
+    users = connection.fetchall("SELECT id, name FROM users")
+    statements = counted(connection)
+
+    started = time.perf_counter()
+    naive = {
+        user_id: connection.fetchall("SELECT id, user_id, amount FROM orders WHERE user_id = ?", (user_id,))
+        for user_id, _ in users
+    }
+    naive_time, naive_queries = time.perf_counter() - started, len(statements)
+
+    statements.clear()
+    started = time.perf_counter()
+    loader = BatchLoader(in_query(connection, ORDERS, key=lambda row: row[1], many=True))
+    pending = {user_id: loader.load(user_id) for user_id, _ in users}
+    batched = {user_id: deferred.result() for user_id, deferred in pending.items()}
+    batched_time, batched_queries = time.perf_counter() - started, len(statements)
+    assert batched == naive and batched_queries == loader.batches == 2
+
+    async def load_orders(loader, user_id):
+        return user_id, await loader.load(user_id)
+
+    async def load_all():
+        async def batch_load(keys):
+            return in_query(connection, ORDERS, key=lambda row: row[1], many=True)(keys)
+
+        loader = AsyncBatchLoader(batch_load, max_batch_size=1000)
+        return dict(await asyncio.gather(*(load_orders(loader, user_id) for user_id, _ in users)))
+
+    statements.clear()
+    assert asyncio.run(load_all()) == naive and len(statements) == 1
+
+    async def cancel_one():
+        async def batch_load(keys):
+            await asyncio.sleep(0.01)
+            return {key: key * 2 for key in keys}
+
+        loader = AsyncBatchLoader(batch_load)
+        first, second = asyncio.ensure_future(loader.load(1)), asyncio.ensure_future(loader.load(1))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(cancel_one()) == 2
+
+    print(f"N+1 queries     : {naive_queries:5} statements, {naive_time * 1000:6.1f} ms")
+    print(f"BatchLoader     : {batched_queries:5} statements, {batched_time * 1000:6.1f} ms "
+          f"({naive_time / batched_time:.1f}x faster)")
+    print(f"AsyncBatchLoader: {len(statements):5} statement for {USERS} concurrent loads")
+
+    # A write between load() and result(): the cleared key is loaded again.
+    names = BatchLoader(in_query(
+        connection, "SELECT id, name || '{}' FROM users WHERE id IN ({keys})", key=lambda row: row[0]
+    ))
+    names.load_many([1])
+    deferred = names.load(1)
+    names.clear()
+    assert deferred.result() == (1, "user-1{}") and names.batches == 2
+
+    identity_map = IdentityMap()
+    load_user = in_query(
+        connection, "SELECT id, name FROM users WHERE id IN ({keys})", key=lambda row: row[0],
+        build=lambda row: identity_map.load(User, row[0], row, lambda row: User(*row))
+    )
+    first = BatchLoader(load_user).load_many([1, 2, 3])
+    second = BatchLoader(load_user).load_many([3, 2, 1])
+    assert first == second[::-1] and all(a is b for a, b in zip(first, second[::-1]))
+    assert identity_map.get(User, 2) is first[1] and len(identity_map) == 3
+    del first, second
+    gc.collect()
+    assert len(identity_map) == 0
+    print("identity map    : one instance per row, released with the last reference")
+
+
+if __name__ == "__main__":
+    main()
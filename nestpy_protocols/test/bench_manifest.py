@@ -0,0 +1,52 @@
+"""
+Benchmark: route manifest build, apply and compile time by route count.
+
+Startup cost should grow linearly with the number of routes. Run with:
+
+    python -m nestpy_protocols.test.bench_manifest
+"""
+
+import time
+from nestpy_protocols.webprotocols.framework.route import Route, RouterGroup, RouteManifest
+
+
+def endpoint():
+    return None
+
+
+def registrations(count, per_group=50):
+    groups = [RouterGroup(name=f"group{g}", prefix=f"/g{g}") for g in range(count // per_group)]
+    routes = [
+        Route(path=f"/r{i}/{{item_id:int}}", endpoint=endpoint, router_group=f"group{i // per_group}")
+        for i in range(count)
+    ]
+    return routes, groups
+
+
+def main():
+    print(f"{'routes':>8} {'build ms':>10} {'apply ms':>9} {'compile ms':>11} {'us/route':>9}")
+    for count in (1_000, 5_000, 10_000, 20_000):
+        routes, groups = registrations(count)
+
+        start = time.perf_counter()
+        manifest = RouteManifest.build(routes, groups)
+        built = time.perf_counter()
+        # What an adapter's apply_route_manifest does: top-level routes, then each group's.
+        applied = len(manifest.routes_for(None))
+        for group in manifest.router_groups:
+            applied += len(manifest.routes_for(group.name))
+        grouped = time.perf_counter()
+        index = manifest.compile()
+        compiled = time.perf_counter()
+
+        assert applied == count
+        assert manifest.routes_for("group1")[0].full_path == "/g1/r50/{item_id:int}"
+        assert len(index) == count
+        assert index.match("GET", "/g0/r1/5") is not None
+        total = compiled - start
+        print(f"{count:>8} {(built - start) * 1e3:>10.1f} {(grouped - built) * 1e3:>9.2f} "
+              f"{(compiled - grouped) * 1e3:>11.1f} {total / count * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: pooled connections against a new connection per request.
+
+Serves 5000 short point queries on a file-backed SQLite database from 8
+threads, opening a connection per request versus borrowing from a
+SQLiteConnectionPool, then runs the same load through the asyncio pool and
+checks the timeout and health-check paths. Run with:
+
+    python -m nestpy_protocols.test.bench_pool
+"""
+
+import os
+import time
+import sqlite3
+import asyncio
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from nestpy_protocols.sqlprotocols.pool import AsyncSQLiteConnectionPool, PoolTimeoutError, SQLiteConnectionPool
+
+REQUESTS = 5000
+
+THREADS = 8
+
+
+def query(connection, i):
+    return connection.execute("SELECT name FROM items WHERE id = ?", (i % 1000,)).fetchone()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "bench.db")
+        with sqlite3.connect(database) as connection:
+            connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+            connection.executemany("INSERT INTO items VALUES (?, ?)", ((i, f"item-{i}") for i in range(1000)))
+
+        def per_request(i):
+            connection = sqlite3.connect(database)
+            try:
+                return query(connection, i)
+            finally:
+                connection.close()
+
+        pool = SQLiteConnectionPool(database, min_size=2, max_size=THREADS)
+
+        def pooled(i):
+            with pool.connection() as connection:
+                return query(connection, i)
+
+        for name, handler in (("per-request", per_request), ("pooled", pooled)):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(THREADS) as executor:
+                list(executor.map(handler, range(REQUESTS)))
+            elapsed = time.perf_counter() - started
+            print(f"{name:12}: {REQUESTS / elapsed:8.0f} req/s")
+        print(f"pool stats  : {pool.stats()}")
+
+        small = SQLiteConnectionPool(database, max_size=1)
+        held = small.acquire()
+        try:
+            small.acquire(timeout=0.05)
+        except PoolTimeoutError:
+            pass
+        small.release(held)
+        held.close()
+        small.check_after = 0
+        with small.connection() as connection:
+            assert query(connection, 1) == ("item-1",)
+        assert small.stats()["timeouts"] == 1 and small.stats()["failed_checks"] == 1
+
+        async def run_async():
+            async_pool = AsyncSQLiteConnectionPool(database, max_size=4)
+
+            async def handle(i):
+                async with async_pool.connection() as connection:
+                    await asyncio.sleep(0)
+                    return query(connection, i)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(handle(i) for i in range(REQUESTS)))
+            elapsed = time.perf_counter() - started
+            await async_pool.close()
+            return elapsed, async_pool.stats()
+
+        elapsed, stats = asyncio.run(run_async())
+        print(f"async pooled: {REQUESTS / elapsed:8.0f} req/s, {stats}")
+
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: crash logging and respawn of pre-forked workers.
+
+Runs a PreforkSupervisor with two workers whose first incarnation crashes,
+while the application also runs a child process of its own, and measures
+how long the supervisor takes to put a crashed worker back. Run with:
+
+    python -m nestpy_protocols.test.bench_prefork
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+import threading
+import subprocess
+from nestpy_protocols.webprotocols.framework.prefork import PreforkSupervisor
+
+WORKERS = 2
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    log_path = os.path.join(workdir, "prefork.log")
+    crashed = os.path.join(workdir, "crashed")
+    # Opened before forking: workers append to the same file.
+    logging.basicConfig(filename=log_path, level=logging.WARNING, format="%(process)d %(message)s")
+
+    def serve(sock):
+        try:
+            os.open(crashed, os.O_CREAT | os.O_EXCL)
+        except FileExistsError:
+            # Serve until SIGTERM.
+            while True:
+                time.sleep(1)
+        raise RuntimeError("worker crashed on startup")
+
+    supervisor = PreforkSupervisor(serve, workers=WORKERS, restart_delay=0.05, graceful_timeout=2)
+    thread = threading.Thread(target=supervisor.run, args=("127.0.0.1", 0))
+    started = time.perf_counter()
+    thread.start()
+
+    try:
+        # A child of the application itself: its exit status must stay with the application.
+        helper = subprocess.Popen([sys.executable, "-c", "import sys; sys.exit(3)"])
+
+        deadline = time.monotonic() + 10
+        while (supervisor.restarts < 1 or len(supervisor.pids) < WORKERS) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        respawned = time.perf_counter() - started
+        pids = set(supervisor.pids.values())
+        assert supervisor.restarts == 1, supervisor.restarts
+        assert len(pids) == WORKERS, pids
+
+        time.sleep(0.3)
+        assert helper.wait(timeout=5) == 3, "the supervisor reaped a child it does not own"
+        assert supervisor.restarts == 1
+    finally:
+        supervisor.stop()
+        thread.join()
+
+    assert not supervisor.pids
+    for pid in pids:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            continue
+        raise AssertionError(f"worker {pid} is still running")
+
+    logging.shutdown()
+    with open(log_path) as log:
+        output = log.read()
+    assert "exited with an error" in output and "RuntimeError: worker crashed on startup" in output, output
+    assert "exited with status 1, restarting it" in output, output
+
+    print(f"start to recovered pool: {respawned * 1e3:.0f} ms ({supervisor.restarts} restart)")
+    print(f"application child exit status kept: {helper.returncode}")
+    print("crash logged by the worker and the supervisor")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: cost of the RouteProfiler hook and output of both modes.
+
+Measures ``with profiler.profile(route)`` around a trivial handler while no
+window is open, then profiles a small CPU-bound handler in ``cprofile`` and
+``stack`` mode and checks the written files, and that a request nested in a
+profiled one on the same thread is not sampled. Run with:
+
+    python -m nestpy_protocols.test.bench_profiler
+"""
+
+import os
+import time
+import pstats
+import tempfile
+from nestpy_protocols.webprotocols.framework.profiling import RouteProfiler
+
+REQUESTS = 1_000_000
+
+
+def handler(n: int = 20_000) -> int:
+    return sum(i * i for i in range(n))
+
+
+def idle_overhead() -> float:
+    profiler = RouteProfiler()
+    profile = profiler.profile
+    runs = []
+
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(REQUESTS):
+            pass
+        empty = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(REQUESTS):
+            with profile("GET /items"):
+                pass
+        runs.append(time.perf_counter() - started - empty)
+
+    return min(runs) / REQUESTS * 1e9
+
+
+def main():
+    print(f"idle hook: {idle_overhead():.0f} ns/request")
+
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = RouteProfiler()
+
+        # Sample every request so that the outer one is always profiled.
+        profiler.start("GET /items", max_samples=1, output_dir=directory)
+        with profiler.profile("GET /items") as outer:
+            with profiler.profile("GET /items") as inner:
+                handler()
+        assert outer and not inner, "one cProfile per thread"
+        profiler.wait()
+
+        profiler.start("GET /items", fraction=0.5, max_samples=20, output_dir=directory)
+        served = 0
+        while profiler.active:
+            for route in ("GET /items", "GET /users"):
+                with profiler.profile(route):
+                    handler()
+            served += 1
+        profiler.wait()
+        stats = pstats.Stats(profiler.last_output)
+        print(f"cprofile: {os.path.basename(profiler.last_output)} after {served} requests, "
+              f"{stats.total_calls} calls recorded")
+        assert any(name == "handler" for _, _, name in stats.stats)
+
+        profiler.start(None, duration=0.5, max_samples=10 ** 9, output_dir=directory, mode="stack", interval=0.001)
+        while profiler.active:
+            with profiler.profile("GET /items"):
+                handler()
+        profiler.wait()
+        with open(profiler.last_output, encoding="utf-8") as file:
+            lines = file.read().splitlines()
+        samples = sum(int(line.rsplit(" ", 1)[1]) for line in lines)
+        print(f"stack: {os.path.basename(profiler.last_output)}, {len(lines)} stacks, {samples} samples")
+        assert any("handler (bench_profiler.py" in line for line in lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark: tag-based query result cache over reference data.
+
+Runs 20k lookups against a countries/currencies reference schema in a file
+database, without a cache and through CachingConnection, then checks that
+writes through a second connection sharing the cache invalidate the
+entries of the tables they touch (and only those), that a transaction
+reads its own uncommitted writes, that writes run through ``fetchall``,
+behind comments or after a WITH clause invalidate only their table, that
+an autocommit connection keeps using the cache after writing, and that
+the byte bound holds. Run with:
+
+    python -m nestpy_protocols.test.bench_query_cache
+"""
+
+import os
+import time
+import random
+import tempfile
+from nestpy_protocols.sqlprotocols.connection import SQLiteConnection
+from nestpy_protocols.sqlprotocols.query_cache import CachingConnection, QueryCache
+
+LOOKUPS = 20_000
+
+LOOKUP = (
+    "SELECT c.code, c.name, cu.code, cu.symbol FROM countries c "
+    "JOIN currencies cu ON cu.id = c.currency_id WHERE c.region = ? ORDER BY c.code"
+)
+
+CURRENCIES = "SELECT code FROM currencies WHERE id = ?"
+
+
+def run(connection, regions):
+    started = time.perf_counter()
+    for region in regions:
+        connection.fetchall(LOOKUP, (region,))
+    return (time.perf_counter() - started) / len(regions)
+
+
+def main():
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "reference.db")
+        setup = SQLiteConnection(path)
+        setup.execute("CREATE TABLE currencies (id INTEGER PRIMARY KEY, code TEXT, symbol TEXT)")
+        setup.execute("CREATE TABLE countries (code TEXT PRIMARY KEY, name TEXT, region INTEGER, currency_id INTEGER)")
+        setup.bulk_write("INSERT INTO currencies VALUES (?, ?, ?)", ((i, f"C{i:02}", "$") for i in range(60)))
+        setup.bulk_write(
+            "INSERT INTO countries VALUES (?, ?, ?, ?)",
+            ((f"K{i:03}", f"Country {i}", i % 20, i % 60) for i in range(250))
+        )
+        setup.close()
+
+        regions = [rng.randrange(20) for _ in range(LOOKUPS)]
+        plain = SQLiteConnection(path)
+        uncached = run(plain, regions)
+
+        cache = QueryCache(max_bytes=4 * 1024 * 1024)
+        reader = CachingConnection(SQLiteConnection(path), cache)
+        cached = run(reader, regions)
+        stats = cache.stats()
+        print(f"uncached lookup : {uncached * 1e6:7.1f} us")
+        print(f"cached lookup   : {cached * 1e6:7.1f} us ({uncached / cached:.1f}x faster), "
+              f"hit ratio {stats['hit_ratio']:.3f}, {stats['entries']} entries, {stats['bytes'] / 1024:.0f} KiB")
+        assert reader.fetchall(LOOKUP, (3,)) == plain.fetchall(LOOKUP, (3,))
+
+        # Writes through another connection sharing the cache invalidate by table.
+        writer = CachingConnection(SQLiteConnection(path), cache)
+        assert reader.fetchall(CURRENCIES, (7,)) == [("C07",)]
+        before, hits = len(cache), cache.hits
+        writer.execute("UPDATE countries SET name = 'Renamed' WHERE code = 'K003'")
+        writer.commit()
+        assert len(cache) == before - 20, "only the 20 country lookups are dropped"
+        assert ("K003", "Renamed", "C03", "$") in reader.fetchall(LOOKUP, (3,))
+        assert reader.fetchall(CURRENCIES, (7,)) == [("C07",)] and cache.hits == hits + 1
+
+        # A transaction reads its own writes without serving them to others.
+        writer.execute("UPDATE currencies SET code = 'XXX' WHERE id = 7")
+        assert writer.fetchall(CURRENCIES, (7,)) == [("XXX",)]
+        assert reader.fetchall(CURRENCIES, (7,)) == [("C07",)]
+        writer.rollback()
+        assert reader.fetchall(CURRENCIES, (7,)) == [("C07",)]
+        with writer.transaction():
+            writer.execute("UPDATE currencies SET code = 'YYY' WHERE id = 7")
+        assert reader.fetchall(CURRENCIES, (7,)) == [("YYY",)]
+        print(f"invalidation    : ok {cache.stats()}")
+
+        # A table joined after a comma join is tagged too.
+        writer.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+        writer.execute("INSERT INTO notes VALUES (1, 'old')")
+        writer.commit()
+        joined = (
+            "SELECT n.body FROM countries c, currencies cu JOIN notes n ON n.id = 1 "
+            "WHERE c.code = 'K001' AND cu.id = c.currency_id"
+        )
+        assert reader.fetchall(joined) == [("old",)]
+        writer.execute("UPDATE notes SET body = 'new' WHERE id = 1")
+        writer.commit()
+        assert reader.fetchall(joined) == [("new",)]
+
+        # Writes through fetchall (RETURNING), after comments or a WITH clause are targeted.
+        assert reader.fetchall(CURRENCIES, (7,)) == [("YYY",)]
+        assert writer.fetchall("UPDATE notes SET body = 'returned' WHERE id = 1 RETURNING body") == [("returned",)]
+        writer.commit()
+        assert reader.fetchall(joined) == [("returned",)]
+        for update in (
+                "/* tagged */ UPDATE notes SET body = 'commented' WHERE id = 1",
+                "WITH target(id) AS (SELECT 1) UPDATE notes SET body = 'cte' WHERE id IN (SELECT id FROM target)",
+        ):
+            before = cache.invalidations
+            writer.execute(update)
+            writer.commit()
+            assert cache.invalidations == before + 1, "only the joined query reading notes is dropped"
+            assert reader.fetchall(joined) == [(update.split("'")[1],)]
+        assert reader.fetchall(CURRENCIES, (7,)) == [("YYY",)]
+
+        # An autocommit connection keeps using the cache for a table it wrote.
+        autocommit = CachingConnection(SQLiteConnection(path, isolation_level=None), cache)
+        autocommit.execute("UPDATE currencies SET symbol = '$' WHERE id = 8")
+        hits = cache.hits
+        autocommit.fetchall(CURRENCIES, (7,))
+        autocommit.fetchall(CURRENCIES, (7,))
+        assert cache.hits == hits + 1
+        print("targeted writes : ok")
+
+        small = QueryCache(max_bytes=64 * 1024)
+        bounded = CachingConnection(SQLiteConnection(path), small)
+        for region in range(20):
+            bounded.fetchall(LOOKUP, (region,))
+        assert small.bytes <= 64 * 1024 and small.evictions > 0
+        print(f"byte bound      : {small.bytes} bytes in {len(small)} entries, {small.evictions} evictions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Lab check: read/write splitting over a primary and three sqlite "replicas".
+
+Four sqlite files stand in for the nodes; ``replicate()`` copies the
+primary to the replicas with the sqlite backup API to simulate lagging
+replication. The check verifies read-your-writes stickiness, then sends
+mixed traffic from 12 threads with one replica made 5x slower, and shows
+how least-outstanding-requests balancing spreads the reads. Also checks
+that AsyncReplicaRouter.write commits like the sync router. Run with:
+
+    python -m nestpy_protocols.test.bench_replicas
+"""
+
+import os
+import time
+import asyncio
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from nestpy_protocols.sqlprotocols.pool import AsyncSQLiteConnectionPool, ConnectionPool
+from nestpy_protocols.sqlprotocols.routing import AsyncReplicaRouter, ReplicaRouter, is_read_only
+
+REQUESTS = 3000
+
+READ_COST = 0.001
+
+
+def node_pool(path, slowdown=1):
+    def work(value):
+        time.sleep(READ_COST * slowdown)
+        return value
+
+    def connect():
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.create_function("work", 1, work)
+        return connection
+
+    return ConnectionPool(connect, max_size=8)
+
+
+def main():
+    assert is_read_only("  select 1") and is_read_only("WITH t AS (SELECT 1) SELECT * FROM t")
+    assert not is_read_only("WITH t AS (SELECT 1) DELETE FROM items") and not is_read_only("UPDATE items SET a = 1")
+    assert not is_read_only("SELECT * FROM items WHERE id = 1 FOR UPDATE")
+    assert not is_read_only("select * from items for no key update skip locked")
+    assert not is_read_only("SELECT * FROM items FOR SHARE") and not is_read_only("SELECT 1 LOCK IN SHARE MODE")
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, f"node{i}.db") for i in range(4)]
+        primary = node_pool(paths[0])
+        with primary.connection() as connection:
+            connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+            connection.executemany("INSERT INTO items (name) VALUES (?)", ((f"item-{i}",) for i in range(100)))
+            connection.commit()
+
+        def replicate():
+            with primary.connection() as source:
+                for path in paths[1:]:
+                    target = sqlite3.connect(path)
+                    source.backup(target)
+                    target.close()
+
+        replicate()
+        router = ReplicaRouter(
+            primary,
+            [node_pool(paths[1], slowdown=5), node_pool(paths[2]), node_pool(paths[3])],
+            sticky_window=0.5
+        )
+
+        count = "SELECT COUNT(*) FROM items"
+        with router.request_scope():
+            router.execute("INSERT INTO items (name) VALUES (?)", ("fresh",))
+            assert router.fetchall(count) == [(101,)], "reads after a write must see it"
+        with router.request_scope():
+            assert router.fetchall(count) == [(100,)], "other requests read the lagging replicas"
+        replicate()
+        with router.request_scope():
+            assert router.fetchall(count) == [(101,)]
+        print(f"stickiness      : ok {router.stats()}")
+
+        def handle(i):
+            with router.request_scope():
+                if i % 20 == 0:
+                    router.execute("UPDATE items SET name = ? WHERE id = ?", (f"renamed-{i}", i % 100 + 1))
+                router.fetchall("SELECT work(id), name FROM items WHERE id = ?", (i % 100 + 1,))
+
+        before = router.stats()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(12) as executor:
+            list(executor.map(handle, range(REQUESTS)))
+        elapsed = time.perf_counter() - started
+        stats = router.stats()
+
+        reads = [after - prior for after, prior in zip(stats["replica_reads"], before["replica_reads"])]
+        primary_reads = stats["primary_reads"] - before["primary_reads"]
+        print(f"mixed traffic   : {REQUESTS / elapsed:7.0f} req/s, writes {stats['writes'] - before['writes']}, "
+              f"primary reads {primary_reads}, replica reads {reads} (replica 0 is 5x slower)")
+        assert primary_reads == REQUESTS // 20 and reads[0] < min(reads[1:])
+
+        async def async_write():
+            async_router = AsyncReplicaRouter(AsyncSQLiteConnectionPool(paths[0]))
+            async with async_router.write() as connection:
+                connection.execute("INSERT INTO items (name) VALUES ('async')")
+            try:
+                async with async_router.write() as connection:
+                    connection.execute("INSERT INTO items (name) VALUES ('failed')")
+                    raise KeyError
+            except KeyError:
+                pass
+            await async_router.primary.close()
+
+        asyncio.run(async_write())
+        with primary.connection() as connection:
+            names = connection.execute("SELECT name FROM items WHERE name IN ('async', 'failed')").fetchall()
+        assert names == [("async",)], "async writes commit, or roll back on error"
+        print("async write     : committed, rolled back on error")
+
+
+if __name__ == "__main__":
+    main()
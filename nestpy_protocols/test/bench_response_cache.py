@@ -0,0 +1,89 @@
+"""
+Benchmark: read-heavy catalog route with and without the response cache.
+
+Replays skewed requests for 2000 catalog items through a route pipeline
+whose endpoint simulates a 200 us database query, once without a cache and
+once with a CachePolicy bounded to 256 entries and 128 KiB, then checks
+the LRU bounds, that Cache-Control directives are matched case-insensitively
+and that responses to authorized requests are not shared. Run with:
+
+    python -m nestpy_protocols.test.bench_response_cache
+"""
+
+import time
+import random
+from nestpy_protocols.webprotocols.http.request import BufferedRequest
+from nestpy_protocols.webprotocols.http.response import Response
+from nestpy_protocols.webprotocols.framework.pipeline import CompiledPipeline
+from nestpy_protocols.webprotocols.framework.cache import CachePolicy, ResponseCacheMiddleware
+
+REQUESTS = 20_000
+
+ITEMS = 2000
+
+QUERY_COST = 200e-6
+
+
+def endpoint(request):
+    deadline = time.perf_counter() + QUERY_COST
+    while time.perf_counter() < deadline:
+        pass
+    return Response(b'{"item": "%s", "price": 10}' % request.path.encode() + b" " * 2000, media_type="application/json")
+
+
+def replay(pipeline, requests):
+    started = time.perf_counter()
+    for request in requests:
+        pipeline.run_sync(request, endpoint)
+    return time.perf_counter() - started
+
+
+def main():
+    rng = random.Random(7)
+    requests = [
+        BufferedRequest(
+            b"GET /catalog/%d?lang=en&page=1 HTTP/1.1\r\nHost: shop\r\nAccept-Language: en\r\n\r\n"
+            % min(int(rng.paretovariate(1.2)), ITEMS)
+        )
+        for _ in range(REQUESTS)
+    ]
+
+    plain = replay(CompiledPipeline(()), requests)
+
+    middleware = ResponseCacheMiddleware(
+        CachePolicy(ttl=60, max_entries=256, max_bytes=128 * 1024, vary=("Accept-Language",))
+    )
+    cached = replay(CompiledPipeline((middleware,)), requests)
+    stats = middleware.cache.stats()
+
+    print(f"no cache  : {REQUESTS / plain:9.0f} req/s")
+    print(f"with cache: {REQUESTS / cached:9.0f} req/s ({plain / cached:.1f}x)")
+    print(f"cache     : {stats}")
+
+    assert stats["bytes"] <= 128 * 1024 and stats["entries"] <= 256
+    head = BufferedRequest(b"HEAD /catalog/1?page=1&lang=en HTTP/1.1\r\nAccept-Language: en\r\n\r\n")
+    response = middleware.before(head)
+    assert response is not None and response.body == b""
+    check_storability()
+
+
+def check_storability():
+    def store(raw, headers=(), vary=()):
+        middleware = ResponseCacheMiddleware(CachePolicy(vary=vary))
+        request = BufferedRequest(raw)
+        middleware.after(request, Response(b"account", headers=list(headers)))
+        return len(middleware.cache)
+
+    anonymous = b"GET /me HTTP/1.1\r\n\r\n"
+    authorized = b"GET /me HTTP/1.1\r\nAuthorization: Bearer alice\r\n\r\n"
+    assert store(anonymous) == 1
+    assert store(anonymous, [("Cache-Control", "No-Store")]) == 0
+    assert store(anonymous, [("cache-control", "max-age=60, PRIVATE")]) == 0
+    assert store(authorized) == 0, "responses to authorized requests are not shared"
+    assert store(authorized, [("Cache-Control", "public, max-age=60")]) == 1
+    assert store(authorized, vary=("Authorization",)) == 1
+    print("storability: directives parsed, authorized responses kept private")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: compiled route index vs. a linear regex scan.
+
+The linear matcher mimics Starlette, which tries every route's compiled
+regular expression in registration order. Run with:
+
+    python -m nestpy_protocols.test.bench_route
+"""
+
+import re
+import random
+import timeit
+from nestpy_protocols.webprotocols.framework.route import Route, RouteIndex
+
+
+def endpoint():
+    return None
+
+
+def build_paths(count):
+    paths = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            paths.append(f"/svc{i}/items")
+        elif kind == 1:
+            paths.append(f"/svc{i}/items/{{item_id:int}}")
+        else:
+            paths.append(f"/svc{i}/users/{{user}}/orders/{{order_id:int}}")
+    return paths
+
+
+def build_linear(paths):
+    compiled = []
+    for path in paths:
+        pattern = re.sub(r"\{(\w+):int\}", r"(?P<\1>[0-9]+)", path)
+        pattern = re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", pattern)
+        compiled.append((re.compile(f"^{pattern}$"), path))
+    return compiled
+
+
+def match_linear(compiled, path):
+    for regex, route in compiled:
+        found = regex.match(path)
+        if found:
+            return route, found.groupdict()
+    return None
+
+
+def concrete(path):
+    return path.replace("{item_id:int}", "42").replace("{user}", "bob").replace("{order_id:int}", "7")
+
+
+def check_backtracking():
+    # The method is part of matching: a leaf without it falls back to the next candidate.
+    index = RouteIndex([
+        Route(path="/items/{id:int}", endpoint=endpoint, methods=frozenset({"GET"})),
+        Route(path="/items/{slug}", endpoint=endpoint, methods=frozenset({"POST"})),
+        Route(path="/users/{user_id}", endpoint=endpoint),
+        Route(path="/users/{id}/posts", endpoint=endpoint),
+        Route(path="/files/{rest:path}", endpoint=endpoint, methods=frozenset({"PUT"})),
+    ]).compile()
+    assert index.match("GET", "/items/5").params == {"id": 5}
+    assert index.match("POST", "/items/5").params == {"slug": "5"}
+    assert index.match("DELETE", "/items/5") is None
+    assert index.allowed_methods("/items/5") == {"GET", "POST"}
+    assert index.match("GET", "/users/ann").params == {"user_id": "ann"}
+    assert index.match("GET", "/users/ann/posts").params == {"id": "ann"}
+    assert index.match("PUT", "/files/a/b").params == {"rest": "a/b"}
+
+
+def main():
+    check_backtracking()
+    print(f"{'routes':>8} {'linear us/op':>14} {'index us/op':>14} {'speedup':>9}")
+    for count in (100, 1_000, 10_000):
+        paths = build_paths(count)
+        index = RouteIndex(Route(path=p, endpoint=endpoint) for p in paths).compile()
+        linear = build_linear(paths)
+        rng = random.Random(count)
+        samples = [concrete(rng.choice(paths)) for _ in range(200)]
+
+        for sample in samples:
+            assert index.match("GET", sample) is not None
+            assert match_linear(linear, sample) is not None
+
+        number = 5 if count >= 10_000 else 20
+        t_linear = timeit.timeit(lambda: [match_linear(linear, s) for s in samples], number=number)
+        t_index = timeit.timeit(lambda: [index.match("GET", s) for s in samples], number=number)
+        per_linear = t_linear / (number * len(samples)) * 1e6
+        per_index = t_index / (number * len(samples)) * 1e6
+        print(f"{count:>8} {per_linear:>14.2f} {per_index:>14.2f} {per_linear / per_index:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: statement preparation cost with and without a sized statement cache.
+
+Runs 300 distinct join queries (each written in two layouts, as happens
+when the same query lives in two call sites) round-robin against SQLite:
+with the driver cache disabled, with ``sqlite3``'s default
+``cached_statements`` (128), and through SQLiteConnection with a 512-entry
+StatementCache. Run with:
+
+    python -m nestpy_protocols.test.bench_statements
+"""
+
+import time
+import sqlite3
+from nestpy_protocols.sqlprotocols.connection import SQLiteConnection
+
+QUERIES = 300
+
+ROUNDS = 20
+
+SCHEMA = """
+CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, category INTEGER);
+CREATE TABLE orders (id INTEGER PRIMARY KEY, item_id INTEGER, total REAL, status TEXT);
+CREATE INDEX orders_item ON orders (item_id);
+"""
+
+
+def workload():
+    statements = []
+    for i in range(QUERIES):
+        compact = (
+            "SELECT a.id, a.name, SUM(b.total), COUNT(*) FROM items a JOIN orders b ON b.item_id = a.id "
+            f"WHERE a.category = ? AND b.status IN ('paid', 'shipped') AND b.total > {i} GROUP BY a.id, a.name"
+        )
+        formatted = compact.replace(" FROM", "\n    FROM").replace(" WHERE", "\n    WHERE") + ";"
+        statements.extend((compact, formatted))
+    return statements
+
+
+def run(connection, statements):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for sql in statements:
+            connection.execute(sql, (7,)).fetchall()
+    return time.perf_counter() - started
+
+
+def setup(connection):
+    connection.executescript(SCHEMA)
+    connection.executemany("INSERT INTO items VALUES (?, ?, ?)", ((i, f"item-{i}", i % 50) for i in range(500)))
+    connection.commit()
+
+
+def main():
+    statements = workload()
+    executions = ROUNDS * len(statements)
+
+    for label, cached in (("driver cache off", 0), ("driver default (128)", 128)):
+        connection = sqlite3.connect(":memory:", cached_statements=cached)
+        setup(connection)
+        elapsed = run(connection, statements)
+        print(f"{label:22}: {elapsed / executions * 1e6:6.1f} us/query")
+
+    connection = SQLiteConnection(":memory:", statement_cache_size=512)
+    setup(connection.connection)
+    elapsed = run(connection, statements)
+    stats = connection.statements.stats()
+    print(f"{'StatementCache (512)':22}: {elapsed / executions * 1e6:6.1f} us/query, "
+          f"hit ratio {stats['hit_ratio']:.3f}, {stats['size']} statements")
+    assert stats["size"] == QUERIES
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: streaming scans and batched bulk writes on SQLiteConnection.
+
+Scans 10M generated rows with ``stream`` and reports the traced peak memory
+against ``fetchall`` of 1M rows, then inserts rows into a file database
+one statement per transaction, one statement per row in a single
+transaction, with ``executemany`` batches and with ``bulk_write``, and
+checks that bulk writes are rolled back with the caller's transaction.
+Run with:
+
+    python -m nestpy_protocols.test.bench_streaming_sql
+"""
+
+import os
+import time
+import sqlite3
+import tempfile
+import tracemalloc
+from itertools import islice
+from nestpy_protocols.sqlprotocols.connection import SQLiteConnection
+
+SCAN_ROWS = 10_000_000
+
+FETCHALL_ROWS = 1_000_000
+
+GENERATED = (
+    "WITH RECURSIVE numbers(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM numbers LIMIT ?) "
+    "SELECT n, 'row-' || n, n * 0.5 FROM numbers"
+)
+
+INSERT = "INSERT INTO events (id, name, value) VALUES (?, ?, ?)"
+
+
+def traced(function):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def rows(count, start=0):
+    return ((i, f"event-{i}", i * 0.5) for i in range(start, start + count))
+
+
+def check_atomicity(connection, total):
+    # A bulk_write in the caller's transaction is rolled back with it.
+    try:
+        with connection.transaction():
+            connection.bulk_write(INSERT, rows(10, start=40_000_000))
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert connection.fetchone("SELECT COUNT(*) FROM events")[0] == total
+
+    # A failing nested bulk_write only undoes its own rows.
+    with connection.transaction():
+        connection.execute(INSERT, (50_000_000, "kept", 0.0))
+        try:
+            connection.bulk_write(INSERT, [(50_000_001, "undone", 0.0), (0, "duplicate id", 0.0)])
+        except sqlite3.IntegrityError:
+            pass
+        assert connection.transaction_depth == 1
+    assert connection.fetchall("SELECT name FROM events WHERE id >= 50000000") == [("kept",)]
+
+    # Statements run before the block keep the driver's implicit transaction: the caller decides.
+    connection.execute("DELETE FROM events")
+    connection.bulk_write(INSERT, rows(10, start=60_000_000))
+    assert connection.in_transaction
+    connection.rollback()
+    assert connection.fetchone("SELECT COUNT(*) FROM events")[0] == total + 1
+    print("atomicity                : rolled back with the caller, nested failures undone alone")
+
+
+def main():
+    connection = SQLiteConnection(":memory:")
+
+    total, elapsed, peak = traced(lambda: sum(1 for _ in connection.stream(GENERATED, (SCAN_ROWS,), batch_size=1000)))
+    assert total == SCAN_ROWS
+    print(f"stream {SCAN_ROWS:,} rows      : {elapsed:6.1f} s, peak {peak / 2 ** 20:7.2f} MiB")
+
+    result, elapsed, peak = traced(lambda: connection.fetchall(GENERATED, (FETCHALL_ROWS,)))
+    assert len(result) == FETCHALL_ROWS
+    del result
+    print(f"fetchall {FETCHALL_ROWS:,} rows     : {elapsed:6.1f} s, peak {peak / 2 ** 20:7.2f} MiB")
+
+    with tempfile.TemporaryDirectory() as directory:
+        connection = SQLiteConnection(os.path.join(directory, "bulk.db"))
+        connection.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, name TEXT, value REAL)")
+        connection.commit()
+
+        count = 2000
+        started = time.perf_counter()
+        for row in rows(count):
+            connection.execute(INSERT, row)
+            connection.commit()
+        autocommit = (time.perf_counter() - started) / count
+
+        count = 200_000
+        started = time.perf_counter()
+        with connection.transaction():
+            for row in rows(count, start=10_000_000):
+                connection.execute(INSERT, row)
+        single = (time.perf_counter() - started) / count
+
+        count = 1_000_000
+        started = time.perf_counter()
+        with connection.transaction():
+            batches = rows(count, start=20_000_000)
+            while connection.executemany(INSERT, islice(batches, 5000)).rowcount:
+                pass
+        many = (time.perf_counter() - started) / count
+
+        started = time.perf_counter()
+        written = connection.bulk_write(INSERT, rows(count, start=30_000_000), batch_size=5000)
+        bulk = (time.perf_counter() - started) / count
+        assert written == count
+        total = 2000 + 200_000 + 2 * count
+        assert connection.fetchone("SELECT COUNT(*), SUM(id = 30999999) FROM events") == (total, 1)
+
+        print(f"per-row, commit each     : {autocommit * 1e6:8.1f} us/row")
+        print(f"per-row, one transaction : {single * 1e6:8.1f} us/row")
+        print(f"executemany (5000/batch) : {many * 1e6:8.1f} us/row")
+        print(f"bulk_write (5000/batch)  : {bulk * 1e6:8.1f} us/row "
+              f"({autocommit / bulk:.0f}x / {single / bulk:.1f}x faster)")
+        check_atomicity(connection, total)
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
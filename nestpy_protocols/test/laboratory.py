@@ -1,6 +1,7 @@
 """
 from typing import Callable, Union, Any, Dict, List, Type, Optional, Sequence
 from nestpy_protocols.webprotocols import AbstractWebServer
+from nestpy_protocols.webprotocols.framework.route import RouteManifest
 from fastapi import FastAPI, APIRouter
 from  flask import  Flask
 import threading
@@ -41,19 +42,19 @@ class FastAPIAdapter(AbstractWebServer):
             dependencies: Optional[List[Any]] = None,
             include_in_schema: Optional[bool] = True,
     ) -> None:
-        router = APIRouter(
-            prefix=prefix,
+        self.index_router_group(
+            name,
+            prefix,
             tags=tags,
             dependencies=dependencies,
             include_in_schema=include_in_schema
         )
-        self.routers[name] = router
 
     def get_router_group(self, router_name: str) -> Any:
         return self.routers.get(router_name, None)
 
     def add_route_in_router_group(self, router_name: str, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
-        self.routers[router_name].add_api_route(path=path, endpoint=endpoint, **kwargs)
+        self.index_route(path, endpoint, router_group=router_name, **kwargs)
 
     def set_title(self, title) -> None:
         self.app.title = title
@@ -61,10 +62,20 @@ class FastAPIAdapter(AbstractWebServer):
     def set_description(self, description: str) -> None:
         self.app.description = description
 
-    def listen(self, host: str, port: Union[str, int]) -> None:
-        for router in self.routers.values():
+    def apply_route_manifest(self, manifest: RouteManifest) -> None:
+        for route in manifest.routes_for(None):
+            self.app.add_api_route(route.path, route.endpoint, methods=list(route.methods), **dict(route.options))
+
+        for group in manifest.router_groups:
+            router = APIRouter(prefix=group.prefix, **dict(group.options))
+            for route in manifest.routes_for(group.name):
+                router.add_api_route(route.path, route.endpoint, methods=list(route.methods), **dict(route.options))
+            self.routers[group.name] = router
             self.app.include_router(router=router)
 
+    def listen(self, host: str, port: Union[str, int]) -> None:
+        self.apply_route_manifest(self.build_route_manifest())
+
         import uvicorn
         uvicorn.run(self.app, host=host, port=port)
 
@@ -120,7 +131,7 @@ class FastAPIAdapter(AbstractWebServer):
         self.app.lifespan = lifespan
 
     def add_api_route(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
-        self.app.add_api_route(path, endpoint, **kwargs)
+        self.index_route(path, endpoint, **kwargs)
 
     def add_api_websocket_route(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
         self.app.add_api_websocket_route(path, endpoint, **kwargs)
@@ -1,8 +1,30 @@
-from nestpy_protocols.webprotocols.framework.comp import FrameworkCompProtocol
-from nestpy_protocols.webprotocols.framework.mw import FrameworkMwProtocol
-from nestpy_protocols.webprotocols.framework.conf import FrameworkConfProtocol
-from nestpy_protocols.webprotocols.framework.doc import FrameworkDocProtocol
-from nestpy_protocols.webprotocols.framework.exc import FrameworkExcProtocol
+"""
+Package exposing the web framework contracts.
+
+Contracts are imported lazily: a module such as ``framework.doc`` is only
+loaded the first time its protocol is accessed on this package, which keeps
+``import nestpy_protocols.webprotocols`` cheap for pre-forked workers and
+short-lived CLI tools.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from nestpy_protocols.webprotocols.framework.comp import FrameworkCompProtocol
+    from nestpy_protocols.webprotocols.framework.mw import FrameworkMwProtocol
+    from nestpy_protocols.webprotocols.framework.conf import FrameworkConfProtocol
+    from nestpy_protocols.webprotocols.framework.doc import FrameworkDocProtocol
+    from nestpy_protocols.webprotocols.framework.exc import FrameworkExcProtocol
+
+
+_LAZY_EXPORTS = {
+    "FrameworkCompProtocol": "nestpy_protocols.webprotocols.framework.comp",
+    "FrameworkMwProtocol": "nestpy_protocols.webprotocols.framework.mw",
+    "FrameworkConfProtocol": "nestpy_protocols.webprotocols.framework.conf",
+    "FrameworkDocProtocol": "nestpy_protocols.webprotocols.framework.doc",
+    "FrameworkExcProtocol": "nestpy_protocols.webprotocols.framework.exc",
+}
 
 
 __all__ =[
@@ -12,3 +34,30 @@ __all__ =[
     "FrameworkConfProtocol",
     "FrameworkExcProtocol",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Import a contract on first access and cache it on the package.
+
+    Args:
+        name: The attribute requested from the package.
+
+    Returns:
+        The requested protocol class.
+
+    Raises:
+        AttributeError: If the name is not one of the exported contracts.
+    """
+    module_name = _LAZY_EXPORTS.get(name)
+
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,293 @@
+"""
+Module providing admission control and adaptive load shedding.
+
+This module declares the AdmissionController and the ASGI
+AdmissionMiddleware installed through
+``FrameworkMwProtocol.global_middleware``. A request is admitted in three
+steps:
+
+1. Per-client token bucket: a client over its rate gets 429 with a
+   Retry-After header.
+2. Global concurrency limit: beyond ``max_concurrency`` requests in flight,
+   requests wait in a bounded FIFO queue; a full queue gets 503.
+3. Queue-time shedding (CoDel-style): the queueing delay of every request
+   leaving the queue is measured. Once it has stayed above ``target_delay``
+   for a whole ``interval``, requests that waited longer than the target are
+   rejected with 503 instead of being served late, and new requests that
+   would have to queue are rejected on arrival, until the delay drops below
+   the target again.
+
+Served requests therefore never wait much longer than the target, which
+keeps the p99 of admitted requests bounded while the excess is rejected
+early and cheaply. The controller is meant for a single event loop (one
+per worker process).
+"""
+
+import time
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, MutableMapping, Optional, Tuple
+
+
+Scope = MutableMapping[str, Any]
+
+Receive = Callable[[], Awaitable[MutableMapping[str, Any]]]
+
+Send = Callable[[MutableMapping[str, Any]], Awaitable[None]]
+
+
+class AdmissionRejected(RuntimeError):
+    """
+    Raised when a request is not admitted.
+
+    Attributes:
+        status: The HTTP status to answer with (429 or 503).
+        retry_after: Suggested seconds before retrying.
+        reason: 'rate', 'queue_full' or 'shed'.
+    """
+
+    def __init__(self, status: int, retry_after: float, reason: str) -> None:
+        super().__init__(f"Request rejected ({reason})")
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Token buckets, concurrency limit and queue-delay shedding for one event loop.
+
+    Args:
+        max_concurrency: The number of requests served at the same time.
+        max_queue: The number of requests allowed to wait for a slot.
+        target_delay: The acceptable queueing delay in seconds.
+        interval: How long the delay must stay above the target before
+                  shedding starts, in seconds.
+        rate: Requests per second allowed per client (None disables rate limits).
+        burst: The token bucket capacity per client (defaults to ``rate``).
+        max_clients: The number of client buckets kept before idle ones are dropped.
+    """
+
+    def __init__(
+            self,
+            max_concurrency: int = 64,
+            max_queue: int = 1024,
+            target_delay: float = 0.005,
+            interval: float = 0.1,
+            rate: Optional[float] = None,
+            burst: Optional[float] = None,
+            max_clients: int = 100_000
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.target_delay = target_delay
+        self.interval = interval
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self.max_clients = max_clients
+
+        self.in_flight = 0
+        self._waiters: Deque[Tuple["asyncio.Future[None]", float]] = deque()
+        self._buckets: Dict[Any, List[float]] = {}
+        self._above_since: Optional[float] = None
+        self.shedding = False
+
+        self.admitted = 0
+        self.rejected_rate = 0
+        self.rejected_queue = 0
+        self.shed = 0
+
+    def _take_token(self, client: Any, now: float) -> float:
+        # Returns 0 when a token was taken, else the seconds until the next one.
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            if len(self._buckets) >= self.max_clients:
+                self._drop_idle_buckets(now)
+            bucket = self._buckets[client] = [self.burst, now]
+
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / self.rate
+
+    def _drop_idle_buckets(self, now: float) -> None:
+        full = [client for client, (tokens, last) in self._buckets.items()
+                if tokens + (now - last) * self.rate >= self.burst]
+        for client in full:
+            del self._buckets[client]
+        if len(self._buckets) >= self.max_clients:
+            self._buckets.clear()
+
+    def _observe_delay(self, delay: float, now: float) -> bool:
+        # CoDel's control law, reduced to a state flag: returns whether to shed.
+        if delay < self.target_delay:
+            self._above_since = None
+            self.shedding = False
+            return False
+
+        if self._above_since is None:
+            self._above_since = now
+        elif now - self._above_since >= self.interval:
+            self.shedding = True
+        return self.shedding
+
+    async def acquire(self, client: Any = None) -> None:
+        """
+        Wait for a slot, or reject the request.
+
+        Every successful ``acquire`` must be paired with ``release``.
+
+        Args:
+            client: The key of the client for rate limiting (e.g. its address).
+
+        Returns:
+            None once the request is admitted.
+
+        Raises:
+            AdmissionRejected: If the request is rate limited, the queue is
+                               full or the request is shed.
+        """
+        now = time.monotonic()
+
+        if self.rate is not None:
+            wait = self._take_token(client, now)
+            if wait:
+                self.rejected_rate += 1
+                raise AdmissionRejected(429, wait, "rate")
+
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            self._observe_delay(0.0, now)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_queue += 1
+            raise AdmissionRejected(503, self.target_delay, "queue_full")
+
+        if self.shedding:
+            # Reject on arrival rather than after waiting in the queue.
+            self.shed += 1
+            raise AdmissionRejected(503, self.interval, "shed")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((future, now))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before the cancellation.
+                self.release()
+            raise
+
+        dequeued = time.monotonic()
+        if self._observe_delay(dequeued - now, dequeued):
+            self.shed += 1
+            self.release()
+            raise AdmissionRejected(503, self.interval, "shed")
+
+        self.admitted += 1
+
+    def release(self) -> None:
+        """
+        Free a slot, handing it to the oldest waiting request if any.
+
+        Returns:
+            None
+        """
+        while self._waiters:
+            future, _ = self._waiters.popleft()
+            if not future.done():
+                # The slot passes to the waiter: in_flight is unchanged.
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the counters of the controller.
+
+        Returns:
+            A JSON-serializable mapping of gauges and rejection counters.
+        """
+        return {
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "shedding": self.shedding,
+            "admitted": self.admitted,
+            "rejected_rate": self.rejected_rate,
+            "rejected_queue": self.rejected_queue,
+            "shed": self.shed,
+        }
+
+
+def client_address(scope: Scope) -> Any:
+    """
+    Return the client host of an ASGI scope, the default rate-limit key.
+
+    Args:
+        scope: The ASGI connection scope.
+
+    Returns:
+        The client host, or None if unknown.
+    """
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying an AdmissionController to HTTP requests.
+
+    Accepted by ``global_middleware`` of ASGI adapters, either directly or as
+    ``functools.partial(AdmissionMiddleware, controller=...)``. Websocket and
+    lifespan scopes pass through.
+
+    Args:
+        app: The wrapped ASGI application.
+        controller: The AdmissionController to apply.
+        client_key: Callable returning the rate-limit key of a scope.
+    """
+
+    def __init__(
+            self,
+            app: Callable[[Scope, Receive, Send], Awaitable[None]],
+            controller: AdmissionController,
+            client_key: Callable[[Scope], Any] = client_address
+    ) -> None:
+        self.app = app
+        self.controller = controller
+        self.client_key = client_key
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire(self.client_key(scope))
+        except AdmissionRejected as rejected:
+            await _reject(send, rejected)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+
+async def _reject(send: Send, rejected: AdmissionRejected) -> None:
+    body = b"Too Many Requests" if rejected.status == 429 else b"Service Unavailable"
+    await send({
+        "type": "http.response.start",
+        "status": rejected.status,
+        "headers": [
+            (b"content-type", b"text/plain"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            (b"retry-after", str(max(1, round(rejected.retry_after))).encode("ascii")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -7,14 +7,19 @@ specifies composition methods to attach various server contract objects
 a web server adapter implementation.
 """
 
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from nestpy_protocols.webprotocols import (
-    FrameworkDocProtocol,
-    FrameworkConfProtocol,
-    FrameworkMwProtocol,
-    FrameworkCompProtocol,
-    FrameworkExcProtocol
-)
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from nestpy_protocols.webprotocols import (
+        FrameworkDocProtocol,
+        FrameworkConfProtocol,
+        FrameworkMwProtocol,
+        FrameworkCompProtocol,
+        FrameworkExcProtocol
+    )
 
 
 class FrameworkWebProtocol(ABC):
@@ -0,0 +1,275 @@
+"""
+Module providing the route-level response cache.
+
+This module declares the CachePolicy declared when a route is registered
+(``FrameworkCompProtocol.index_route(..., cache=CachePolicy(...))``), the
+ResponseCache store and the ResponseCacheMiddleware that serves it. The
+middleware is appended as the innermost middleware of the route, so
+authentication and other outer middleware still run on a hit, while the
+endpoint does not.
+
+Entries are keyed by method, path, query string and the values of the
+headers named in ``vary``. As a shared cache (RFC 9111, section 3.5), it
+does not store responses to requests carrying ``Authorization`` unless the
+response explicitly allows it or ``Authorization`` is part of ``vary``. The store is bounded by entry count and by the
+bytes of the cached bodies and headers, evicting the least recently used
+entries first; expired entries are dropped when they are read.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from nestpy_protocols.webprotocols.framework.pipeline import Middleware
+
+
+CacheKey = Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Caching options of a route.
+
+    Attributes:
+        ttl: Seconds a response stays fresh.
+        max_entries: The maximum number of cached responses.
+        max_bytes: The maximum total size of the cached responses; a single
+                   response larger than this is never cached.
+        vary: Request header names whose values are part of the key.
+        methods: The request methods whose responses are cached.
+        statuses: The response status codes that are cached.
+        normalize_query: Sort query parameters so '?a=1&b=2' and '?b=2&a=1'
+                         share an entry.
+    """
+
+    ttl: float = 60.0
+    max_entries: int = 1024
+    max_bytes: int = 16 * 1024 * 1024
+    vary: Tuple[str, ...] = ()
+    methods: FrozenSet[str] = frozenset({"GET", "HEAD"})
+    statuses: FrozenSet[int] = frozenset({200})
+    normalize_query: bool = True
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """
+    A response stored in the cache.
+
+    Attributes:
+        status: The HTTP status code.
+        headers: The response headers.
+        body: The response body.
+        expires: The monotonic time after which the entry is stale.
+        size: The bytes accounted for the entry.
+    """
+
+    status: int
+    headers: Tuple[Tuple[str, str], ...]
+    body: bytes
+    expires: float
+    size: int
+
+
+class ResponseCache:
+    """
+    Thread-safe response store with TTL and LRU eviction by bytes.
+
+    Args:
+        policy: The CachePolicy bounding the store.
+    """
+
+    def __init__(self, policy: CachePolicy) -> None:
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self._vary = tuple(name.lower() for name in policy.vary)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, request: Any) -> Optional[CacheKey]:
+        """
+        Build the cache key of a request.
+
+        Args:
+            request: A RequestProtocol (method, path, query_string, header()).
+
+        Returns:
+            The key, or None if the request method is not cacheable.
+        """
+        method = request.method
+        if method not in self.policy.methods:
+            return None
+        if method == "HEAD":
+            # HEAD requests are answered from the GET entry, without the body.
+            method = "GET"
+
+        query = request.query_string
+        if query and self.policy.normalize_query:
+            query = "&".join(sorted(query.split("&")))
+
+        if not self._vary:
+            return method, request.path, query
+        return (method, request.path, query) + tuple(request.header(name) for name in self._vary)
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        """
+        Return a fresh entry and mark it as recently used.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The CachedResponse, or None on a miss or an expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                del self._entries[key]
+                self.bytes -= entry.size
+            self.misses += 1
+            return None
+
+    def put(self, key: CacheKey, status: int, headers: List[Tuple[str, str]], body: bytes) -> bool:
+        """
+        Store a response, evicting least recently used entries to stay in bounds.
+
+        Args:
+            key: The cache key.
+            status: The HTTP status code.
+            headers: The response headers.
+            body: The response body.
+
+        Returns:
+            True if the response was stored.
+        """
+        size = len(body) + sum(len(name) + len(value) for name, value in headers)
+        if size > self.policy.max_bytes:
+            return False
+
+        entry = CachedResponse(status, tuple(headers), body, time.monotonic() + self.policy.ttl, size)
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.size
+
+            self._entries[key] = entry
+            self.bytes += size
+
+            while self.bytes > self.policy.max_bytes or len(self._entries) > self.policy.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.size
+                self.evictions += 1
+
+        return True
+
+    def clear(self) -> None:
+        """
+        Drop every entry (counters are kept).
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the counters of the cache.
+
+        Returns:
+            A JSON-serializable mapping of entries, bytes, hits, misses,
+            evictions and hit ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Cache-Control directives allowing a shared cache to store a response to an authorized request.
+_SHARED_WITH_AUTHORIZATION = frozenset({"public", "s-maxage", "must-revalidate"})
+
+
+def _directives(value: str) -> FrozenSet[str]:
+    return frozenset(item.split("=", 1)[0].strip().lower() for item in value.split(","))
+
+
+def _is_storable(headers: List[Tuple[str, str]], authorized: bool) -> bool:
+    directives: FrozenSet[str] = frozenset()
+    for name, value in headers:
+        lowered = name.lower()
+        if lowered == "set-cookie":
+            return False
+        if lowered == "cache-control":
+            directives |= _directives(value)
+    if "no-store" in directives or "private" in directives:
+        return False
+    return not authorized or not directives.isdisjoint(_SHARED_WITH_AUTHORIZATION)
+
+
+class ResponseCacheMiddleware(Middleware):
+    """
+    Hook-style middleware serving a route from a ResponseCache.
+
+    Only buffered responses (objects with ``status``, ``headers`` and a bytes
+    ``body``, such as ``http.response.Response``) are stored; streaming and
+    file responses, responses setting cookies and ``Cache-Control: no-store``
+    or ``private`` responses pass through untouched, as do responses to
+    requests with ``Authorization`` (see the module documentation).
+
+    Args:
+        policy: The CachePolicy of the route.
+    """
+
+    def __init__(self, policy: CachePolicy) -> None:
+        from nestpy_protocols.webprotocols.http.response import Response
+
+        self.cache = ResponseCache(policy)
+        self._response = Response
+        self._keyed_by_authorization = any(name.lower() == "authorization" for name in policy.vary)
+
+    def before(self, request: Any) -> Any:
+        key = self.cache.key(request)
+        if key is None:
+            return None
+
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+
+        body = b"" if request.method == "HEAD" else entry.body
+        response = self._response(body, entry.status, entry.headers)
+        response.set_header("Content-Length", str(len(entry.body)))
+        return response
+
+    def after(self, request: Any, response: Any) -> Any:
+        body = getattr(response, "body", None)
+        if not isinstance(body, bytes) or response.status not in self.cache.policy.statuses:
+            return response
+        authorized = not self._keyed_by_authorization and request.header("authorization") is not None
+        if request.method == "HEAD" or not _is_storable(response.headers, authorized):
+            return response
+
+        key = self.cache.key(request)
+        if key is not None:
+            self.cache.put(key, response.status, response.headers, body)
+        return response
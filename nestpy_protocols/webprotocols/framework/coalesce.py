@@ -0,0 +1,252 @@
+"""
+Module providing single-flight coalescing of identical in-flight requests.
+
+This module declares the CoalescePolicy declared when a route is registered
+(``FrameworkCompProtocol.index_route(..., coalesce=CoalescePolicy())``) and
+the SingleFlight group behind it. The route endpoint is wrapped so that
+while one call for a key is running, identical calls wait for it and share
+its result (or exception) instead of running the handler again.
+
+Coroutine endpoints are coalesced on the event loop; regular endpoints,
+which frameworks run in a thread pool, are coalesced across threads. The
+shared result is the same object for every caller, so endpoints returning
+one-shot bodies (streams, generators) must not be coalesced.
+"""
+
+import asyncio
+import inspect
+import threading
+from functools import wraps
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class CoalescePolicy:
+    """
+    Coalescing options of a route.
+
+    Attributes:
+        key: A callable receiving the endpoint arguments and returning the
+             key of the call; None uses ``default_key``. Calls whose key is
+             not hashable are never coalesced.
+    """
+
+    key: Optional[Callable[..., Hashable]] = None
+
+
+# Headers identifying the caller: requests differing in them never share a response.
+IDENTITY_HEADERS = ("authorization", "cookie")
+
+
+def _request_key(value: Any) -> Optional[Tuple[Any, ...]]:
+    method = getattr(value, "method", None)
+    if not isinstance(method, str):
+        return None
+
+    if hasattr(value, "query_string") and hasattr(value, "path"):
+        path, query = value.path, value.query_string
+    else:
+        # ASGI framework requests (e.g. Starlette) expose a parsed URL instead.
+        url = getattr(value, "url", None)
+        if url is None or not hasattr(url, "path"):
+            return None
+        path, query = url.path, getattr(url, "query", "")
+
+    header = getattr(value, "header", None)
+    if not callable(header):
+        headers = getattr(value, "headers", None)
+        header = getattr(headers, "get", None)
+        if header is None:
+            return None
+    return (method, path, query) + tuple(header(name) for name in IDENTITY_HEADERS)
+
+
+def default_key(*args: Any, **kwargs: Any) -> Hashable:
+    """
+    Build a coalescing key from endpoint arguments.
+
+    Request objects (anything with a ``method``, a ``path`` and
+    ``query_string`` or a ``url``, and headers) are keyed by method, path,
+    query string and the IDENTITY_HEADERS, so one caller's response is never
+    shared with another. Every other argument is keyed by its value: objects
+    compared by identity only never coalesce, and need ``CoalescePolicy.key``.
+
+    Args:
+        *args: The positional arguments of the endpoint call.
+        **kwargs: The keyword arguments of the endpoint call.
+
+    Returns:
+        The key.
+    """
+    def part(value: Any) -> Any:
+        key = _request_key(value)
+        return value if key is None else key
+
+    return tuple(part(value) for value in args), tuple(sorted((name, part(value)) for name, value in kwargs.items()))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Group of in-flight calls, at most one per key.
+
+    Attributes:
+        executions: The number of calls that ran the function.
+        coalesced: The number of calls that shared another call's result.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, List[Any]] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, function: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """
+        Await a coroutine function once per key among concurrent callers.
+
+        All callers must run on the same event loop. The call runs in its own
+        task, which every caller awaits through ``asyncio.shield``: a caller
+        being cancelled (e.g. on client disconnect) does not affect the
+        others, and the task is only cancelled once no caller is left.
+
+        Args:
+            key: The key identifying identical calls.
+            function: The coroutine function to run.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            The result of the shared call.
+        """
+        entry = self._tasks.get(key)
+        if entry is None:
+            task = asyncio.get_running_loop().create_task(function(*args, **kwargs))
+            entry = self._tasks[key] = [task, 0]
+            self.executions += 1
+            task.add_done_callback(lambda done: self._finish(key, entry))
+        else:
+            task = entry[0]
+            self.coalesced += 1
+
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if not entry[1] and not task.done():
+                # Callers arriving before the task finishes cancelling must start a new call.
+                if self._tasks.get(key) is entry:
+                    del self._tasks[key]
+                task.cancel()
+
+    def _finish(self, key: Hashable, entry: List[Any]) -> None:
+        if self._tasks.get(key) is entry:
+            del self._tasks[key]
+        task = entry[0]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller was cancelled.
+            task.exception()
+
+    def do_sync(self, key: Hashable, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Call a function once per key among concurrent threads.
+
+        Args:
+            key: The key identifying identical calls.
+            function: The function to run.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            The result of the shared call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args, **kwargs)
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the counters of the group.
+
+        Returns:
+            A mapping with the executions, coalesced and in-flight counts.
+        """
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls) + len(self._tasks),
+        }
+
+
+def coalesced(endpoint: Callable[..., Any], policy: CoalescePolicy) -> Callable[..., Any]:
+    """
+    Wrap an endpoint so identical concurrent calls share one execution.
+
+    The wrapper keeps the endpoint's signature (``functools.wraps``) so
+    frameworks resolve parameters as before, and exposes its SingleFlight
+    as ``single_flight``.
+
+    Args:
+        endpoint: The route endpoint, a coroutine function or a regular callable.
+        policy: The CoalescePolicy of the route.
+
+    Returns:
+        The wrapped endpoint.
+    """
+    group = SingleFlight()
+    make_key = policy.key or default_key
+
+    if inspect.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = make_key(*args, **kwargs)
+            try:
+                hash(key)
+            except TypeError:
+                return await endpoint(*args, **kwargs)
+            return await group.do(key, endpoint, *args, **kwargs)
+    else:
+        @wraps(endpoint)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = make_key(*args, **kwargs)
+            try:
+                hash(key)
+            except TypeError:
+                return endpoint(*args, **kwargs)
+            return group.do_sync(key, endpoint, *args, **kwargs)
+
+    wrapper.single_flight = group
+    return wrapper
@@ -5,11 +5,21 @@ This module declares the FrameworkCompProtocol abstract base class which
 specifies the interface for registering routes, websockets, routers and
 global settings on a server adapter. Implementations should apply these
 methods to the underlying web framework.
+
+The route manifest, response cache and coalescing helpers are imported on
+first use, so importing the contract stays cheap.
 """
 
+from __future__ import annotations
+
 from typing import Union
 from abc import ABC, abstractmethod
-from typing import List, Any, Dict, Sequence
+from typing import TYPE_CHECKING, List, Any, Dict, Sequence, Callable, Iterable, Optional
+
+if TYPE_CHECKING:
+    from nestpy_protocols.webprotocols.framework.cache import CachePolicy
+    from nestpy_protocols.webprotocols.framework.coalesce import CoalescePolicy
+    from nestpy_protocols.webprotocols.framework.route import RouteMatch, RouteManifest, CompiledRouteIndex
 
 
 class FrameworkCompProtocol(ABC):
@@ -21,6 +31,21 @@ class FrameworkCompProtocol(ABC):
     websocket routes, registering websocket handlers, including router groups,
     tracing endpoints, and setting a global URL prefix.
 
+    The protocol also owns a framework-agnostic route manifest. Implementations
+    should call ``index_router_group`` and ``index_route`` from their
+    registration methods instead of mutating the live application; the
+    manifest is validated once and applied in bulk when the server starts,
+    and ``match_route`` resolves requests in O(path length) instead of
+    relying on the framework's linear scan. Router groups and routes can
+    carry their own ``middlewares`` so hot routes skip middleware they never
+    need (see ``FrameworkMwProtocol.compile_route_middlewares``).
+
+    ``add_api_route`` and ``add_route_in_router_group`` implementations
+    should forward a ``cache=CachePolicy(...)`` option to ``index_route``:
+    the route is then served from an in-memory response cache whose counters
+    are reported by ``response_cache_stats``. Likewise ``coalesce=CoalescePolicy()``
+    makes identical concurrent requests share one handler execution
+    (``coalescing_stats``).
     """
 
     @abstractmethod
@@ -118,3 +143,158 @@ class FrameworkCompProtocol(ABC):
         Returns:
             None
         """
+
+    def index_router_group(self, name: str, prefix: str, middlewares: Sequence[Any] = (), **options: Any) -> None:
+        """
+        Record a router group in the route manifest.
+
+        Args:
+            name: The name or identifier of the router group.
+            prefix: The URL prefix applied to every route of the group.
+            middlewares: Middleware applied only to the routes of this group.
+            **options: Additional framework-specific options kept with the group.
+
+        Returns:
+            None
+        """
+        from nestpy_protocols.webprotocols.framework.route import RouterGroup
+
+        self.__dict__.setdefault("_router_groups", []).append(
+            RouterGroup(name=name, prefix=prefix, middlewares=tuple(middlewares), options=tuple(options.items()))
+        )
+        self.__dict__.pop("_route_manifest", None)
+
+    def index_route(
+            self,
+            path: str,
+            endpoint: Callable[..., Any],
+            methods: Optional[Iterable[str]] = None,
+            router_group: Optional[str] = None,
+            middlewares: Sequence[Any] = (),
+            cache: Optional[CachePolicy] = None,
+            coalesce: Optional[CoalescePolicy] = None,
+            **options: Any
+    ) -> None:
+        """
+        Record a route registration in the route manifest.
+
+        Registration only appends to a list; validation and indexing happen
+        once, when the manifest is built.
+
+        Args:
+            path: The route path, relative to the router group prefix if any.
+            endpoint: The handler callable bound to the route.
+            methods: The HTTP methods accepted by the route (defaults to GET).
+            router_group: The name of the router group owning the route, if any.
+            middlewares: Middleware applied only to this route.
+            cache: Serve the route from a response cache with this policy; the
+                   cache runs after every other middleware of the route.
+            coalesce: Share one endpoint execution among identical in-flight
+                      calls, keyed by this policy.
+            **options: Additional framework-specific options kept with the route.
+
+        Returns:
+            None
+        """
+        from nestpy_protocols.webprotocols.framework.route import Route
+
+        if cache is not None:
+            from nestpy_protocols.webprotocols.framework.cache import ResponseCacheMiddleware
+
+            middlewares = tuple(middlewares) + (ResponseCacheMiddleware(cache),)
+        if coalesce is not None:
+            from nestpy_protocols.webprotocols.framework.coalesce import coalesced
+
+            endpoint = coalesced(endpoint, coalesce)
+
+        self.__dict__.setdefault("_routes", []).append(
+            Route(
+                path=path,
+                endpoint=endpoint,
+                methods=frozenset(method.upper() for method in (methods or ("GET",))),
+                router_group=router_group,
+                middlewares=tuple(middlewares),
+                options=tuple(options.items())
+            )
+        )
+        self.__dict__.pop("_route_manifest", None)
+
+    def build_route_manifest(self) -> RouteManifest:
+        """
+        Validate the recorded registrations and freeze them into a manifest.
+
+        The manifest is cached until another route or router group is indexed.
+
+        Returns:
+            The validated RouteManifest.
+
+        Raises:
+            ValueError: If duplicate routes or router group prefix conflicts are found.
+        """
+        manifest = self.__dict__.get("_route_manifest")
+
+        if manifest is None:
+            from nestpy_protocols.webprotocols.framework.route import RouteManifest
+
+            manifest = RouteManifest.build(
+                self.__dict__.get("_routes", ()),
+                self.__dict__.get("_router_groups", ())
+            )
+            self.__dict__["_route_manifest"] = manifest
+            self.__dict__["_compiled_route_index"] = manifest.compile()
+
+        return manifest
+
+    def get_route_index(self) -> CompiledRouteIndex:
+        """
+        Return the compiled route index, building the manifest on first use.
+
+        Returns:
+            The CompiledRouteIndex reflecting every indexed route.
+        """
+        self.build_route_manifest()
+        return self.__dict__["_compiled_route_index"]
+
+    def match_route(self, method: str, path: str) -> Optional[RouteMatch]:
+        """
+        Resolve a request method and path against the route index.
+
+        Args:
+            method: The HTTP method of the request.
+            path: The request path, without query string.
+
+        Returns:
+            A RouteMatch with typed path parameters, or None if nothing matches.
+        """
+        return self.get_route_index().match(method, path)
+
+    def response_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the counters of every route declared with a response cache.
+
+        Returns:
+            A mapping of 'METHODS /full/path' labels to ResponseCache.stats().
+        """
+        from nestpy_protocols.webprotocols.framework.cache import ResponseCacheMiddleware
+
+        stats = {}
+
+        for route in self.build_route_manifest().routes:
+            for middleware in route.middlewares:
+                if isinstance(middleware, ResponseCacheMiddleware):
+                    stats[f"{','.join(sorted(route.methods))} {route.full_path}"] = middleware.cache.stats()
+
+        return stats
+
+    def coalescing_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Return the counters of every route declared with request coalescing.
+
+        Returns:
+            A mapping of 'METHODS /full/path' labels to SingleFlight.stats().
+        """
+        return {
+            f"{','.join(sorted(route.methods))} {route.full_path}": route.endpoint.single_flight.stats()
+            for route in self.build_route_manifest().routes
+            if hasattr(route.endpoint, "single_flight")
+        }
@@ -0,0 +1,147 @@
+"""
+Module providing cached exception handler dispatch.
+
+This module declares the ExceptionDispatcher used by FrameworkExcProtocol.
+Handlers are registered for exception classes or HTTP status codes. The
+handler of a concrete exception type is found by walking its MRO once; the
+result (including "no handler") is cached per type, so an error storm of
+the same exception costs one dict lookup per error. Registering or removing
+a handler swaps in a fresh cache.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional, Type, Union
+
+
+Handler = Callable[..., Any]
+
+ExceptionKey = Union[Type[BaseException], int]
+
+_MISSING = object()
+
+
+class ExceptionDispatcher:
+    """
+    Registry of exception handlers with a per-type resolution cache.
+
+    Args:
+        handlers: Initial mapping of exception classes or status codes to handlers.
+    """
+
+    def __init__(self, handlers: Optional[Dict[ExceptionKey, Handler]] = None) -> None:
+        self._lock = threading.Lock()
+        self._by_class: Dict[Type[BaseException], Handler] = {}
+        self._by_status: Dict[int, Handler] = {}
+        self._cache: Dict[type, Optional[Handler]] = {}
+        for key, handler in (handlers or {}).items():
+            self.register(key, handler)
+
+    def register(self, key: ExceptionKey, handler: Handler) -> None:
+        """
+        Register or replace the handler of an exception class or status code.
+
+        Args:
+            key: An exception class or an HTTP status code.
+            handler: The callable handling matching errors.
+
+        Returns:
+            None
+
+        Raises:
+            TypeError: If key is neither an exception class nor an int.
+        """
+        with self._lock:
+            if isinstance(key, int):
+                self._by_status[key] = handler
+            elif isinstance(key, type) and issubclass(key, BaseException):
+                self._by_class[key] = handler
+                self._cache = {}
+            else:
+                raise TypeError(f"Expected an exception class or a status code, got {key!r}")
+
+    def unregister(self, key: ExceptionKey) -> None:
+        """
+        Remove the handler of an exception class or status code, if any.
+
+        Args:
+            key: An exception class or an HTTP status code.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if isinstance(key, int):
+                self._by_status.pop(key, None)
+            elif self._by_class.pop(key, None) is not None:
+                self._cache = {}
+
+    def handler_for_type(self, exc_type: type) -> Optional[Handler]:
+        """
+        Return the handler of the closest registered class in an exception type's MRO.
+
+        Args:
+            exc_type: The concrete exception type.
+
+        Returns:
+            The handler, or None if no class in the MRO is registered.
+        """
+        cache = self._cache
+        try:
+            return cache[exc_type]
+        except KeyError:
+            pass
+
+        by_class = self._by_class
+        handler = next((by_class[base] for base in exc_type.__mro__ if base in by_class), None)
+        # Written to the cache that was read: a concurrent register() has
+        # already replaced it, so a stale result is never served.
+        cache[exc_type] = handler
+        return handler
+
+    def handler_for_status(self, status_code: int) -> Optional[Handler]:
+        """
+        Return the handler registered for a status code.
+
+        Args:
+            status_code: The HTTP status code.
+
+        Returns:
+            The handler, or None.
+        """
+        return self._by_status.get(status_code)
+
+    def resolve(self, exc: BaseException) -> Optional[Handler]:
+        """
+        Return the handler of a raised exception.
+
+        An exception carrying an int ``status_code`` attribute (HTTP
+        exceptions of most frameworks) is matched on its status code first,
+        then on its class hierarchy.
+
+        Args:
+            exc: The raised exception.
+
+        Returns:
+            The handler, or None if the error is unhandled.
+        """
+        if self._by_status:
+            status_code = getattr(exc, "status_code", None)
+            if status_code is not None:
+                handler = self._by_status.get(status_code)
+                if handler is not None:
+                    return handler
+
+        exc_type = type(exc)
+        handler = self._cache.get(exc_type, _MISSING)
+        if handler is _MISSING:
+            return self.handler_for_type(exc_type)
+        return handler
+
+    def cache_size(self) -> int:
+        """
+        Return the number of exception types resolved since the last change.
+
+        Returns:
+            The number of cached entries.
+        """
+        return len(self._cache)
@@ -6,15 +6,25 @@ specifies the interface for configuring server documentation endpoints
 and options (OpenAPI, Swagger UI, Redoc) for web adapters.
 """
 
-from typing import Any
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Optional
 from abc import ABC, abstractmethod
 
+if TYPE_CHECKING:
+    from nestpy_protocols.webprotocols.framework.openapi import OpenAPISpecCache, SpecResponse
+
 
 class FrameworkDocProtocol(ABC):
     """
     Abstract base class that defines the interface for server documentation
     configuration. Implementations should apply these settings to the web
     framework's documentation tooling (OpenAPI, Swagger UI, Redoc, etc.).
+
+    The protocol keeps a precomputed OpenAPI document in ``get_openapi_cache``.
+    Implementations should forward spec-affecting settings (tags, version,
+    external docs, ...) and route changes to the cache and serve the document
+    through ``serve_openapi`` instead of regenerating it per request.
     """
 
     @abstractmethod
@@ -176,3 +186,32 @@ class FrameworkDocProtocol(ABC):
         Returns:
             None
         """
+
+    def get_openapi_cache(self) -> OpenAPISpecCache:
+        """
+        Return the OpenAPI document cache, creating it on first use.
+
+        Returns:
+            The OpenAPISpecCache owned by this protocol instance.
+        """
+        cache = self.__dict__.get("_openapi_cache")
+
+        if cache is None:
+            from nestpy_protocols.webprotocols.framework.openapi import OpenAPISpecCache
+
+            cache = self.__dict__.setdefault("_openapi_cache", OpenAPISpecCache())
+
+        return cache
+
+    def serve_openapi(self, if_none_match: Optional[str] = None, accept_encoding: Optional[str] = None) -> SpecResponse:
+        """
+        Answer a request for the OpenAPI document from the cache.
+
+        Args:
+            if_none_match: The request's If-None-Match header, if any.
+            accept_encoding: The request's Accept-Encoding header, if any.
+
+        Returns:
+            A SpecResponse (304 if the client's ETag is current, 200 otherwise).
+        """
+        return self.get_openapi_cache().respond(if_none_match, accept_encoding)
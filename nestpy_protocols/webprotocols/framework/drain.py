@@ -0,0 +1,249 @@
+"""
+Module providing graceful drain support for server shutdown.
+
+This module declares the DrainController used by FrameworkLifProtocol.
+Adapters wrap every request and websocket session in ``track_request`` /
+``track_session``; on shutdown ``drain`` stops admitting new work, waits
+for in-flight work up to a deadline, cancels what is still running and
+then runs the shutdown handlers concurrently within the remaining budget.
+"""
+
+import time
+import asyncio
+import inspect
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+class ServerDrainingError(RuntimeError):
+    """
+    Raised when new work is submitted while the server is draining.
+
+    Adapters should translate it into a 503 response (or a websocket close)
+    so load balancers retry the request on another instance.
+    """
+
+
+@dataclass(frozen=True)
+class DrainStats:
+    """
+    Outcome of a drain.
+
+    Attributes:
+        requests_in_flight: Requests running when the drain started.
+        sessions_in_flight: Websocket sessions open when the drain started.
+        completed: Requests and sessions that finished before the deadline.
+        cancelled: Asyncio tasks cancelled once the deadline was reached.
+        abandoned: Work still running in threads that could not be cancelled.
+        handlers_completed: Shutdown handlers that returned normally.
+        handlers_failed: Shutdown handlers that raised an exception.
+        handlers_timed_out: Shutdown handlers still running when the budget ran out.
+        duration: Seconds spent draining.
+    """
+
+    requests_in_flight: int
+    sessions_in_flight: int
+    completed: int
+    cancelled: int
+    abandoned: int
+    handlers_completed: int
+    handlers_failed: int
+    handlers_timed_out: int
+    duration: float
+
+
+class _Tracked:
+    __slots__ = ("controller", "kind", "task")
+
+    def __init__(self, controller: "DrainController", kind: str) -> None:
+        self.controller = controller
+        self.kind = kind
+        self.task: Optional[asyncio.Task] = None
+
+    def __enter__(self) -> "_Tracked":
+        self.controller._enter(self)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.controller._exit(self)
+
+    async def __aenter__(self) -> "_Tracked":
+        self.task = asyncio.current_task()
+        self.controller._enter(self)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.controller._exit(self)
+
+
+class DrainController:
+    """
+    Tracks in-flight requests and websocket sessions for a graceful drain.
+
+    ``track_request()`` and ``track_session()`` return context managers that
+    can be used with both ``with`` (thread-pool handlers) and ``async with``
+    (asyncio handlers); only the latter can be cancelled at the deadline.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._active: Dict[int, _Tracked] = {}
+        self._accepting = True
+
+    @property
+    def accepting(self) -> bool:
+        """
+        Return whether new requests and sessions are admitted.
+
+        Returns:
+            False once a drain has started.
+        """
+        return self._accepting
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Return the number of tracked requests and sessions still running.
+
+        Returns:
+            The in-flight count.
+        """
+        return len(self._active)
+
+    def track_request(self) -> _Tracked:
+        """
+        Track one HTTP request for the duration of a ``with`` block.
+
+        Returns:
+            A context manager usable with ``with`` or ``async with``.
+
+        Raises:
+            ServerDrainingError: On entry, if the server is draining.
+        """
+        return _Tracked(self, "request")
+
+    def track_session(self) -> _Tracked:
+        """
+        Track one websocket session for the duration of a ``with`` block.
+
+        Returns:
+            A context manager usable with ``with`` or ``async with``.
+
+        Raises:
+            ServerDrainingError: On entry, if the server is draining.
+        """
+        return _Tracked(self, "session")
+
+    def _enter(self, tracked: _Tracked) -> None:
+        with self._lock:
+            if not self._accepting:
+                raise ServerDrainingError("The server is draining and no longer accepts new work")
+            self._active[id(tracked)] = tracked
+
+    def _exit(self, tracked: _Tracked) -> None:
+        with self._lock:
+            self._active.pop(id(tracked), None)
+
+    def stop_accepting(self) -> None:
+        """
+        Stop admitting new requests and sessions.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._accepting = False
+
+    async def drain(
+            self,
+            deadline: float,
+            shutdown_handlers: Iterable[Callable[..., Any]] = (),
+            handlers_reserve: Optional[float] = None
+    ) -> DrainStats:
+        """
+        Stop accepting, wait for in-flight work and run the shutdown handlers.
+
+        In-flight work gets ``deadline - handlers_reserve`` seconds to finish;
+        asyncio tasks still running then are cancelled. The shutdown handlers
+        (sync or async) then run concurrently within whatever is left of the
+        same budget, which is at least ``handlers_reserve``.
+
+        Args:
+            deadline: Total seconds allowed for the whole drain.
+            shutdown_handlers: Callables to run once in-flight work is done.
+            handlers_reserve: Seconds of the deadline kept for the shutdown
+                              handlers (defaults to a quarter of the deadline).
+
+        Returns:
+            The DrainStats of this drain.
+        """
+        started = time.monotonic()
+        expires = started + deadline
+        if handlers_reserve is None:
+            handlers_reserve = deadline / 4
+        drain_expires = expires - min(handlers_reserve, deadline)
+        self.stop_accepting()
+
+        with self._lock:
+            requests = sum(1 for tracked in self._active.values() if tracked.kind == "request")
+            sessions = len(self._active) - requests
+
+        while self._active and time.monotonic() < drain_expires:
+            await asyncio.sleep(min(0.01, max(0.0, drain_expires - time.monotonic())))
+
+        cancelled = 0
+        with self._lock:
+            leftovers = list(self._active.values())
+        for tracked in leftovers:
+            if tracked.task is not None and not tracked.task.done():
+                tracked.task.cancel()
+                cancelled += 1
+
+        if cancelled:
+            # Give cancelled tasks one loop iteration to unwind their finally blocks.
+            await asyncio.sleep(0)
+
+        completed, failed, timed_out = await _run_handlers(shutdown_handlers, max(0.0, expires - time.monotonic()))
+
+        return DrainStats(
+            requests_in_flight=requests,
+            sessions_in_flight=sessions,
+            completed=requests + sessions - len(leftovers),
+            cancelled=cancelled,
+            abandoned=len(leftovers) - cancelled,
+            handlers_completed=completed,
+            handlers_failed=failed,
+            handlers_timed_out=timed_out,
+            duration=time.monotonic() - started,
+        )
+
+
+async def _run_handlers(handlers: Iterable[Callable[..., Any]], budget: float) -> Tuple[int, int, int]:
+    loop = asyncio.get_running_loop()
+    tasks = []
+
+    async def call(handler: Callable[..., Any]) -> None:
+        # Sync handlers run in the executor so they do not block the loop or
+        # each other; whatever they return that is awaitable (a coroutine from
+        # a partial or a callable object, a future...) is awaited here.
+        if inspect.iscoroutinefunction(handler):
+            result = handler()
+        else:
+            result = await loop.run_in_executor(None, handler)
+        if inspect.isawaitable(result):
+            await result
+
+    for handler in handlers:
+        tasks.append(asyncio.ensure_future(call(handler)))
+
+    if not tasks:
+        return 0, 0, 0
+
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+
+    for task in pending:
+        task.cancel()
+
+    failed = sum(1 for task in done if task.exception() is not None)
+    return len(done) - failed, failed, len(pending)
@@ -1,8 +1,17 @@
 from abc import ABC, abstractmethod
-from  typing import Any
+from  typing import Any, Optional
+from nestpy_protocols.webprotocols.framework.dispatch import ExceptionDispatcher, ExceptionKey, Handler
 
 
 class FrameworkExcProtocol(ABC):
+    """
+    Abstract base class defining exception handler registration.
+
+    Implementations should record handlers in ``get_exception_dispatcher``
+    (``register_exception_handler``) and install a single framework-level
+    handler that calls ``resolve_exception_handler``: each exception type is
+    then resolved along its MRO once instead of on every raised error.
+    """
 
     @abstractmethod
 
@@ -30,3 +39,42 @@ class FrameworkExcProtocol(ABC):
         Returns:
             None
         """
+
+    def get_exception_dispatcher(self) -> ExceptionDispatcher:
+        """
+        Return the exception dispatcher, creating it on first use.
+
+        Returns:
+            The ExceptionDispatcher owned by this protocol instance.
+        """
+        dispatcher = self.__dict__.get("_exception_dispatcher")
+
+        if dispatcher is None:
+            dispatcher = self.__dict__.setdefault("_exception_dispatcher", ExceptionDispatcher())
+
+        return dispatcher
+
+    def register_exception_handler(self, exc_class_or_status_code: ExceptionKey, handler: Handler) -> None:
+        """
+        Register a handler in the dispatcher, invalidating its resolution cache.
+
+        Args:
+            exc_class_or_status_code: An exception class or an HTTP status code.
+            handler: The callable handling matching errors.
+
+        Returns:
+            None
+        """
+        self.get_exception_dispatcher().register(exc_class_or_status_code, handler)
+
+    def resolve_exception_handler(self, exc: BaseException) -> Optional[Handler]:
+        """
+        Return the handler of a raised exception.
+
+        Args:
+            exc: The raised exception.
+
+        Returns:
+            The handler, or None if the error is unhandled.
+        """
+        return self.get_exception_dispatcher().resolve(exc)
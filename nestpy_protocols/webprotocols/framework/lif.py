@@ -1,5 +1,13 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from typing import Any, Union
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, Union
+
+if TYPE_CHECKING:
+    import socket
+    from asyncio import AbstractEventLoop
+    from nestpy_protocols.webprotocols.framework.drain import DrainController, DrainStats
+    from nestpy_protocols.webprotocols.framework.route import RouteManifest
 
 
 class FrameworkLifProtocol(ABC):
@@ -8,6 +16,10 @@ class FrameworkLifProtocol(ABC):
 
     Implementations must provide concrete methods to handle startup and shutdown
     events of the application framework.
+
+    ``start_server_workers`` runs the application in N pre-forked worker
+    processes sharing one listening socket; implementations only need to
+    override ``serve_on_socket``.
     """
 
     @abstractmethod
@@ -41,6 +53,9 @@ class FrameworkLifProtocol(ABC):
         """
         Set shutdown event handlers for the documentation routes.
 
+        Implementations should pass these handlers to ``drain_server`` so they
+        run concurrently within the drain budget rather than one after another.
+
         Args:
             handlers: A list of callables to be executed on application shutdown.
 
@@ -53,6 +68,13 @@ class FrameworkLifProtocol(ABC):
         """
         Stop the server
 
+        Implementations should drain the server so in-flight requests and
+        websocket sessions can finish before it exits: this method is
+        synchronous, so it should call ``drain_server_sync`` with the loop the
+        server runs on (code already running on that loop awaits
+        ``drain_server`` instead). Implementations running in supervisor mode
+        should call ``stop_server_workers`` to shut every worker down gracefully.
+
         Returns:
             None
         """
@@ -68,5 +90,179 @@ class FrameworkLifProtocol(ABC):
 
         Returns:
             None. Implementations should start the server event loop or bind sockets
-            so the application begins accepting connections.
+            so the application begins accepting connections. Before binding, they
+            should pass the manifest built by ``FrameworkCompProtocol.build_route_manifest``
+            to ``apply_route_manifest``.
         """
+
+    def apply_route_manifest(self, manifest: RouteManifest) -> None:
+        """
+        Apply every route and router group of a manifest to the application.
+
+        Called once by ``start_server``. Implementations should override it to
+        create the framework routers and register all routes in a single pass
+        instead of mutating the live application on every registration call.
+        The default does nothing, for implementations that still register
+        routes as they are indexed.
+
+        Args:
+            manifest: The validated, immutable RouteManifest to apply.
+
+        Returns:
+            None
+        """
+
+    def serve_on_socket(self, sock: socket.socket) -> None:
+        """
+        Serve the application on an already bound and listening socket.
+
+        Called inside each worker process in supervisor mode. Implementations
+        supporting ``start_server_workers`` should override it and block until
+        the process receives SIGTERM (for example with
+        ``uvicorn.Server(config).run(sockets=[sock])``).
+
+        Args:
+            sock: The listening socket inherited from, or bound by, the supervisor.
+
+        Returns:
+            None
+
+        Raises:
+            NotImplementedError: If the implementation does not support
+                                 pre-forked workers.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support pre-forked workers")
+
+    def start_server_workers(
+            self,
+            host: str,
+            port: Union[str, int],
+            workers: Optional[int] = None,
+            reuse_port: bool = False,
+            **options: Any
+    ) -> None:
+        """
+        Start the server in N pre-forked worker processes and supervise them.
+
+        The route manifest should already be applied, so that every worker
+        inherits the configured application. Crashed workers are restarted
+        until ``stop_server_workers`` is called. Blocks the calling thread.
+
+        Args:
+            host: The hostname or IP address to bind the server to.
+            port: The port number or port string to bind to.
+            workers: Number of worker processes (defaults to the CPU count).
+            reuse_port: Bind one socket per worker with SO_REUSEPORT instead of
+                        sharing the supervisor's socket.
+            **options: Additional PreforkSupervisor options (graceful_timeout, ...).
+
+        Returns:
+            None
+        """
+        from nestpy_protocols.webprotocols.framework.prefork import PreforkSupervisor
+
+        supervisor = PreforkSupervisor(self.serve_on_socket, workers=workers, reuse_port=reuse_port, **options)
+        self.__dict__["_supervisor"] = supervisor
+        supervisor.run(host, port)
+
+    def stop_server_workers(self, wait: bool = True) -> None:
+        """
+        Gracefully stop every worker started by ``start_server_workers``.
+
+        Args:
+            wait: If True, block until every worker has exited.
+
+        Returns:
+            None
+        """
+        supervisor = self.__dict__.get("_supervisor")
+
+        if supervisor is not None:
+            supervisor.stop(wait=wait)
+
+    def get_drain_controller(self) -> DrainController:
+        """
+        Return the drain controller, creating it on first use.
+
+        Adapters should wrap each request in ``track_request()`` and each
+        websocket session in ``track_session()`` of this controller.
+
+        Returns:
+            The DrainController owned by this protocol instance.
+        """
+        controller = self.__dict__.get("_drain_controller")
+
+        if controller is None:
+            from nestpy_protocols.webprotocols.framework.drain import DrainController
+
+            controller = self.__dict__.setdefault("_drain_controller", DrainController())
+
+        return controller
+
+    async def drain_server(
+            self,
+            deadline: float,
+            shutdown_handlers: Iterable[Callable[..., Any]] = (),
+            handlers_reserve: Optional[float] = None
+    ) -> DrainStats:
+        """
+        Gracefully drain the server within a deadline.
+
+        Stops accepting new work, waits for in-flight requests and sessions,
+        cancels what is still running at the deadline and runs the shutdown
+        handlers concurrently within the same budget.
+
+        Args:
+            deadline: Total seconds allowed for the drain.
+            shutdown_handlers: The handlers registered with ``set_on_shutdown``.
+            handlers_reserve: Seconds of the deadline kept for the shutdown handlers.
+
+        Returns:
+            The DrainStats describing the drain.
+        """
+        return await self.get_drain_controller().drain(deadline, shutdown_handlers, handlers_reserve)
+
+    def drain_server_sync(
+            self,
+            loop: Optional[AbstractEventLoop],
+            deadline: float,
+            shutdown_handlers: Iterable[Callable[..., Any]] = (),
+            handlers_reserve: Optional[float] = None
+    ) -> DrainStats:
+        """
+        Run ``drain_server`` from synchronous code and wait for its result.
+
+        Intended for ``stop_server``. The drain is scheduled on the event loop
+        the server runs on, so the tracked asyncio tasks are cancelled from
+        their own loop; without a loop (a server that only uses threads) it
+        runs on a new one.
+
+        Args:
+            loop: The running event loop of the server, or None.
+            deadline: Total seconds allowed for the drain.
+            shutdown_handlers: The handlers registered with ``set_on_shutdown``.
+            handlers_reserve: Seconds of the deadline kept for the shutdown handlers.
+
+        Returns:
+            The DrainStats describing the drain.
+
+        Raises:
+            RuntimeError: If called from the thread running ``loop``, which
+                          would block the loop the drain needs.
+        """
+        import asyncio
+
+        drain = self.drain_server(deadline, shutdown_handlers, handlers_reserve)
+
+        if loop is None:
+            return asyncio.run(drain)
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            drain.close()
+            raise RuntimeError("drain_server_sync cannot run on the server's loop; await drain_server instead")
+
+        return asyncio.run_coroutine_threadsafe(drain, loop).result()
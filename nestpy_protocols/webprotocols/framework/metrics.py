@@ -0,0 +1,269 @@
+"""
+Module providing low-overhead per-route latency metrics.
+
+This module declares the RouteMetrics recorder used by
+FrameworkMwProtocol.trace. Latencies are counted in fixed log-linear
+buckets (HDR-style: every power of two is split into 8 linear sub-buckets,
+so any recorded value is within 12.5% of its bucket's lower bound) kept in
+one preallocated flat list, one row per route and status class. Recording
+a request is three table lookups and three indexed increments;
+request counts and means are derived from the histograms when a snapshot
+is taken, not maintained on the hot path.
+
+Counters are updated without locks. Under the GIL an increment can very
+rarely be lost when two threads record into the same bucket at the same
+instant, which is acceptable for monitoring data.
+"""
+
+from time import perf_counter_ns
+from array import array
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+SUB_BUCKET_BITS = 3
+
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+# Status classes 1xx..5xx, plus one row for anything else.
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx", "other")
+
+# Latencies below this many microseconds are bucketed by table lookup.
+_TABLE_SIZE = 1 << 16
+
+
+def bucket_index(value: int) -> int:
+    """
+    Return the log-linear bucket of a non-negative integer value.
+
+    Args:
+        value: The value to bucket (microseconds for RouteMetrics).
+
+    Returns:
+        The bucket index.
+    """
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    if shift <= 0:
+        return value
+    return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+
+def bucket_lower_bound(index: int) -> int:
+    """
+    Return the smallest value that falls in a bucket.
+
+    Args:
+        index: The bucket index.
+
+    Returns:
+        The lower bound of the bucket.
+    """
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    return (SUB_BUCKETS + (index & (SUB_BUCKETS - 1))) << shift
+
+
+# Built by the first RouteMetrics rather than at import: filling 64K entries
+# costs tens of milliseconds that modules merely importing this one should
+# not pay.
+_BUCKET_TABLE: Optional[array] = None
+
+
+def _bucket_table() -> array:
+    global _BUCKET_TABLE
+    if _BUCKET_TABLE is None:
+        _BUCKET_TABLE = array("B", (bucket_index(value) for value in range(_TABLE_SIZE)))
+    return _BUCKET_TABLE
+
+
+_STATUS_ROWS = tuple(
+    status // 100 - 1 if 100 <= status < 600 else len(STATUS_CLASSES) - 1 for status in range(1000)
+)
+
+
+class RouteMetrics:
+    """
+    Preallocated latency histograms, request counts and in-flight gauges.
+
+    Args:
+        routes: The keys of the instrumented routes (e.g. Route objects or
+                'GET /path' strings); each gets a fixed slot.
+        max_latency_us: The largest latency tracked precisely; slower requests
+                        are counted in the last bucket.
+
+    Attributes:
+        start: ``start(slot)`` records the start of a request and returns the
+               timestamp to pass to ``finish``.
+        finish: ``finish(slot, status, started)`` records the end of a request.
+    """
+
+    def __init__(self, routes: Iterable[Hashable], max_latency_us: int = 60_000_000) -> None:
+        self.labels: List[str] = []
+        self.slots: Dict[Hashable, int] = {}
+        for route in routes:
+            if route not in self.slots:
+                self.slots[route] = len(self.labels)
+                self.labels.append(_label(route))
+
+        self.max_latency_us = max_latency_us
+        self.buckets = bucket_index(max_latency_us) + 1
+        # The lookup table must not index past the last bucket of a short range.
+        last = self.buckets - 1
+        table = _bucket_table()
+        self._bucket_table = table if table[-1] <= last else array("B", (min(index, last) for index in table))
+        rows = len(self.labels) * len(STATUS_CLASSES)
+
+        # A list rather than an array('Q'): incrementing a list item avoids
+        # converting the count to and from a machine integer on every request.
+        self.histograms: List[int] = [0] * (rows * self.buckets)
+        # Offsets precomputed so that recording is a single indexed increment.
+        self._slot_stride = len(STATUS_CLASSES) * self.buckets
+        self._slot_offsets = [slot * self._slot_stride for slot in range(len(self.labels))]
+        self._status_offsets = [row * self.buckets for row in _STATUS_ROWS]
+        # Gauges go up and down on every request: a preallocated list of
+        # ints is faster to update than an array of machine integers.
+        self.in_flight = [0] * len(self.labels)
+        # Recording runs on every request: bind it to closures over the
+        # tables so that it does no attribute or global lookups.
+        self.start, self.finish = self._recorders()
+
+    def slot(self, route: Hashable) -> int:
+        """
+        Return the slot of a route, to be resolved once at startup.
+
+        Args:
+            route: A route key given to the constructor.
+
+        Returns:
+            The slot index.
+
+        Raises:
+            KeyError: If the route was not registered.
+        """
+        return self.slots[route]
+
+    def _recorders(self) -> Tuple[Callable[[int], int], Callable[[int, int, int], None]]:
+        in_flight = self.in_flight
+        histograms = self.histograms
+        bucket_table = self._bucket_table
+        slot_offsets = self._slot_offsets
+        status_offsets = self._status_offsets
+        last = self.buckets - 1
+        table_size = _TABLE_SIZE
+        clock = perf_counter_ns
+
+        def start(slot: int) -> int:
+            """
+            Record the start of a request.
+
+            Args:
+                slot: The route slot.
+
+            Returns:
+                The start timestamp to pass to ``finish``.
+            """
+            in_flight[slot] += 1
+            return clock()
+
+        def finish(slot: int, status: int, started: int) -> None:
+            """
+            Record the end of a request.
+
+            Args:
+                slot: The route slot.
+                status: The HTTP status code of the response.
+                started: The timestamp returned by ``start``.
+
+            Returns:
+                None
+            """
+            elapsed = (clock() - started) // 1000
+            in_flight[slot] -= 1
+            try:
+                histograms[slot_offsets[slot] + status_offsets[status] + bucket_table[elapsed]] += 1
+            except IndexError:
+                # Latencies past the lookup table, or a status code past 999.
+                index = bucket_table[elapsed] if elapsed < table_size else min(bucket_index(elapsed), last)
+                histograms[slot_offsets[slot] + status_offsets[status if status < 1000 else 0] + index] += 1
+
+        return start, finish
+
+    def percentile(self, slot: int, status_class: int, quantile: float) -> Optional[int]:
+        """
+        Estimate a latency percentile of one route and status class.
+
+        Args:
+            slot: The route slot.
+            status_class: The index in STATUS_CLASSES.
+            quantile: The quantile between 0 and 1 (e.g. 0.99).
+
+        Returns:
+            The lower bound (in microseconds) of the bucket holding the
+            quantile, or None if nothing was recorded.
+        """
+        start = (slot * len(STATUS_CLASSES) + status_class) * self.buckets
+        histogram = self.histograms[start:start + self.buckets]
+        total = sum(histogram)
+        if not total:
+            return None
+
+        rank = max(1, int(total * quantile + 0.5))
+        seen = 0
+        for index, count in enumerate(histogram):
+            seen += count
+            if seen >= rank:
+                return bucket_lower_bound(index)
+        return bucket_lower_bound(self.buckets - 1)
+
+    def snapshot(self, quantiles: Tuple[float, ...] = (0.5, 0.9, 0.99)) -> Dict[str, Any]:
+        """
+        Summarize every route that has traffic.
+
+        Args:
+            quantiles: The percentiles to report.
+
+        Returns:
+            A JSON-serializable mapping of route labels to their in-flight
+            gauge and, per status class, count, mean and percentiles (us).
+        """
+        routes: Dict[str, Any] = {}
+
+        for slot, label in enumerate(self.labels):
+            statuses: Dict[str, Any] = {}
+            for status_class, name in enumerate(STATUS_CLASSES):
+                start = (slot * len(STATUS_CLASSES) + status_class) * self.buckets
+                histogram = self.histograms[start:start + self.buckets]
+                count = sum(histogram)
+                if not count:
+                    continue
+                # Means are estimated from bucket midpoints (within the bucket precision).
+                total = sum(
+                    amount * (bucket_lower_bound(index) + bucket_lower_bound(index + 1)) / 2
+                    for index, amount in enumerate(histogram) if amount
+                )
+                statuses[name] = {
+                    "count": count,
+                    "mean_us": total / count,
+                    **{f"p{quantile * 100:g}_us": self.percentile(slot, status_class, quantile) for quantile in quantiles},
+                }
+            if statuses or self.in_flight[slot]:
+                routes[label] = {"in_flight": self.in_flight[slot], "statuses": statuses}
+
+        return {"bucket_precision": 1 / SUB_BUCKETS, "routes": routes}
+
+    def reset(self) -> None:
+        """
+        Zero every histogram (in-flight gauges are kept).
+
+        Returns:
+            None
+        """
+        self.histograms[:] = [0] * len(self.histograms)
+
+
+def _label(route: Hashable) -> str:
+    path = getattr(route, "full_path", None)
+    if path is None:
+        return str(route)
+    methods = ",".join(sorted(getattr(route, "methods", ())))
+    return f"{methods} {path}".strip()
@@ -5,10 +5,24 @@ This module defines the FrameworkMwProtocol abstract base class which
 specifies the interface for registering middleware and exception handlers
 on a server adapter. Implementations should apply these settings to the
 underlying web framework.
+
+The helpers behind the concrete methods (pipeline, metrics, profiler,
+admission control) are imported on first use, so importing the contract
+stays cheap.
 """
 
+from __future__ import annotations
+
+from functools import partial
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Optional
+
+if TYPE_CHECKING:
+    from nestpy_protocols.webprotocols.framework.metrics import RouteMetrics
+    from nestpy_protocols.webprotocols.framework.admission import AdmissionController
+    from nestpy_protocols.webprotocols.framework.profiling import RouteProfiler
+    from nestpy_protocols.webprotocols.framework.route import Route, RouteManifest
+    from nestpy_protocols.webprotocols.framework.pipeline import MiddlewarePipeline, CompiledPipeline
 
 
 class FrameworkMwProtocol(ABC):
@@ -17,6 +31,21 @@ class FrameworkMwProtocol(ABC):
 
     Implementations should register middleware callables and exception handlers
     with the web framework so that requests and errors can be processed centrally.
+
+    Hook-style middleware (see ``pipeline.Middleware``) should be added to
+    ``get_middleware_pipeline`` and compiled once at startup with
+    ``compile_middlewares``; the adapter then installs the single flattened
+    pipeline instead of one framework layer per middleware.
+
+    Middleware can be scoped with ``get_middleware_pipeline().add(mw, prefix=...)``
+    or attached to a router group or a single route when they are registered
+    (``middlewares=`` of ``FrameworkCompProtocol.index_router_group`` /
+    ``index_route``); ``compile_route_middlewares`` then precomputes each
+    route's effective chain.
+
+    Adapters should run each endpoint inside
+    ``get_route_profiler().profile(route)``; it is a single attribute check
+    until a window is opened with ``profile_route``.
     """
 
     @abstractmethod
@@ -51,10 +80,172 @@ class FrameworkMwProtocol(ABC):
         """
         Register a tracing or instrumentation endpoint.
 
+        Implementations should wrap every request with ``RouteMetrics.start`` /
+        ``finish`` of ``get_route_metrics`` (resolving each route's slot once at
+        startup) and serve ``metrics_snapshot()`` at the configured path.
+
         Args:
-            **kwargs: Additional options for the trace endpoint (middleware, handlers, etc.).
+            **kwargs: Additional options for the trace endpoint (path, middleware, handlers, etc.).
 
         Returns:
             None
         """
 
+    def get_middleware_pipeline(self) -> MiddlewarePipeline:
+        """
+        Return the middleware pipeline builder, creating it on first use.
+
+        Returns:
+            The MiddlewarePipeline owned by this protocol instance.
+        """
+        pipeline = self.__dict__.get("_middleware_pipeline")
+
+        if pipeline is None:
+            from nestpy_protocols.webprotocols.framework.pipeline import MiddlewarePipeline
+
+            pipeline = self.__dict__.setdefault("_middleware_pipeline", MiddlewarePipeline())
+
+        return pipeline
+
+    def compile_middlewares(self) -> CompiledPipeline:
+        """
+        Compile the registered middleware into one frozen, flattened pipeline.
+
+        Should be called once at startup; later calls return the same pipeline.
+
+        Returns:
+            The CompiledPipeline.
+        """
+        return self.get_middleware_pipeline().compile()
+
+    def compile_route_middlewares(self, manifest: RouteManifest) -> Dict[Route, CompiledPipeline]:
+        """
+        Precompute the effective middleware pipeline of every route.
+
+        Should be called once at startup, after the route manifest is built,
+        so each request only runs the middleware that applies to its route.
+
+        Args:
+            manifest: The RouteManifest built by FrameworkCompProtocol.
+
+        Returns:
+            A mapping of each Route to its CompiledPipeline.
+        """
+        pipelines = self.__dict__.get("_route_pipelines")
+
+        if pipelines is None or self.__dict__.get("_route_pipelines_manifest") is not manifest:
+            pipelines = self.get_middleware_pipeline().compile_routes(manifest)
+            self.__dict__["_route_pipelines"] = pipelines
+            self.__dict__["_route_pipelines_manifest"] = manifest
+
+        return pipelines
+
+    def get_route_metrics(self, manifest: Optional[RouteManifest] = None) -> RouteMetrics:
+        """
+        Return the per-route latency metrics, creating them on first use.
+
+        Args:
+            manifest: The RouteManifest whose routes get preallocated slots;
+                      required on the first call.
+
+        Returns:
+            The RouteMetrics owned by this protocol instance.
+
+        Raises:
+            RuntimeError: If the metrics do not exist yet and no manifest is given.
+        """
+        metrics = self.__dict__.get("_route_metrics")
+
+        if metrics is None:
+            if manifest is None:
+                raise RuntimeError("A RouteManifest is required to allocate the route metrics")
+            from nestpy_protocols.webprotocols.framework.metrics import RouteMetrics
+
+            metrics = self.__dict__.setdefault("_route_metrics", RouteMetrics(manifest.routes))
+
+        return metrics
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """
+        Return a JSON-serializable snapshot of the route metrics.
+
+        Intended as the body of the endpoint registered by ``trace``.
+
+        Returns:
+            The snapshot, or an empty mapping if no metrics were allocated.
+        """
+        metrics = self.__dict__.get("_route_metrics")
+        return metrics.snapshot() if metrics is not None else {}
+
+    def get_route_profiler(self) -> RouteProfiler:
+        """
+        Return the on-demand route profiler, creating it on first use.
+
+        Returns:
+            The RouteProfiler owned by this protocol instance.
+        """
+        profiler = self.__dict__.get("_route_profiler")
+
+        if profiler is None:
+            from nestpy_protocols.webprotocols.framework.profiling import RouteProfiler
+
+            profiler = self.__dict__.setdefault("_route_profiler", RouteProfiler())
+
+        return profiler
+
+    def profile_route(
+            self,
+            route: Optional[Hashable] = None,
+            fraction: float = 1.0,
+            duration: float = 60.0,
+            max_samples: int = 1000,
+            output_dir: str = ".",
+            mode: str = "cprofile"
+    ) -> None:
+        """
+        Open a bounded profiling window on one route or on every route.
+
+        The profile is written to ``output_dir`` when the window closes (after
+        ``duration`` seconds, ``max_samples`` sampled requests, or an explicit
+        ``get_route_profiler().stop()``).
+
+        Args:
+            route: The Route to profile, or None for every route.
+            fraction: The fraction of matching requests to sample.
+            duration: Seconds after which the window closes.
+            max_samples: Sampled requests after which the window closes.
+            output_dir: Directory of the profile file.
+            mode: 'cprofile' for a pstats file, 'stack' for collapsed stacks.
+
+        Returns:
+            None
+
+        Raises:
+            RuntimeError: If a profiling window is already open.
+        """
+        self.get_route_profiler().start(route, fraction, duration, max_samples, output_dir, mode)
+
+    def add_admission_control(self, **options: Any) -> AdmissionController:
+        """
+        Install admission control and load shedding in front of every request.
+
+        The controller is registered through ``global_middleware`` as an ASGI
+        middleware factory (``functools.partial(AdmissionMiddleware, ...)``).
+
+        Args:
+            **options: Keyword arguments of AdmissionController (max_concurrency,
+                       max_queue, target_delay, interval, rate, burst, ...).
+
+        Returns:
+            The AdmissionController, whose ``stats()`` can be exported.
+
+        Raises:
+            RuntimeError: If admission control is already installed.
+        """
+        if "_admission_controller" in self.__dict__:
+            raise RuntimeError("Admission control is already installed")
+        from nestpy_protocols.webprotocols.framework.admission import AdmissionController, AdmissionMiddleware
+
+        controller = self.__dict__.setdefault("_admission_controller", AdmissionController(**options))
+        self.global_middleware(partial(AdmissionMiddleware, controller=controller))
+        return controller
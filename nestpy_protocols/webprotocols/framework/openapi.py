@@ -0,0 +1,246 @@
+"""
+Module providing the precomputed OpenAPI document cache.
+
+This module declares the OpenAPISpecCache used by FrameworkDocProtocol.
+The specification is serialized once and kept as identity, gzip and
+brotli (or deflate when brotli is not installed) byte variants with strong
+ETags, so polling load balancers and developer portals are answered from
+memory, or with a 304 when their copy is still current.
+
+The document is cached in fragments: document-level settings and each
+path item are serialized separately, so changing one route or one doc
+setting only re-serializes that fragment before the bytes are reassembled.
+"""
+
+import gzip
+import json
+import zlib
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+# Encodings in server preference order when the client accepts several.
+_PREFERENCE = ("br", "gzip", "deflate", "identity")
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class SpecResponse:
+    """
+    A ready-to-send OpenAPI document response.
+
+    Attributes:
+        status: The HTTP status code (200 or 304).
+        headers: The response headers as (name, value) pairs.
+        body: The encoded document, or b'' for a 304.
+    """
+
+    status: int
+    headers: Tuple[Tuple[str, str], ...]
+    body: bytes
+
+
+class OpenAPISpecCache:
+    """
+    In-memory cache of the rendered OpenAPI document and its encoded variants.
+
+    Settings are document-level keys (``openapi``, ``info``, ``tags``,
+    ``externalDocs``, ``servers``...) and paths are OpenAPI path items keyed
+    by their URL template. Setting a value that serializes to the cached
+    fragment does not invalidate anything.
+    """
+
+    def __init__(self, compress_level: int = 9) -> None:
+        self._compress_level = compress_level
+        self._lock = threading.Lock()
+        self._settings: Dict[str, Tuple[Any, bytes]] = {}
+        self._paths: Dict[str, Tuple[Any, bytes]] = {}
+        self._variants: Optional[Dict[str, Tuple[bytes, str]]] = None
+        self.renders = 0
+
+    def set_setting(self, key: str, value: Any) -> None:
+        """
+        Set a document-level key of the specification.
+
+        Args:
+            key: The top-level OpenAPI key (e.g. 'info', 'tags').
+            value: A JSON-serializable value, or None to remove the key.
+
+        Returns:
+            None
+        """
+        self._update(self._settings, key, value)
+
+    def set_path(self, path: str, item: Optional[Mapping[str, Any]]) -> None:
+        """
+        Set the OpenAPI path item of a single route path.
+
+        Args:
+            path: The URL template of the path (e.g. '/users/{user_id}').
+            item: The path item object, or None to remove the path.
+
+        Returns:
+            None
+        """
+        self._update(self._paths, path, item)
+
+    def sync_paths(self, items: Mapping[str, Mapping[str, Any]]) -> None:
+        """
+        Replace all path items, re-serializing only those that changed.
+
+        Args:
+            items: The complete mapping of URL templates to path items.
+
+        Returns:
+            None
+        """
+        for path in [path for path in self._paths if path not in items]:
+            self.set_path(path, None)
+
+        for path, item in items.items():
+            self.set_path(path, item)
+
+    def invalidate(self) -> None:
+        """
+        Drop the rendered variants so the next request reassembles them.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._variants = None
+
+    def _update(self, fragments: Dict[str, Tuple[Any, bytes]], key: str, value: Any) -> None:
+        with self._lock:
+            current = fragments.get(key)
+
+            if value is None:
+                if current is not None:
+                    del fragments[key]
+                    self._variants = None
+                return
+
+            # Comparing serialized fragments (rather than the values) also
+            # catches callers that mutate and re-submit the same object.
+            fragment = _dumps(value)
+            if current is not None and current[1] == fragment:
+                return
+
+            fragments[key] = (value, fragment)
+            self._variants = None
+
+    def _render(self) -> Dict[str, Tuple[bytes, str]]:
+        parts = [_dumps(key) + b":" + fragment for key, (_, fragment) in self._settings.items() if key != "paths"]
+        paths = b",".join(_dumps(path) + b":" + fragment for path, (_, fragment) in self._paths.items())
+        parts.append(b'"paths":{' + paths + b"}")
+        identity = b"{" + b",".join(parts) + b"}"
+
+        tag = hashlib.sha256(identity).hexdigest()[:32]
+        variants = {
+            "identity": (identity, f'"{tag}"'),
+            "gzip": (gzip.compress(identity, self._compress_level, mtime=0), f'"{tag}-gzip"'),
+        }
+
+        if brotli is not None:
+            variants["br"] = (brotli.compress(identity), f'"{tag}-br"')
+        else:
+            variants["deflate"] = (zlib.compress(identity, self._compress_level), f'"{tag}-deflate"')
+
+        self.renders += 1
+        return variants
+
+    def variants(self) -> Dict[str, Tuple[bytes, str]]:
+        """
+        Return the encoded variants, rendering them if the cache is stale.
+
+        Returns:
+            A mapping of content-coding to (body, etag).
+        """
+        variants = self._variants
+
+        if variants is None:
+            with self._lock:
+                if self._variants is None:
+                    self._variants = self._render()
+                variants = self._variants
+
+        return variants
+
+    def respond(self, if_none_match: Optional[str] = None, accept_encoding: Optional[str] = None) -> SpecResponse:
+        """
+        Build the response for a request of the OpenAPI document.
+
+        Args:
+            if_none_match: The request's If-None-Match header, if any.
+            accept_encoding: The request's Accept-Encoding header, if any.
+
+        Returns:
+            A SpecResponse with status 304 when the client's copy is current,
+            or 200 with the best encoding the client accepts.
+        """
+        variants = self.variants()
+        coding = _negotiate(accept_encoding, variants)
+        body, etag = variants[coding]
+
+        headers = [("ETag", etag), ("Vary", "Accept-Encoding"), ("Cache-Control", "no-cache")]
+
+        if if_none_match is not None and _etag_matches(if_none_match, variants):
+            return SpecResponse(304, tuple(headers), b"")
+
+        headers.append(("Content-Type", "application/json"))
+        headers.append(("Content-Length", str(len(body))))
+        if coding != "identity":
+            headers.append(("Content-Encoding", coding))
+
+        return SpecResponse(200, tuple(headers), body)
+
+
+def _negotiate(accept_encoding: Optional[str], variants: Mapping[str, Any]) -> str:
+    if not accept_encoding:
+        return "identity"
+
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    default = weights.get("*", 0.0)
+
+    for coding in _PREFERENCE:
+        if coding in variants and weights.get(coding, default) > 0:
+            return coding
+
+    return "identity"
+
+
+def _etag_matches(if_none_match: str, variants: Mapping[str, Tuple[bytes, str]]) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+
+    # If-None-Match uses the weak comparison function (RFC 9110, 13.1.2).
+    tags = {etag for _, etag in variants.values()}
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in tags:
+            return True
+
+    return False
@@ -0,0 +1,314 @@
+"""
+Module providing the compiled middleware pipeline.
+
+This module declares the Middleware base class, the MiddlewarePipeline
+builder and the CompiledPipeline used by FrameworkMwProtocol. Instead of
+wrapping every middleware in its own layer (one extra call frame and one
+await per middleware on every request), hook-style middleware is compiled
+once at startup into two flat tuples: the ``before`` hooks in registration
+order and the ``after`` hooks in reverse order. Hooks a middleware does not
+override are dropped, and the pipeline is frozen once compiled.
+
+Middleware can also be scoped to a path prefix, a router group or a single
+route. ``compile_routes`` precomputes the effective chain of every route of
+a RouteManifest, so a request only pays for the middleware that applies to
+its route.
+"""
+
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from nestpy_protocols.webprotocols.framework.route import Route, RouteManifest, split_path
+
+
+class Middleware:
+    """
+    Base class for hook-style middleware.
+
+    Subclasses override ``before`` and/or ``after``; either may be a regular
+    or an ``async`` method. A hook that is not overridden costs nothing at
+    request time because it is removed when the pipeline is compiled.
+    """
+
+    def before(self, request: Any) -> Any:
+        """
+        Run before the endpoint.
+
+        Args:
+            request: The incoming request.
+
+        Returns:
+            None to continue, or a response to short-circuit the request (the
+            endpoint is skipped and only the ``after`` hooks of the middleware
+            registered before this one are applied).
+        """
+        return None
+
+    def after(self, request: Any, response: Any) -> Any:
+        """
+        Run after the endpoint.
+
+        Args:
+            request: The incoming request.
+            response: The response produced so far.
+
+        Returns:
+            The response to pass on (the same object or a replacement).
+        """
+        return response
+
+
+def _hook(middleware: Any, name: str) -> Optional[Callable[..., Any]]:
+    method = getattr(middleware, name, None)
+    if method is None:
+        return None
+
+    base = getattr(Middleware, name)
+    if getattr(method, "__func__", None) is base:
+        return None
+
+    return method
+
+
+class CompiledPipeline:
+    """
+    Immutable, flattened middleware pipeline.
+
+    Attributes:
+        before: The ``(hook, is_async, position)`` entries run before the endpoint.
+        after: The ``(hook, is_async, position)`` entries run after the endpoint,
+               in reverse registration order.
+        is_async: Whether at least one hook is a coroutine function.
+    """
+
+    __slots__ = ("before", "after", "is_async", "_before_hooks", "_after_hooks", "_single")
+
+    def __init__(self, middlewares: Tuple[Any, ...]) -> None:
+        before: List[Tuple[Callable[..., Any], bool, int]] = []
+        after: List[Tuple[Callable[..., Any], bool, int]] = []
+
+        for position, middleware in enumerate(middlewares):
+            hook = _hook(middleware, "before")
+            if hook is not None:
+                before.append((hook, inspect.iscoroutinefunction(hook), position))
+            hook = _hook(middleware, "after")
+            if hook is not None:
+                after.append((hook, inspect.iscoroutinefunction(hook), position))
+
+        after.reverse()
+        self.before = tuple(before)
+        self.after = tuple(after)
+        self.is_async = any(entry[1] for entry in before + after)
+        # (hook, position) pairs and bare hooks for the all-sync path.
+        self._before_hooks = tuple((hook, position) for hook, _, position in before)
+        self._after_hooks = tuple(entry[0] for entry in after)
+        # With at most one sync hook on each side, looping costs more than
+        # the hooks themselves: they are called directly.
+        self._single: Optional[Tuple[Any, int, Any]] = None
+        if not self.is_async and len(before) <= 1 and len(after) <= 1:
+            self._single = (
+                before[0][0] if before else None,
+                before[0][2] if before else 0,
+                after[0][0] if after else None,
+            )
+
+    def __len__(self) -> int:
+        return len(self.before) + len(self.after)
+
+    async def run(self, request: Any, endpoint: Callable[[Any], Awaitable[Any]]) -> Any:
+        """
+        Run the pipeline around an async endpoint.
+
+        Args:
+            request: The incoming request.
+            endpoint: The coroutine function producing the response.
+
+        Returns:
+            The final response.
+        """
+        single = self._single
+        if single is not None:
+            before, position, after = single
+            if before is not None:
+                response = before(request)
+                if response is not None:
+                    return self._unwind(request, response, position)
+            response = await endpoint(request)
+            return after(request, response) if after is not None else response
+
+        if self.is_async:
+            return await self._run_mixed(request, endpoint)
+
+        for hook, position in self._before_hooks:
+            response = hook(request)
+            if response is not None:
+                return self._unwind(request, response, position)
+
+        response = await endpoint(request)
+        for hook in self._after_hooks:
+            response = hook(request, response)
+        return response
+
+    def run_sync(self, request: Any, endpoint: Callable[[Any], Any]) -> Any:
+        """
+        Run the pipeline around a sync endpoint (all hooks must be sync).
+
+        Args:
+            request: The incoming request.
+            endpoint: The callable producing the response.
+
+        Returns:
+            The final response.
+
+        Raises:
+            RuntimeError: If the pipeline contains async hooks.
+        """
+        single = self._single
+        if single is not None:
+            before, position, after = single
+            if before is not None:
+                response = before(request)
+                if response is not None:
+                    return self._unwind(request, response, position)
+            response = endpoint(request)
+            return after(request, response) if after is not None else response
+
+        if self.is_async:
+            raise RuntimeError("The pipeline contains async hooks; use run() instead")
+
+        for hook, position in self._before_hooks:
+            response = hook(request)
+            if response is not None:
+                return self._unwind(request, response, position)
+
+        response = endpoint(request)
+        for hook in self._after_hooks:
+            response = hook(request, response)
+        return response
+
+    def _unwind(self, request: Any, response: Any, reached: int) -> Any:
+        # A short-circuit only runs the after hooks of middleware registered
+        # before the one that stopped (at position ``reached``).
+        for hook, _, position in self.after:
+            if position < reached:
+                response = hook(request, response)
+        return response
+
+    async def _run_mixed(self, request: Any, endpoint: Callable[[Any], Awaitable[Any]]) -> Any:
+        reached = None
+
+        for hook, is_async, position in self.before:
+            response = await hook(request) if is_async else hook(request)
+            if response is not None:
+                reached = position
+                break
+        else:
+            response = await endpoint(request)
+
+        for hook, is_async, position in self.after:
+            if reached is None or position < reached:
+                response = await hook(request, response) if is_async else hook(request, response)
+
+        return response
+
+
+class MiddlewarePipeline:
+    """
+    Builder collecting middleware until the pipeline is compiled.
+
+    ``compile`` and ``compile_routes`` freeze the builder: adding middleware
+    afterwards raises RuntimeError.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._middlewares: List[Tuple[Any, Optional[Tuple[str, ...]]]] = []
+        self._compiled: Optional[CompiledPipeline] = None
+        self._frozen = False
+
+    @property
+    def frozen(self) -> bool:
+        """
+        Return whether the pipeline has been compiled.
+
+        Returns:
+            True once ``compile`` or ``compile_routes`` has been called.
+        """
+        return self._frozen
+
+    def add(self, middleware: Any, prefix: Optional[str] = None) -> None:
+        """
+        Append a middleware to the pipeline.
+
+        Args:
+            middleware: A Middleware instance or any object with ``before``
+                        and/or ``after`` hooks.
+            prefix: Restrict the middleware to routes whose path starts with
+                    this prefix (matched on whole segments); None applies it
+                    to every route.
+
+        Returns:
+            None
+
+        Raises:
+            RuntimeError: If the pipeline has already been compiled.
+        """
+        with self._lock:
+            if self._frozen:
+                raise RuntimeError("The middleware pipeline is frozen once compiled")
+            self._middlewares.append((middleware, tuple(split_path(prefix)) if prefix is not None else None))
+
+    def compile(self) -> CompiledPipeline:
+        """
+        Compile and freeze the pipeline of the middleware without a prefix.
+
+        Returns:
+            The CompiledPipeline.
+        """
+        with self._lock:
+            self._frozen = True
+            if self._compiled is None:
+                self._compiled = CompiledPipeline(
+                    tuple(middleware for middleware, prefix in self._middlewares if prefix is None)
+                )
+            return self._compiled
+
+    def compile_routes(self, manifest: RouteManifest) -> Dict[Route, CompiledPipeline]:
+        """
+        Precompute and freeze the effective pipeline of every route.
+
+        A route's chain is, in order: the global middleware and the middleware
+        whose prefix matches the route path (in registration order), then its
+        router group's middleware, then its own. Routes with the same chain
+        share one CompiledPipeline.
+
+        Args:
+            manifest: The RouteManifest whose routes are compiled.
+
+        Returns:
+            A mapping of each Route of the manifest to its CompiledPipeline.
+        """
+        with self._lock:
+            self._frozen = True
+            middlewares = tuple(self._middlewares)
+
+        groups = {group.name: group.middlewares for group in manifest.router_groups}
+        shared: Dict[Tuple[int, ...], CompiledPipeline] = {}
+        pipelines: Dict[Route, CompiledPipeline] = {}
+
+        for route in manifest.routes:
+            segments = tuple(split_path(route.full_path))
+            chain = [
+                middleware for middleware, prefix in middlewares
+                if prefix is None or segments[:len(prefix)] == prefix
+            ]
+            chain.extend(groups.get(route.router_group, ()))
+            chain.extend(route.middlewares)
+
+            key = tuple(id(middleware) for middleware in chain)
+            pipeline = shared.get(key)
+            if pipeline is None:
+                pipeline = shared[key] = CompiledPipeline(tuple(chain))
+            pipelines[route] = pipeline
+
+        return pipelines
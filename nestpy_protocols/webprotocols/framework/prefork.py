@@ -0,0 +1,238 @@
+"""
+Module providing the pre-fork worker supervisor.
+
+This module declares the PreforkSupervisor used by FrameworkLifProtocol to
+run one application on every core of a host without an external process
+manager. The supervisor binds the listening socket, forks N workers that
+either inherit that socket or bind their own with SO_REUSEPORT, restarts
+workers that crash and coordinates a graceful shutdown of all of them.
+
+Only POSIX platforms (where ``os.fork`` exists) are supported.
+"""
+
+import os
+import time
+import signal
+import socket
+import logging
+import threading
+from typing import Callable, Dict, Optional, Tuple, Union
+
+
+logger = logging.getLogger(__name__)
+
+
+class PreforkSupervisor:
+    """
+    Parent process supervising a fixed number of forked server workers.
+
+    Args:
+        serve: Callable run in each worker with the listening socket; it should
+               serve requests until the worker receives SIGTERM.
+        workers: Number of worker processes (defaults to the CPU count).
+        reuse_port: If True, each worker binds its own socket with SO_REUSEPORT
+                    so the kernel balances connections; otherwise workers
+                    inherit the socket bound by the supervisor.
+        backlog: The listen backlog of the socket(s).
+        graceful_timeout: Seconds workers get to exit after SIGTERM before
+                          they are killed.
+        restart_delay: Minimum seconds between two restarts of the same slot,
+                       which prevents a crash loop from spinning the CPU.
+    """
+
+    def __init__(
+            self,
+            serve: Callable[[socket.socket], None],
+            workers: Optional[int] = None,
+            reuse_port: bool = False,
+            backlog: int = 2048,
+            graceful_timeout: float = 30.0,
+            restart_delay: float = 1.0,
+    ) -> None:
+        if not hasattr(os, "fork"):
+            raise RuntimeError("PreforkSupervisor requires a platform with os.fork")
+
+        if reuse_port and not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT is not available on this platform")
+
+        self.serve = serve
+        self.workers = workers or os.cpu_count() or 1
+        self.reuse_port = reuse_port
+        self.backlog = backlog
+        self.graceful_timeout = graceful_timeout
+        self.restart_delay = restart_delay
+        self.restarts = 0
+        self._pids: Dict[int, int] = {}
+        self._started: Dict[int, float] = {}
+        self._socket: Optional[socket.socket] = None
+        self._address = ("", 0)
+        self._stopping = threading.Event()
+        self._stopped = threading.Event()
+        self._stopped.set()
+
+    @property
+    def pids(self) -> Dict[int, int]:
+        """
+        Return the live workers.
+
+        Returns:
+            A mapping of worker slot to process id.
+        """
+        return {slot: pid for pid, slot in self._pids.items()}
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """
+        Return the bound (host, port) address.
+
+        Returns:
+            The address tuple; the port is resolved when 0 was requested.
+        """
+        return self._address
+
+    def _bind(self, host: str, port: int, listen: bool = True) -> socket.socket:
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((host, port))
+        if listen:
+            sock.listen(self.backlog)
+        sock.set_inheritable(True)
+        return sock
+
+    def _spawn(self, slot: int) -> None:
+        pid = os.fork()
+
+        if pid == 0:
+            status = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                sock = self._socket
+                if self.reuse_port:
+                    sock.close()
+                    sock = self._bind(*self._address)
+                self.serve(sock)
+            except BaseException:
+                # os._exit skips the interpreter's error reporting: log the crash before exiting.
+                logger.exception("Worker %d (slot %d) exited with an error", os.getpid(), slot)
+                status = 1
+            finally:
+                os._exit(status)
+
+        self._pids[pid] = slot
+        self._started[slot] = time.monotonic()
+
+    def run(self, host: str, port: Union[str, int]) -> None:
+        """
+        Bind the socket, fork the workers and supervise them until stopped.
+
+        Blocks the calling thread. SIGTERM and SIGINT received by the
+        supervisor (when run from the main thread) trigger ``stop``; the
+        previous handlers are restored when it returns.
+
+        Args:
+            host: The hostname or IP address to bind.
+            port: The port number to bind (0 picks a free port).
+
+        Returns:
+            None
+        """
+        self._address = (host, int(port))
+        # With SO_REUSEPORT the supervisor only reserves the port: a listening
+        # socket in the parent would receive connections nobody accepts.
+        self._socket = self._bind(*self._address, listen=not self.reuse_port)
+        self._address = (host, self._socket.getsockname()[1])
+        self._stopping.clear()
+        self._stopped.clear()
+
+        handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                handlers[signum] = signal.signal(signum, lambda *_: self._stopping.set())
+
+        try:
+            for slot in range(self.workers):
+                self._spawn(slot)
+
+            while not self._stopping.is_set():
+                self._reap(restart=True)
+                self._stopping.wait(0.1)
+
+            self._shutdown()
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+            self._socket.close()
+            self._stopped.set()
+
+    def _reap(self, restart: bool) -> None:
+        # Only the tracked workers are waited on: waitpid(-1) would also reap
+        # (and hide the exit status of) children the application started itself.
+        for pid, slot in list(self._pids.items()):
+            try:
+                reaped, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                # Reaped elsewhere (e.g. by a SIGCHLD handler of the application).
+                reaped, status = pid, None
+
+            if reaped == 0:
+                continue
+
+            del self._pids[pid]
+            if not restart:
+                continue
+
+            code = "unknown" if status is None else os.waitstatus_to_exitcode(status)
+            logger.warning("Worker %d (slot %d) exited with status %s, restarting it", pid, slot, code)
+
+            wait = self.restart_delay - (time.monotonic() - self._started.get(slot, 0.0))
+            if wait > 0 and self._stopping.wait(wait):
+                return
+
+            self.restarts += 1
+            self._spawn(slot)
+
+    def _shutdown(self) -> None:
+        for pid in list(self._pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + self.graceful_timeout
+        while self._pids and time.monotonic() < deadline:
+            self._reap(restart=False)
+            time.sleep(0.05)
+
+        for pid in list(self._pids):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+        for pid in list(self._pids):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            del self._pids[pid]
+
+    def stop(self, wait: bool = True) -> None:
+        """
+        Request a coordinated graceful shutdown of every worker.
+
+        Workers receive SIGTERM and get ``graceful_timeout`` seconds to exit
+        before being killed; crashed workers are no longer restarted.
+
+        Args:
+            wait: If True, block until the supervisor loop has finished.
+
+        Returns:
+            None
+        """
+        self._stopping.set()
+        if wait:
+            self._stopped.wait()
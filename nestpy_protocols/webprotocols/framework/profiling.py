@@ -0,0 +1,316 @@
+"""
+Module providing the on-demand route profiler.
+
+This module declares the RouteProfiler used by FrameworkMwProtocol. A
+profiling window is opened for one route (or every route), a fraction of
+its requests and a bounded time or number of samples. Two modes exist:
+
+- ``cprofile``: each sampled request runs under ``cProfile`` and the results
+  are aggregated into a single ``pstats`` file.
+- ``stack``: a background thread captures the stacks of the threads serving
+  sampled requests every ``interval`` seconds, and the counts are written in
+  collapsed-stack format (one ``frame;frame;frame count`` line per stack, as
+  read by flame graph tools). The overhead does not depend on the number of
+  calls the handler makes.
+
+Output goes to local disk when the window closes; a window closed by a
+request (expiry or ``max_samples``) is written by a background thread, so
+the request does not wait on the disk. While no window is open,
+``profile()`` only checks one attribute and returns a shared no-op context,
+so the hook can stay installed in production.
+
+Both modes observe the calling thread: for asyncio handlers, code of other
+tasks interleaved at ``await`` points is included in the sample. Only one
+``cProfile`` can be active per thread, so a request arriving while another
+request of the same thread is profiled is not sampled.
+"""
+
+import os
+import sys
+import time
+import random
+import pstats
+import cProfile
+import threading
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from collections import Counter
+from typing import ContextManager, Dict, Hashable, Iterator, Optional, Tuple
+
+
+PROFILE_MODES = ("cprofile", "stack")
+
+_NOT_SAMPLED = nullcontext(False)
+
+# The cProfile currently enabled by a RouteProfiler on each thread.
+_active = threading.local()
+
+
+@dataclass(frozen=True)
+class ProfileWindow:
+    """
+    Settings of an open profiling window.
+
+    Attributes:
+        route: The route key to profile, or None for every route.
+        fraction: The fraction of matching requests to sample (0 to 1].
+        expires: The monotonic time at which the window closes.
+        max_samples: The number of sampled requests after which the window closes.
+        output_dir: The directory where the profile is written.
+        mode: One of PROFILE_MODES.
+        interval: The stack sampling period in seconds (``stack`` mode).
+    """
+
+    route: Optional[Hashable]
+    fraction: float
+    expires: float
+    max_samples: int
+    output_dir: str
+    mode: str = "cprofile"
+    interval: float = 0.005
+
+
+class RouteProfiler:
+    """
+    Samples requests of selected routes for a bounded window.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._window: Optional[ProfileWindow] = None
+        self._stats: Optional[pstats.Stats] = None
+        self._stacks: Counter = Counter()
+        # Thread ident -> number of sampled requests it is serving (``stack`` mode).
+        self._threads: Dict[int, int] = {}
+        self._samples = 0
+        self._writer: Optional[threading.Thread] = None
+        self.last_output: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        """
+        Return whether a profiling window is open.
+
+        Returns:
+            True while requests may be sampled.
+        """
+        return self._window is not None
+
+    def start(
+            self,
+            route: Optional[Hashable] = None,
+            fraction: float = 1.0,
+            duration: float = 60.0,
+            max_samples: int = 1000,
+            output_dir: str = ".",
+            mode: str = "cprofile",
+            interval: float = 0.005
+    ) -> None:
+        """
+        Open a profiling window.
+
+        Args:
+            route: The route key to profile (as passed to ``profile``), or
+                   None to sample every route.
+            fraction: The fraction of matching requests to sample.
+            duration: Seconds after which the window closes.
+            max_samples: Sampled requests after which the window closes.
+            output_dir: Directory of the profile file.
+            mode: 'cprofile' for a pstats file, 'stack' for collapsed stacks.
+            interval: The stack sampling period in seconds ('stack' mode).
+
+        Returns:
+            None
+
+        Raises:
+            RuntimeError: If a window is already open.
+            ValueError: If fraction is not in (0, 1] or mode is unknown.
+        """
+        if not 0 < fraction <= 1:
+            raise ValueError("fraction must be in (0, 1]")
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of {PROFILE_MODES}")
+
+        with self._lock:
+            if self._window is not None:
+                raise RuntimeError("A profiling window is already open")
+            self._stats = None
+            self._stacks = Counter()
+            self._samples = 0
+            window = ProfileWindow(
+                route, fraction, time.monotonic() + duration, max_samples, output_dir, mode, interval
+            )
+            self._window = window
+
+        if mode == "stack":
+            threading.Thread(target=self._sample_stacks, args=(window,), name="route-profiler", daemon=True).start()
+
+    def stop(self) -> Optional[str]:
+        """
+        Close the window and write the aggregated profile.
+
+        Returns:
+            The path of the written profile, or None if nothing was sampled.
+        """
+        closed = self._close(None)
+        return None if closed is None else self._write(*closed)
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Wait for the profile of a window closed by a request to be written.
+
+        Args:
+            timeout: Seconds to wait, or None to wait until written.
+
+        Returns:
+            The path of the last written profile, or None if none was written.
+        """
+        writer = self._writer
+        if writer is not None:
+            writer.join(timeout)
+        return self.last_output
+
+    def _close(
+            self,
+            window: Optional[ProfileWindow]
+    ) -> Optional[Tuple[ProfileWindow, Optional[pstats.Stats], Counter, int]]:
+        with self._lock:
+            current, stats, stacks, samples = self._window, self._stats, self._stacks, self._samples
+            if current is None or (window is not None and current is not window):
+                return None
+            self._window = None
+            self._stats = None
+            self._stacks = Counter()
+
+        if stats is None and not stacks:
+            return None
+        return current, stats, stacks, samples
+
+    def _close_later(self, window: ProfileWindow) -> None:
+        closed = self._close(window)
+        if closed is not None:
+            self._writer = threading.Thread(target=self._write, args=closed, name="route-profiler-writer", daemon=True)
+            self._writer.start()
+
+    def _write(self, window: ProfileWindow, stats: Optional[pstats.Stats], stacks: Counter, samples: int) -> str:
+        label = "all" if window.route is None else "".join(
+            char if char.isalnum() else "_" for char in str(window.route)
+        ).strip("_")
+        extension = "pstats" if window.mode == "cprofile" else "collapsed"
+        os.makedirs(window.output_dir, exist_ok=True)
+        path = os.path.join(window.output_dir, f"profile-{label}-{int(time.time())}-{samples}.{extension}")
+
+        if stats is not None:
+            stats.dump_stats(path)
+        else:
+            with open(path, "w", encoding="utf-8") as file:
+                for stack, count in stacks.most_common():
+                    file.write(f"{stack} {count}\n")
+
+        self.last_output = path
+        return path
+
+    def profile(self, route: Hashable) -> ContextManager[bool]:
+        """
+        Return a context manager profiling the enclosed block if the request is sampled.
+
+        Args:
+            route: The key of the route being served.
+
+        Returns:
+            A context manager whose value is True if the block is being
+            profiled; a shared no-op context while no window is open.
+        """
+        window = self._window
+
+        if window is None or (window.route is not None and window.route != route) or (
+                window.fraction < 1 and random.random() >= window.fraction):
+            return _NOT_SAMPLED
+
+        if time.monotonic() >= window.expires:
+            self._close_later(window)
+            return _NOT_SAMPLED
+
+        return self._sample(window)
+
+    @contextmanager
+    def _sample(self, window: ProfileWindow) -> Iterator[bool]:
+        if window.mode == "stack":
+            ident = threading.get_ident()
+            with self._lock:
+                self._threads[ident] = self._threads.get(ident, 0) + 1
+            try:
+                yield True
+            finally:
+                with self._lock:
+                    remaining = self._threads.pop(ident) - 1
+                    if remaining:
+                        self._threads[ident] = remaining
+                self._collect(window, None)
+            return
+
+        if getattr(_active, "profiler", None) is not None:
+            # Another request of this thread (e.g. an interleaved asyncio task) is profiled.
+            yield False
+            return
+
+        profiler = _active.profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiling tool is active on this thread (Python 3.12+).
+            _active.profiler = None
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            profiler.disable()
+            _active.profiler = None
+            self._collect(window, profiler)
+
+    def _collect(self, window: ProfileWindow, profiler: Optional[cProfile.Profile]) -> None:
+        with self._lock:
+            if self._window is not window:
+                return
+            if profiler is not None:
+                if self._stats is None:
+                    self._stats = pstats.Stats(profiler)
+                else:
+                    self._stats.add(profiler)
+            self._samples += 1
+            done = self._samples >= window.max_samples
+
+        if done:
+            self._close_later(window)
+
+    def _sample_stacks(self, window: ProfileWindow) -> None:
+        while self._window is window:
+            if time.monotonic() >= window.expires:
+                closed = self._close(window)
+                if closed is not None:
+                    self._write(*closed)
+                return
+
+            time.sleep(window.interval)
+            with self._lock:
+                threads = tuple(self._threads)
+            if not threads:
+                continue
+
+            frames = sys._current_frames()
+            captured = []
+            for ident in threads:
+                frame = frames.get(ident)
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if names:
+                    captured.append(";".join(reversed(names)))
+
+            with self._lock:
+                if self._window is window:
+                    self._stacks.update(captured)
@@ -0,0 +1,543 @@
+"""
+Module providing the framework-agnostic route index.
+
+This module declares the RouteManifest, the RouteIndex builder and the
+CompiledRouteIndex matcher used by FrameworkCompProtocol. Routes are stored in a segment
+trie so that matching costs O(path length) regardless of how many routes
+are registered, and path parameters are converted to typed values
+(int, float, uuid, str, path) while matching.
+
+Both FastAPI/Starlette (``/items/{item_id:int}``) and Flask
+(``/items/<int:item_id>``) placeholder syntaxes are accepted.
+"""
+
+import re
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+
+_PARAM_PATTERN = re.compile(r"^(?:\{(?P<s_name>\w+)(?::(?P<s_conv>\w+))?\}|<(?:(?P<f_conv>\w+):)?(?P<f_name>\w+)>)$")
+
+_UUID_PATTERN = re.compile(r"^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$")
+
+_INT_PATTERN = re.compile(r"^[0-9]+$")
+
+_FLOAT_PATTERN = re.compile(r"^[0-9]+(?:\.[0-9]+)?$")
+
+
+def _convert_str(segment: str) -> Any:
+    return segment
+
+
+def _convert_int(segment: str) -> Any:
+    return int(segment) if _INT_PATTERN.match(segment) else None
+
+
+def _convert_float(segment: str) -> Any:
+    return float(segment) if _FLOAT_PATTERN.match(segment) else None
+
+
+def _convert_uuid(segment: str) -> Any:
+    # Imported on use: ``uuid`` is comparatively slow to import and most
+    # applications never declare uuid path parameters.
+    from uuid import UUID
+    return UUID(segment) if _UUID_PATTERN.match(segment) else None
+
+
+CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "str": _convert_str,
+    "string": _convert_str,
+    "int": _convert_int,
+    "float": _convert_float,
+    "uuid": _convert_uuid,
+    "path": _convert_str,
+}
+
+# Typed converters are tried before the catch-all ``str`` converter so that
+# ``/items/{id:int}`` wins over ``/items/{slug}`` for numeric segments.
+_CONVERTER_PRIORITY = {"int": 0, "float": 1, "uuid": 2, "str": 3, "string": 3}
+
+
+def split_path(path: str) -> List[str]:
+    """
+    Split a URL path into its non-empty segments.
+
+    Args:
+        path: The URL path (e.g. '/users/{user_id}/').
+
+    Returns:
+        The list of path segments without leading/trailing slashes.
+    """
+    return [segment for segment in path.split("/") if segment]
+
+
+def join_paths(prefix: str, path: str) -> str:
+    """
+    Join a router group prefix and a route path into a normalized path.
+
+    Args:
+        prefix: The router group or global prefix (may be empty).
+        path: The route path relative to the prefix.
+
+    Returns:
+        The normalized absolute path, always starting with '/'.
+    """
+    return "/" + "/".join(split_path(prefix) + split_path(path))
+
+
+@dataclass(frozen=True)
+class Route:
+    """
+    Immutable description of a registered route.
+
+    Attributes:
+        path: The route path, relative to the router group prefix if any.
+        endpoint: The handler callable bound to the route.
+        methods: The HTTP methods accepted by the route.
+        router_group: The name of the router group owning the route, if any.
+        prefix: The URL prefix of the owning router group ('' for top-level routes).
+        middlewares: Middleware applied to this route only.
+        options: Additional framework-specific registration options.
+    """
+
+    path: str
+    endpoint: Callable[..., Any]
+    methods: FrozenSet[str] = frozenset({"GET"})
+    router_group: Optional[str] = None
+    prefix: str = ""
+    middlewares: Tuple[Any, ...] = field(default=(), compare=False)
+    options: Tuple[Tuple[str, Any], ...] = field(default=(), compare=False)
+
+    @property
+    def full_path(self) -> str:
+        """
+        Return the absolute route path, including the router group prefix.
+
+        Returns:
+            The normalized absolute path.
+        """
+        return join_paths(self.prefix, self.path)
+
+
+@dataclass(frozen=True)
+class RouterGroup:
+    """
+    Immutable description of a registered router group.
+
+    Attributes:
+        name: The name or identifier of the router group.
+        prefix: The URL prefix applied to every route of the group.
+        middlewares: Middleware applied to every route of the group.
+        options: Additional framework-specific registration options.
+    """
+
+    name: str
+    prefix: str
+    middlewares: Tuple[Any, ...] = field(default=(), compare=False)
+    options: Tuple[Tuple[str, Any], ...] = field(default=(), compare=False)
+
+
+@dataclass(frozen=True)
+class RouteMatch:
+    """
+    Result of a successful route lookup.
+
+    Attributes:
+        route: The matched Route.
+        params: The typed path parameters extracted from the URL.
+    """
+
+    route: Route
+    params: Dict[str, Any]
+
+
+class _Node:
+    __slots__ = ("static", "params", "catch_all", "handlers")
+
+    def __init__(self) -> None:
+        self.static: Dict[str, "_Node"] = {}
+        self.params: List[Tuple[str, Callable[[str], Any], "_Node"]] = []
+        self.catch_all: Optional["_Node"] = None
+        # Parameter names belong to each route, not to the trie: '/users/{user_id}'
+        # and '/users/{id}/posts' share the parameter node of their first segment.
+        self.handlers: Dict[str, Tuple[Route, Tuple[str, ...]]] = {}
+
+
+class RouteIndex:
+    """
+    Mutable builder for a route trie.
+
+    Routes are added one at a time while the application is being set up;
+    ``compile`` then produces an immutable CompiledRouteIndex used for
+    request matching.
+    """
+
+    def __init__(self, routes: Iterable[Route] = ()) -> None:
+        self._root = _Node()
+        self._routes: List[Route] = []
+        for route in routes:
+            self.add(route)
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def add(self, route: Route) -> None:
+        """
+        Insert a route into the trie.
+
+        Args:
+            route: The route to insert.
+
+        Raises:
+            ValueError: If the path uses an unknown converter, a 'path'
+                        converter that is not the last segment, or the same
+                        method is already registered for an equivalent path.
+        """
+        node = self._root
+        segments = split_path(route.full_path)
+        names: List[str] = []
+
+        for position, segment in enumerate(segments):
+            param = _PARAM_PATTERN.match(segment)
+
+            if param is None:
+                node = node.static.setdefault(segment, _Node())
+                continue
+
+            name = param.group("s_name") or param.group("f_name")
+            conv = param.group("s_conv") or param.group("f_conv") or "str"
+
+            if conv not in CONVERTERS:
+                raise ValueError(f"Unknown path converter '{conv}' in route '{route.full_path}'")
+            names.append(name)
+
+            if conv == "path":
+                if position != len(segments) - 1:
+                    raise ValueError(f"The 'path' converter must be the last segment in route '{route.full_path}'")
+                if node.catch_all is None:
+                    node.catch_all = _Node()
+                node = node.catch_all
+                continue
+
+            for p_conv, _, child in node.params:
+                if p_conv == conv:
+                    node = child
+                    break
+            else:
+                child = _Node()
+                node.params.append((conv, CONVERTERS[conv], child))
+                node.params.sort(key=lambda item: _CONVERTER_PRIORITY.get(item[0], 3))
+                node = child
+
+        for method in route.methods:
+            method = method.upper()
+            if method in node.handlers:
+                raise ValueError(f"Route {method} '{route.full_path}' is already registered")
+            node.handlers[method] = (route, tuple(names))
+
+        self._routes.append(route)
+
+    def routes(self) -> Tuple[Route, ...]:
+        """
+        Return the registered routes in insertion order.
+
+        Returns:
+            A tuple of Route objects.
+        """
+        return tuple(self._routes)
+
+    def compile(self) -> "CompiledRouteIndex":
+        """
+        Freeze the trie into an immutable matcher.
+
+        Returns:
+            A CompiledRouteIndex reflecting the routes added so far.
+        """
+        return CompiledRouteIndex(_freeze(self._root), tuple(self._routes))
+
+
+# A compiled node is a plain tuple: (static, params, catch_all, handlers).
+# Tuples and dicts keep attribute lookups out of the matching loop.
+_CompiledNode = Tuple[
+    Dict[str, Any],
+    Tuple[Tuple[Callable[[str], Any], Any], ...],
+    Optional[Any],
+    Dict[str, Tuple[Route, Tuple[str, ...]]],
+]
+
+
+def _freeze(node: _Node) -> _CompiledNode:
+    return (
+        {segment: _freeze(child) for segment, child in node.static.items()},
+        tuple((converter, _freeze(child)) for _, converter, child in node.params),
+        _freeze(node.catch_all) if node.catch_all is not None else None,
+        dict(node.handlers),
+    )
+
+
+class CompiledRouteIndex:
+    """
+    Immutable route matcher produced by RouteIndex.compile.
+
+    Matching walks the trie once per path segment, preferring static
+    segments over typed parameters and typed parameters over catch-all
+    'path' parameters. A branch whose route does not accept the request
+    method is abandoned for the next candidate, so GET '/items/{id:int}'
+    and POST '/items/{slug}' both match '/items/5'.
+    """
+
+    __slots__ = ("_root", "_routes")
+
+    def __init__(self, root: _CompiledNode, routes: Tuple[Route, ...]) -> None:
+        self._root = root
+        self._routes = routes
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    @property
+    def routes(self) -> Tuple[Route, ...]:
+        """
+        Return the routes contained in the index.
+
+        Returns:
+            A tuple of Route objects in registration order.
+        """
+        return self._routes
+
+    def match(self, method: str, path: str) -> Optional[RouteMatch]:
+        """
+        Resolve a request method and path to a route.
+
+        Args:
+            method: The HTTP method of the request (e.g. 'GET').
+            path: The request path, without query string.
+
+        Returns:
+            A RouteMatch with typed parameters, or None if no route matches
+            the path and method.
+        """
+        # Converted values are collected deepest first while the recursion unwinds.
+        values: List[Any] = []
+        handler = _lookup(self._root, split_path(path), 0, method.upper(), values)
+
+        if handler is None:
+            return None
+
+        route, names = handler
+        values.reverse()
+        return RouteMatch(route, dict(zip(names, values)))
+
+    def allowed_methods(self, path: str) -> FrozenSet[str]:
+        """
+        Return the methods registered for a path.
+
+        Args:
+            path: The request path, without query string.
+
+        Returns:
+            The set of HTTP methods accepted by the path (empty if unknown),
+            across every route whose pattern matches it.
+        """
+        methods: Set[str] = set()
+        _collect_methods(self._root, split_path(path), 0, methods)
+        return frozenset(methods)
+
+
+def _lookup(
+        node: _CompiledNode,
+        segments: List[str],
+        position: int,
+        method: str,
+        values: List[Any]
+) -> Optional[Tuple[Route, Tuple[str, ...]]]:
+    size = len(segments)
+
+    while position < size:
+        segment = segments[position]
+        static, typed, catch_all, _ = node
+
+        child = static.get(segment)
+        if child is not None and not typed and catch_all is None:
+            # Fast path: a purely static branch never needs backtracking.
+            node = child
+            position += 1
+            continue
+
+        if child is not None:
+            found = _lookup(child, segments, position + 1, method, values)
+            if found is not None:
+                return found
+
+        for converter, param_child in typed:
+            value = converter(segment)
+            if value is None:
+                continue
+            found = _lookup(param_child, segments, position + 1, method, values)
+            if found is not None:
+                values.append(value)
+                return found
+
+        if catch_all is not None:
+            found = catch_all[3].get(method)
+            if found is not None:
+                values.append("/".join(segments[position:]))
+            return found
+
+        return None
+
+    return node[3].get(method)
+
+
+def _collect_methods(node: _CompiledNode, segments: List[str], position: int, methods: Set[str]) -> None:
+    if position == len(segments):
+        methods.update(node[3])
+        return
+
+    static, typed, catch_all, _ = node
+    segment = segments[position]
+    child = static.get(segment)
+    if child is not None:
+        _collect_methods(child, segments, position + 1, methods)
+    for converter, param_child in typed:
+        if converter(segment) is not None:
+            _collect_methods(param_child, segments, position + 1, methods)
+    if catch_all is not None:
+        methods.update(catch_all[3])
+
+
+def _route_shape(path: str) -> str:
+    # Two paths have the same shape when they only differ by parameter names,
+    # e.g. '/items/{id:int}' and '/items/<int:pk>'.
+    shape = []
+    for segment in split_path(path):
+        param = _PARAM_PATTERN.match(segment)
+        if param is None:
+            shape.append(segment)
+        else:
+            shape.append("{" + (param.group("s_conv") or param.group("f_conv") or "str").replace("string", "str") + "}")
+    return "/" + "/".join(shape)
+
+
+@dataclass(frozen=True)
+class RouteManifest:
+    """
+    Immutable, validated set of routes and router groups.
+
+    A manifest is built once from the registrations collected during setup
+    and handed to the adapter in a single bulk apply, so adapters no longer
+    need to mutate the live application on every registration call.
+
+    Attributes:
+        routes: Every route, in registration order, with its group prefix resolved.
+        router_groups: Every router group, in registration order.
+        group_routes: The routes of each router group (None for top-level
+                      routes), bucketed once when the manifest is created.
+    """
+
+    routes: Tuple[Route, ...] = ()
+    router_groups: Tuple[RouterGroup, ...] = ()
+    group_routes: Dict[Optional[str], Tuple[Route, ...]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        buckets: Dict[Optional[str], List[Route]] = {}
+        for route in self.routes:
+            buckets.setdefault(route.router_group, []).append(route)
+        # Frozen: the bucketed dict is filled in place rather than reassigned.
+        self.group_routes.update((name, tuple(group)) for name, group in buckets.items())
+
+    @classmethod
+    def build(cls, routes: Iterable[Route], router_groups: Iterable[RouterGroup]) -> "RouteManifest":
+        """
+        Validate registrations and freeze them into a manifest.
+
+        Validation runs in a single linear pass: router group names and
+        prefixes must be unique, routes may only reference known groups, and
+        no two routes may share a method and path shape.
+
+        Args:
+            routes: The registered routes (their prefix is resolved from the group).
+            router_groups: The registered router groups.
+
+        Returns:
+            The validated RouteManifest.
+
+        Raises:
+            ValueError: If a duplicate route, a duplicate group or a prefix
+                        conflict is found, or a route references an unknown group.
+        """
+        groups: Dict[str, RouterGroup] = {}
+        prefixes: Dict[str, str] = {}
+
+        for group in router_groups:
+            if group.name in groups:
+                raise ValueError(f"Router group '{group.name}' is registered more than once")
+
+            prefix = _route_shape(group.prefix)
+            if prefix in prefixes:
+                raise ValueError(
+                    f"Router groups '{prefixes[prefix]}' and '{group.name}' share the prefix '{group.prefix}'"
+                )
+
+            groups[group.name] = group
+            prefixes[prefix] = group.name
+
+        resolved: List[Route] = []
+        seen: Dict[Tuple[str, str], Route] = {}
+
+        for route in routes:
+            if route.router_group is not None:
+                group = groups.get(route.router_group)
+                if group is None:
+                    raise ValueError(f"Route '{route.path}' references unknown router group '{route.router_group}'")
+                route = replace(route, prefix=group.prefix)
+
+            shape = _route_shape(route.full_path)
+            for method in route.methods:
+                previous = seen.setdefault((method, shape), route)
+                if previous is not route:
+                    raise ValueError(
+                        f"Route {method} '{route.full_path}' conflicts with '{previous.full_path}'"
+                    )
+
+            resolved.append(route)
+
+        return cls(routes=tuple(resolved), router_groups=tuple(groups.values()))
+
+    def routes_for(self, router_group: Optional[str]) -> Tuple[Route, ...]:
+        """
+        Return the routes that belong to a router group.
+
+        Args:
+            router_group: The router group name, or None for top-level routes.
+
+        Returns:
+            The matching routes in registration order.
+        """
+        return self.group_routes.get(router_group, ())
+
+    def get_router_group(self, name: str) -> Optional[RouterGroup]:
+        """
+        Return a router group of the manifest by name.
+
+        Args:
+            name: The router group name.
+
+        Returns:
+            The RouterGroup, or None if the manifest has no such group.
+        """
+        for group in self.router_groups:
+            if group.name == name:
+                return group
+        return None
+
+    def compile(self) -> CompiledRouteIndex:
+        """
+        Compile the manifest into a route matcher.
+
+        Returns:
+            A CompiledRouteIndex containing every route of the manifest.
+        """
+        return RouteIndex(self.routes).compile()
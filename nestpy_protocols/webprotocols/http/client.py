@@ -0,0 +1,415 @@
+"""
+Module providing the HttpClientProtocol contract and a pooled reference client.
+
+This module declares the HttpClientProtocol abstract base class used by
+services to call each other, and PooledHttpClient, a stdlib-only asyncio
+HTTP/1.1 implementation that keeps persistent keep-alive connection pools
+per host (scheme, host, port) with a bounded number of connections per
+host, idle eviction and connection reuse metrics.
+"""
+
+import re
+import ssl
+import time
+import asyncio
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# Methods that can be sent again when a reused connection turns out to be
+# closed (RFC 9110, section 9.2.2).
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "TRACE", "PUT", "DELETE"})
+
+_HEADER_NAME = re.compile(r"[!#$%&'*+\-.^_`|~0-9A-Za-z]+")
+
+_HEADER_VALUE_FORBIDDEN = re.compile(r"[\r\n\0]")
+
+
+@dataclass(frozen=True)
+class ClientResponse:
+    """
+    A fully received HTTP response.
+
+    Attributes:
+        status: The HTTP status code.
+        reason: The reason phrase of the status line.
+        headers: The response headers as (name, value) pairs, in received order.
+        body: The response body.
+    """
+
+    status: int
+    reason: str
+    headers: Tuple[Tuple[str, str], ...]
+    body: bytes
+
+    def header(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        Return the first value of a header, matched case-insensitively.
+
+        Args:
+            name: The header name.
+            default: The value returned when the header is absent.
+
+        Returns:
+            The header value or ``default``.
+        """
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return default
+
+
+@dataclass
+class PoolMetrics:
+    """
+    Connection reuse counters of a PooledHttpClient.
+
+    Attributes:
+        requests: Requests sent.
+        connections_opened: New TCP (or TLS) connections established.
+        connections_reused: Requests served on an already open connection.
+        connections_evicted: Idle connections closed by idle eviction.
+        connections_discarded: Connections closed because the server or a
+                               failure made them unusable.
+        wait_time: Total seconds spent waiting for a free connection slot.
+    """
+
+    requests: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+    connections_evicted: int = 0
+    connections_discarded: int = 0
+    wait_time: float = 0.0
+
+    @property
+    def reuse_ratio(self) -> float:
+        """
+        Return the fraction of requests served on a reused connection.
+
+        Returns:
+            A number between 0 and 1.
+        """
+        return self.connections_reused / self.requests if self.requests else 0.0
+
+
+class HttpClientProtocol(ABC):
+    """
+    Abstract base class that defines the interface for outbound HTTP calls.
+
+    Implementations should reuse connections across requests whenever the
+    server allows it and release every resource on ``close``.
+    """
+
+    @abstractmethod
+    async def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Mapping[str, str]] = None,
+            body: Optional[bytes] = None,
+            timeout: Optional[float] = None
+    ) -> ClientResponse:
+        """
+        Send an HTTP request and return the complete response.
+
+        Args:
+            method: The HTTP method (e.g. 'GET').
+            url: The absolute URL of the request.
+            headers: Additional request headers.
+            body: The request body, if any.
+            timeout: Seconds allowed for the whole exchange.
+
+        Returns:
+            The ClientResponse.
+        """
+
+    @abstractmethod
+    async def close(self) -> None:
+        """
+        Close every pooled connection.
+
+        Returns:
+            None
+        """
+
+    async def get(self, url: str, **kwargs: Any) -> ClientResponse:
+        """
+        Send a GET request.
+
+        Args:
+            url: The absolute URL of the request.
+            **kwargs: Additional ``request`` options.
+
+        Returns:
+            The ClientResponse.
+        """
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, body: Optional[bytes] = None, **kwargs: Any) -> ClientResponse:
+        """
+        Send a POST request.
+
+        Args:
+            url: The absolute URL of the request.
+            body: The request body.
+            **kwargs: Additional ``request`` options.
+
+        Returns:
+            The ClientResponse.
+        """
+        return await self.request("POST", url, body=body, **kwargs)
+
+    async def __aenter__(self) -> "HttpClientProtocol":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+
+class _ClosedBeforeResponse(ConnectionError):
+    pass
+
+
+class _Connection:
+    __slots__ = ("reader", "writer", "idle_since")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.idle_since = time.monotonic()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+@dataclass
+class _HostPool:
+    slots: asyncio.Semaphore
+    idle: List[_Connection] = field(default_factory=list)
+
+
+class PooledHttpClient(HttpClientProtocol):
+    """
+    Stdlib asyncio HTTP/1.1 client with per-host keep-alive connection pools.
+
+    Args:
+        max_connections_per_host: Maximum open connections per (scheme, host, port);
+                                  further requests wait for a free connection.
+        idle_timeout: Seconds an idle connection is kept before eviction.
+        keep_alive: If False, every request opens and closes its own connection.
+        ssl_context: The SSL context used for https URLs.
+
+    An idempotent request whose reused connection is closed by the server
+    before the status line is sent once more on a new connection. Header
+    names and values containing CR, LF or NUL are rejected with a ValueError.
+    """
+
+    def __init__(
+            self,
+            max_connections_per_host: int = 10,
+            idle_timeout: float = 30.0,
+            keep_alive: bool = True,
+            ssl_context: Optional[ssl.SSLContext] = None
+    ) -> None:
+        self.max_connections_per_host = max_connections_per_host
+        self.idle_timeout = idle_timeout
+        self.keep_alive = keep_alive
+        self.ssl_context = ssl_context
+        self.metrics = PoolMetrics()
+        self._pools: Dict[Tuple[str, str, int], _HostPool] = {}
+
+    def _pool(self, key: Tuple[str, str, int]) -> _HostPool:
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = _HostPool(asyncio.Semaphore(self.max_connections_per_host))
+        return pool
+
+    def evict_idle(self) -> int:
+        """
+        Close idle connections older than ``idle_timeout``.
+
+        Also runs implicitly whenever a connection is taken from a pool.
+
+        Returns:
+            The number of evicted connections.
+        """
+        evicted = 0
+        limit = time.monotonic() - self.idle_timeout
+
+        for pool in self._pools.values():
+            fresh = []
+            for connection in pool.idle:
+                if connection.idle_since < limit:
+                    connection.close()
+                    evicted += 1
+                else:
+                    fresh.append(connection)
+            pool.idle[:] = fresh
+
+        self.metrics.connections_evicted += evicted
+        return evicted
+
+    async def _acquire(self, key: Tuple[str, str, int]) -> Tuple[_Connection, bool]:
+        limit = time.monotonic() - self.idle_timeout
+        pool = self._pool(key)
+
+        while pool.idle:
+            connection = pool.idle.pop()
+            if connection.idle_since < limit:
+                connection.close()
+                self.metrics.connections_evicted += 1
+            elif connection.reader.at_eof() or connection.writer.is_closing():
+                connection.close()
+                self.metrics.connections_discarded += 1
+            else:
+                self.metrics.connections_reused += 1
+                return connection, True
+
+        return await self._connect(key), False
+
+    async def _connect(self, key: Tuple[str, str, int]) -> _Connection:
+        scheme, host, port = key
+        context = None
+        if scheme == "https":
+            context = self.ssl_context or ssl.create_default_context()
+
+        reader, writer = await asyncio.open_connection(host, port, ssl=context)
+        self.metrics.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Mapping[str, str]] = None,
+            body: Optional[bytes] = None,
+            timeout: Optional[float] = None
+    ) -> ClientResponse:
+        if timeout is not None:
+            return await asyncio.wait_for(self.request(method, url, headers, body), timeout)
+
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme '{parts.scheme}'")
+
+        key = (scheme, parts.hostname or "", parts.port or (443 if scheme == "https" else 80))
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        host_header = parts.netloc.rsplit("@", 1)[-1]
+
+        method = method.upper()
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host_header}"]
+        names = set()
+        for name, value in (headers or {}).items():
+            # A CR or LF would let the caller's data inject headers or a second request.
+            if not _HEADER_NAME.fullmatch(name):
+                raise ValueError(f"Invalid HTTP header name {name!r}")
+            if _HEADER_VALUE_FORBIDDEN.search(str(value)):
+                raise ValueError(f"Invalid value for HTTP header '{name}': CR, LF and NUL are not allowed")
+            names.add(name.lower())
+            lines.append(f"{name}: {value}")
+        if "connection" not in names:
+            lines.append("Connection: keep-alive" if self.keep_alive else "Connection: close")
+        if body is not None and "content-length" not in names:
+            lines.append(f"Content-Length: {len(body)}")
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b"")
+
+        pool = self._pool(key)
+        started = time.monotonic()
+        await pool.slots.acquire()
+        self.metrics.wait_time += time.monotonic() - started
+        self.metrics.requests += 1
+
+        connection = None
+        reusable = False
+        try:
+            connection, reused = await self._acquire(key)
+            try:
+                response, reusable = await _exchange(connection, payload, method)
+            except _ClosedBeforeResponse:
+                if not reused or method not in _IDEMPOTENT_METHODS:
+                    raise
+                # The server closed the idle connection while it was being
+                # reused: the request was not processed, send it once more.
+                connection.close()
+                self.metrics.connections_discarded += 1
+                connection = None
+                connection = await self._connect(key)
+                response, reusable = await _exchange(connection, payload, method)
+            return response
+        finally:
+            if connection is not None:
+                if reusable and self.keep_alive:
+                    connection.idle_since = time.monotonic()
+                    pool.idle.append(connection)
+                else:
+                    connection.close()
+                    if self.keep_alive:
+                        self.metrics.connections_discarded += 1
+            pool.slots.release()
+
+    async def close(self) -> None:
+        for pool in self._pools.values():
+            for connection in pool.idle:
+                connection.close()
+            pool.idle.clear()
+        self._pools.clear()
+
+
+async def _exchange(connection: _Connection, payload: bytes, method: str) -> Tuple[ClientResponse, bool]:
+    try:
+        connection.writer.write(payload)
+        await connection.writer.drain()
+        status_line = await connection.reader.readline()
+    except (BrokenPipeError, ConnectionResetError) as exc:
+        raise _ClosedBeforeResponse("The server closed the connection before responding") from exc
+
+    if not status_line:
+        raise _ClosedBeforeResponse("The server closed the connection before responding")
+
+    return await _read_response(connection.reader, status_line, method)
+
+
+async def _read_response(
+        reader: asyncio.StreamReader,
+        status_line: bytes,
+        method: str
+) -> Tuple[ClientResponse, bool]:
+    version, _, rest = status_line.decode("latin-1").rstrip("\r\n").partition(" ")
+    code, _, reason = rest.partition(" ")
+    status = int(code)
+
+    headers = []
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers.append((name.strip(), value.strip()))
+
+    lowered = {name.lower(): value for name, value in headers}
+    connection = lowered.get("connection", "").lower()
+    reusable = "close" not in connection and (version == "HTTP/1.1" or "keep-alive" in connection)
+
+    if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+        body = b""
+    elif "chunked" in lowered.get("transfer-encoding", "").lower():
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";", 1)[0].strip(), 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b"".join(chunks)
+    elif "content-length" in lowered:
+        body = await reader.readexactly(int(lowered["content-length"]))
+    else:
+        body = await reader.read()
+        reusable = False
+
+    return ClientResponse(status, reason, tuple(headers), body), reusable
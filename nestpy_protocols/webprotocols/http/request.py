@@ -0,0 +1,336 @@
+"""
+Module providing the RequestProtocol contract and a zero-copy reference request.
+
+This module declares the RequestProtocol abstract base class describing an
+incoming HTTP request, and BufferedRequest, an implementation backed by the
+single receive buffer of the connection. Construction only records offsets;
+headers, query string and cookies are parsed on first access and the body
+is exposed as a ``memoryview`` slice that is not copied until it is read.
+Chunked bodies are decoded on first access, which copies them once.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from urllib.parse import parse_qsl
+from typing import Dict, List, Optional, Tuple, Union
+
+_HEAD_END = re.compile(rb"\r\n\r\n")
+
+_CHUNK_SIZE = re.compile(rb"([0-9A-Fa-f]+)[ \t]*(?:;[^\r\n]*)?\r\n")
+
+
+class BadRequestError(ValueError):
+    """
+    Raised when a request cannot be parsed.
+
+    Adapters should translate it into a 400 response.
+
+    Attributes:
+        status: The HTTP status to answer with.
+    """
+
+    status = 400
+
+
+class RequestProtocol(ABC):
+    """
+    Abstract base class that defines the interface of an incoming HTTP request.
+
+    Implementations should parse lazily: handlers that only read the path
+    and a header should not pay for parsing the rest of the request.
+    """
+
+    __slots__ = ()
+
+    @property
+    @abstractmethod
+    def method(self) -> str:
+        """
+        Return the HTTP method.
+
+        Returns:
+            The upper-case method (e.g. 'GET').
+        """
+
+    @property
+    @abstractmethod
+    def path(self) -> str:
+        """
+        Return the request path, without query string.
+
+        Returns:
+            The path as sent by the client.
+        """
+
+    @property
+    @abstractmethod
+    def query_string(self) -> str:
+        """
+        Return the raw query string.
+
+        Returns:
+            The query string without the leading '?', or '' if absent.
+        """
+
+    @abstractmethod
+    def header(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        Return the first value of a header, matched case-insensitively.
+
+        Args:
+            name: The header name.
+            default: The value returned when the header is absent.
+
+        Returns:
+            The header value or ``default``.
+        """
+
+    @property
+    @abstractmethod
+    def headers(self) -> List[Tuple[str, str]]:
+        """
+        Return every header.
+
+        Returns:
+            The (name, value) pairs in received order.
+        """
+
+    @property
+    @abstractmethod
+    def query_params(self) -> Dict[str, List[str]]:
+        """
+        Return the parsed query string.
+
+        Returns:
+            A mapping of parameter names to their values.
+        """
+
+    @property
+    @abstractmethod
+    def cookies(self) -> Dict[str, str]:
+        """
+        Return the cookies sent with the request.
+
+        Returns:
+            A mapping of cookie names to values.
+        """
+
+    @abstractmethod
+    def body(self) -> bytes:
+        """
+        Return the request body.
+
+        Returns:
+            The body bytes (b'' if the request has no body).
+        """
+
+
+class BufferedRequest(RequestProtocol):
+    """
+    HTTP/1.x request backed by one receive buffer, parsed on demand.
+
+    Args:
+        buffer: The bytes received for this request: request line, headers
+                and (possibly partial) body. The buffer is referenced, not
+                copied; of a ``memoryview`` slice, only the head is copied.
+
+    Raises:
+        BadRequestError: If the buffer does not contain a complete request head.
+    """
+
+    __slots__ = (
+        "_raw", "_buffer", "_line_end", "_method_end", "_target_end", "_query_start",
+        "_head_end", "_method", "_path", "_headers", "_query", "_cookies", "_body"
+    )
+
+    def __init__(self, buffer: Union[bytes, bytearray, memoryview]) -> None:
+        if isinstance(buffer, memoryview) and buffer.contiguous and buffer.nbytes == len(buffer.obj):
+            buffer = buffer.obj
+
+        raw = buffer
+        if isinstance(buffer, memoryview):
+            # A slice: search the view in place and copy the head only, the body stays a view.
+            found = _HEAD_END.search(buffer)
+            if found is None:
+                raise BadRequestError("Incomplete or malformed HTTP request head")
+            raw = buffer[:found.end()].tobytes()
+
+        self._raw = raw
+        self._buffer = buffer
+
+        line_end = raw.find(b"\r\n")
+        head_end = raw.find(b"\r\n\r\n")
+        method_end = raw.find(b" ", 0, line_end)
+        target_end = raw.find(b" ", method_end + 1, line_end)
+
+        if line_end < 0 or head_end < 0 or method_end < 0 or target_end < 0:
+            raise BadRequestError("Incomplete or malformed HTTP request head")
+
+        query_start = raw.find(b"?", method_end + 1, target_end)
+
+        self._line_end = line_end
+        self._head_end = head_end
+        self._method_end = method_end
+        self._target_end = target_end
+        self._query_start = query_start
+        self._method: Optional[str] = None
+        self._path: Optional[str] = None
+        self._headers: Optional[List[Tuple[str, str]]] = None
+        self._query: Optional[Dict[str, List[str]]] = None
+        self._cookies: Optional[Dict[str, str]] = None
+        self._body: Optional[memoryview] = None
+
+    @property
+    def method(self) -> str:
+        if self._method is None:
+            self._method = self._raw[:self._method_end].decode("ascii")
+        return self._method
+
+    @property
+    def path(self) -> str:
+        if self._path is None:
+            end = self._query_start if self._query_start >= 0 else self._target_end
+            self._path = self._raw[self._method_end + 1:end].decode("latin-1")
+        return self._path
+
+    @property
+    def http_version(self) -> str:
+        """
+        Return the protocol version of the request line.
+
+        Returns:
+            The version string (e.g. 'HTTP/1.1').
+        """
+        return self._raw[self._target_end + 1:self._line_end].decode("ascii")
+
+    @property
+    def query_string(self) -> str:
+        if self._query_start < 0:
+            return ""
+        return self._raw[self._query_start + 1:self._target_end].decode("latin-1")
+
+    def header(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        if self._headers is not None:
+            name = name.lower()
+            for key, value in self._headers:
+                if key.lower() == name:
+                    return value
+            return default
+
+        # Scan the header block in place: only the matching value is decoded.
+        raw = self._raw
+        wanted = name.lower().encode("latin-1")
+        size = len(wanted)
+        start = self._line_end + 2
+        end = self._head_end + 2
+
+        while start < end:
+            line_end = raw.find(b"\r\n", start, end)
+            if raw[start + size:start + size + 1] == b":" and raw[start:start + size].lower() == wanted:
+                return raw[start + size + 1:line_end].strip().decode("latin-1")
+            start = line_end + 2
+
+        return default
+
+    @property
+    def headers(self) -> List[Tuple[str, str]]:
+        if self._headers is None:
+            block = self._raw[self._line_end + 2:self._head_end].decode("latin-1")
+            headers = []
+            for line in block.split("\r\n"):
+                name, _, value = line.partition(":")
+                headers.append((name.strip(), value.strip()))
+            self._headers = headers
+        return self._headers
+
+    @property
+    def query_params(self) -> Dict[str, List[str]]:
+        if self._query is None:
+            query: Dict[str, List[str]] = {}
+            for key, value in parse_qsl(self.query_string, keep_blank_values=True):
+                query.setdefault(key, []).append(value)
+            self._query = query
+        return self._query
+
+    @property
+    def cookies(self) -> Dict[str, str]:
+        if self._cookies is None:
+            cookies = {}
+            for item in (self.header("cookie") or "").split(";"):
+                name, sep, value = item.strip().partition("=")
+                if sep:
+                    cookies[name] = value.strip('"')
+            self._cookies = cookies
+        return self._cookies
+
+    @property
+    def body_view(self) -> memoryview:
+        """
+        Return the body as a view of the receive buffer.
+
+        The view is bounded by Content-Length when present; it stays valid
+        as long as the request (and therefore the buffer) is alive. A
+        chunked body is decoded into a new buffer on first access.
+
+        Returns:
+            A memoryview over the body bytes.
+
+        Raises:
+            BadRequestError: If Content-Length or the chunked framing is invalid.
+        """
+        if self._body is not None:
+            return self._body
+
+        start = self._head_end + 4
+        view = memoryview(self._buffer)
+        encoding = self.header("transfer-encoding")
+
+        if encoding is not None and encoding.lower().rsplit(",", 1)[-1].strip() == "chunked":
+            # Transfer-Encoding takes precedence over Content-Length (RFC 9112, section 6.3).
+            self._body = memoryview(_decode_chunked(view, start))
+            return self._body
+
+        length = self.header("content-length")
+        if length is None:
+            end = len(view)
+        elif length.isdigit() and length.isascii():
+            end = start + int(length)
+        else:
+            raise BadRequestError(f"Invalid Content-Length: {length!r}")
+
+        self._body = view[start:end]
+        return self._body
+
+    def body(self) -> bytes:
+        return self.body_view.tobytes()
+
+
+def _decode_chunked(view: memoryview, start: int) -> bytearray:
+    """
+    Decode a chunked message body.
+
+    Args:
+        view: The receive buffer.
+        start: The offset of the first chunk size line.
+
+    Returns:
+        The concatenated chunk data; trailers are ignored.
+
+    Raises:
+        BadRequestError: If the framing is invalid or the body is incomplete.
+    """
+    body = bytearray()
+
+    while True:
+        found = _CHUNK_SIZE.match(view, start)
+        if found is None:
+            raise BadRequestError("Invalid or incomplete chunk size line")
+        size = int(found.group(1), 16)
+        start = found.end()
+        if not size:
+            return body
+        end = start + size
+        if view[end:end + 2] != b"\r\n":
+            raise BadRequestError("Invalid or incomplete chunk data")
+        body += view[start:end]
+        start = end + 2
@@ -0,0 +1,267 @@
+"""
+Module providing the ResponseProtocol contract and streaming reference responses.
+
+This module declares the ResponseProtocol abstract base class describing an
+outgoing HTTP/1.1 response, and three implementations:
+
+- Response: a small, fully buffered body.
+- StreamingResponse: a body produced by a sync or async iterable, sent with
+  chunked transfer encoding and backpressure-aware writes.
+- FileResponse: a file sent with ``os.sendfile`` (zero-copy) where the
+  transport allows it, in constant memory whatever the file size.
+"""
+
+import os
+import asyncio
+import socket
+from abc import ABC, abstractmethod
+from http import HTTPStatus
+from typing import AsyncIterable, Iterable, List, Optional, Tuple, Union
+
+
+Headers = List[Tuple[str, str]]
+
+_END = object()
+
+
+def _encode_head(status: int, headers: Headers) -> bytes:
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ""
+
+    lines = [f"HTTP/1.1 {status} {reason}"]
+    lines.extend(f"{name}: {value}" for name, value in headers)
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+class ResponseProtocol(ABC):
+    """
+    Abstract base class that defines the interface of an outgoing HTTP response.
+
+    Implementations write themselves to an ``asyncio.StreamWriter`` and must
+    respect its flow control (``await writer.drain()``) so a slow client
+    never makes the server buffer the whole body in memory.
+    """
+
+    def __init__(self, status: int = 200, headers: Optional[Iterable[Tuple[str, str]]] = None) -> None:
+        self.status = status
+        self.headers: Headers = list(headers or ())
+
+    def set_header(self, name: str, value: str) -> None:
+        """
+        Set a header, replacing any existing value with the same name.
+
+        Args:
+            name: The header name.
+            value: The header value.
+
+        Returns:
+            None
+        """
+        lowered = name.lower()
+        self.headers = [(key, old) for key, old in self.headers if key.lower() != lowered]
+        self.headers.append((name, value))
+
+    def has_header(self, name: str) -> bool:
+        """
+        Return whether a header is set, matched case-insensitively.
+
+        Args:
+            name: The header name.
+
+        Returns:
+            True if the header is present.
+        """
+        lowered = name.lower()
+        return any(key.lower() == lowered for key, _ in self.headers)
+
+    @abstractmethod
+    async def send(self, writer: asyncio.StreamWriter) -> None:
+        """
+        Write the status line, headers and body to the client.
+
+        Args:
+            writer: The stream writer of the client connection.
+
+        Returns:
+            None
+        """
+
+
+class Response(ResponseProtocol):
+    """
+    Fully buffered response for small bodies.
+
+    Args:
+        body: The response body.
+        status: The HTTP status code.
+        headers: Additional response headers.
+        media_type: The Content-Type of the body.
+    """
+
+    def __init__(
+            self,
+            body: Union[bytes, str] = b"",
+            status: int = 200,
+            headers: Optional[Iterable[Tuple[str, str]]] = None,
+            media_type: Optional[str] = None
+    ) -> None:
+        super().__init__(status, headers)
+        self.body = body.encode("utf-8") if isinstance(body, str) else body
+        if media_type is not None:
+            self.set_header("Content-Type", media_type)
+        self.set_header("Content-Length", str(len(self.body)))
+
+    async def send(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(_encode_head(self.status, self.headers) + self.body)
+        await writer.drain()
+
+
+class StreamingResponse(ResponseProtocol):
+    """
+    Response whose body is produced incrementally by an iterable.
+
+    The body is sent with chunked transfer encoding unless a Content-Length
+    header is given. Every chunk is followed by ``await writer.drain()``, so
+    at most one chunk plus the transport's high-water mark is buffered.
+
+    Args:
+        content: A sync or async iterable (e.g. a generator) of bytes or str chunks.
+        status: The HTTP status code.
+        headers: Additional response headers.
+        media_type: The Content-Type of the body.
+        iterate_in_thread: Pull chunks of a sync iterable in the default executor
+                           so blocking generators do not stall the event loop.
+    """
+
+    def __init__(
+            self,
+            content: Union[Iterable[Union[bytes, str]], AsyncIterable[Union[bytes, str]]],
+            status: int = 200,
+            headers: Optional[Iterable[Tuple[str, str]]] = None,
+            media_type: Optional[str] = None,
+            iterate_in_thread: bool = True
+    ) -> None:
+        super().__init__(status, headers)
+        self.content = content
+        self.iterate_in_thread = iterate_in_thread
+        if media_type is not None:
+            self.set_header("Content-Type", media_type)
+        self.chunked = not self.has_header("Content-Length")
+        if self.chunked:
+            self.set_header("Transfer-Encoding", "chunked")
+
+    async def _chunks(self) -> AsyncIterable[bytes]:
+        if hasattr(self.content, "__aiter__"):
+            async for chunk in self.content:
+                yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+            return
+
+        iterator = iter(self.content)
+        if not self.iterate_in_thread:
+            for chunk in iterator:
+                yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+            return
+
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await loop.run_in_executor(None, next, iterator, _END)
+            if chunk is _END:
+                return
+            yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+    async def send(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(_encode_head(self.status, self.headers))
+
+        try:
+            async for chunk in self._chunks():
+                if not chunk:
+                    continue
+                if self.chunked:
+                    writer.writelines((b"%x\r\n" % len(chunk), chunk, b"\r\n"))
+                else:
+                    writer.write(chunk)
+                await writer.drain()
+        finally:
+            close = getattr(self.content, "aclose", None) or getattr(self.content, "close", None)
+            if close is not None:
+                result = close()
+                if asyncio.iscoroutine(result):
+                    await result
+
+        if self.chunked:
+            writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+class FileResponse(ResponseProtocol):
+    """
+    Response that transfers a file (or a range of it) with ``os.sendfile``.
+
+    On plain TCP transports the kernel copies the file straight to the
+    socket; on TLS or other transports asyncio falls back to chunked reads
+    with flow control, which still runs in constant memory.
+
+    Args:
+        path: The file to send.
+        status: The HTTP status code.
+        headers: Additional response headers.
+        media_type: The Content-Type of the file.
+        offset: The first byte of the file to send.
+        count: The number of bytes to send (defaults to the rest of the file).
+    """
+
+    def __init__(
+            self,
+            path: Union[str, "os.PathLike[str]"],
+            status: int = 200,
+            headers: Optional[Iterable[Tuple[str, str]]] = None,
+            media_type: str = "application/octet-stream",
+            offset: int = 0,
+            count: Optional[int] = None
+    ) -> None:
+        super().__init__(status, headers)
+        self.path = path
+        self.offset = offset
+        size = os.stat(path).st_size
+        self.count = max(0, size - offset) if count is None else min(count, max(0, size - offset))
+        self.set_header("Content-Type", media_type)
+        self.set_header("Content-Length", str(self.count))
+
+    async def send(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(_encode_head(self.status, self.headers))
+        await writer.drain()
+
+        if not self.count:
+            return
+
+        loop = asyncio.get_running_loop()
+        with open(self.path, "rb") as file:
+            await loop.sendfile(writer.transport, file, self.offset, self.count, fallback=True)
+
+    def send_blocking(self, sock: socket.socket) -> int:
+        """
+        Send the response on a blocking socket (thread-per-connection servers).
+
+        Args:
+            sock: The connected client socket.
+
+        Returns:
+            The number of body bytes sent.
+        """
+        sock.sendall(_encode_head(self.status, self.headers))
+
+        sent = 0
+        with open(self.path, "rb") as file:
+            if not hasattr(os, "sendfile"):
+                return sock.sendfile(file, self.offset, self.count)
+
+            descriptor = file.fileno()
+            while sent < self.count:
+                written = os.sendfile(sock.fileno(), descriptor, self.offset + sent, self.count - sent)
+                if written == 0:
+                    break
+                sent += written
+
+        return sent